@@ -773,16 +773,53 @@ class AirQualityController {
         }
     }
     
-    // Placeholder for AI predictions - to be refined or replaced
+    // Predictions from the 'predictions' collection, falling back to OpenWeatherMap
+    // for locations the importer has no forecasts for
     async predictAirQuality(req, res) {
         try {
             const { location } = req.params; 
-            const { days = 7 } = req.query; // OpenWeatherMap provides ~4 days of hourly forecast
+            const { days = 7, indicator, geo_type: geoType, geo_join_id: geoJoinId } = req.query; // OpenWeatherMap provides ~4 days of hourly forecast
             const OPENWEATHERMAP_API_KEY = process.env.OPENWEATHERMAP_API_TOKEN; // Corrected to match typical .env naming
 
             if (!location) {
                 return res.status(400).json({ success: false, message: 'Location parameter is required' });
             }
+
+            // Forecasts precomputed by the importer: one indexed read, no external call
+            const storedPredictions = await AirQualityModel.getPredictions(location, {
+                indicatorId: indicator, geoType, geoJoinId
+            });
+            if (storedPredictions.length > 0) {
+                // A name shared by a UHF34 and a UHF42 area matches two places: keep each series apart
+                const series = [];
+                for (const prediction of storedPredictions) {
+                    const current = series[series.length - 1];
+                    if (!current || current.geo_type !== prediction['Geo Type Name']
+                        || current.geo_join_id !== prediction['Geo Join ID']
+                        || current.indicator_id !== prediction['Indicator ID']) {
+                        series.push({
+                            indicator_id: prediction['Indicator ID'],
+                            name: prediction['Name'],
+                            geo_type: prediction['Geo Type Name'],
+                            geo_join_id: prediction['Geo Join ID'],
+                            geo_place_name: prediction['Geo Place Name'],
+                            predictions: [],
+                        });
+                    }
+                    series[series.length - 1].predictions.push(prediction);
+                }
+                const places = [...new Set(series.map(s => `${s.geo_type}:${s.geo_join_id}`))];
+                return res.json({
+                    success: true,
+                    message: `Air quality predictions retrieved for ${location}`,
+                    location_used_for_forecast: location,
+                    prediction_source: 'GoFetch seasonal trend model (predictions collection)',
+                    places_matched: places.length,
+                    forecast_points: storedPredictions.length,
+                    series,
+                    predictions: storedPredictions,
+                });
+            }
             if (!OPENWEATHERMAP_API_KEY) {
                 console.error('OpenWeatherMap API key not configured.');
                 return res.status(500).json({ success: false, message: 'Prediction service not configured' });
@@ -328,7 +328,20 @@ class AirQualityModel {
     // Actual map plotting would require Latitude/Longitude fields in the data.
     async getGeoData() {
         try {
-            console.log('🔍 Starting simplified geo data aggregation (distinct Geo Place Names)...');
+            // The Python importer maintains one 'latest_by_place' document per place,
+            // so the map needs a single query instead of one findOne per place.
+            const latestByPlace = await database.getDb()
+                .collection('latest_by_place')
+                .find({ kind: 'place' }, { projection: { _id: 0, kind: 0, updated_at: 0 } })
+                .sort({ 'Latest Data Value': -1 })
+                .toArray();
+
+            if (latestByPlace.length > 0) {
+                console.log(`✅ GeoData: Read ${latestByPlace.length} locations from latest_by_place.`);
+                return latestByPlace;
+            }
+
+            console.log('🔍 latest_by_place is empty, falling back to per-place scan (distinct Geo Place Names)...');
 
             const distinctLocations = await this.collection.distinct('Geo Place Name');
             console.log(`📊 Found ${distinctLocations.length} distinct Geo Place Names`);
@@ -435,6 +448,37 @@ class AirQualityModel {
         }
     }
 
+    // Forecasts written by the Python importer (data/gofetch_import/forecast.py) to the 'predictions' collection.
+    // They are stored per series (Indicator ID x Geo Type Name x Geo Join ID). A Geo Place Name can name
+    // both a UHF34 and a UHF42 area, so pass geoType and geoJoinId to pick one place. Results come back
+    // series by series in date order, served by the { Geo Place Name, Geo Type Name, Geo Join ID,
+    // Indicator ID, Start_Date } and { Geo Type Name, Geo Join ID, Indicator ID, Start_Date } indexes.
+    async getPredictions(geoPlaceName, options = {}) {
+        try {
+            const query = {};
+            if (geoPlaceName) {
+                query['Geo Place Name'] = geoPlaceName;
+            }
+            if (options.geoType) {
+                query['Geo Type Name'] = options.geoType;
+            }
+            if (options.geoJoinId) {
+                query['Geo Join ID'] = parseInt(options.geoJoinId);
+            }
+            if (options.indicatorId) {
+                query['Indicator ID'] = parseInt(options.indicatorId);
+            }
+
+            return await database.getDb()
+                .collection('predictions')
+                .find(query, { projection: { _id: 0 } })
+                .sort({ 'Geo Type Name': 1, 'Geo Join ID': 1, 'Indicator ID': 1, 'Start_Date': 1 })
+                .toArray();
+        } catch (error) {
+            throw new Error(`Error getting predictions: ${error.message}`);
+        }
+    }
+
     // Simplified from getByState, now getByGeoPlaceName
     async getByGeoPlaceName(geoPlaceName, options = {}) {
         const query = { 'Geo Place Name': new RegExp(geoPlaceName, 'i') };
@@ -0,0 +1,20 @@
+"""
+GoFetch data import package: one importer, one tuned MongoDB client, one command line.
+
+    from gofetch_import import GoFetchMongoImporter, get_client
+
+Run `python -m gofetch_import --help` from the data/ directory for the commands.
+"""
+
+from .client import get_client, get_database
+
+__all__ = ['GoFetchMongoImporter', 'build_documents', 'get_client', 'get_database']
+
+
+def __getattr__(name):
+    # The importer pulls in pandas and every storage module; importing it lazily keeps
+    # `import gofetch_import` (and the client factory) light for the other commands
+    if name in ('GoFetchMongoImporter', 'build_documents'):
+        from . import importer
+        return getattr(importer, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,469 @@
+#!/usr/bin/env python3
+"""
+In-Process Analytics Engine for GoFetch Air Quality Data
+================================================================
+
+Loads the prepared dataset once into compact NumPy arrays and answers the dashboard's
+grouped statistics (count/avg/min/max by indicator, place, Geo Type, year, month and
+season, filtered by any of those and a date range) without touching MongoDB:
+
+    values      float64   Data Value
+    days        int32     Start_Date as days since 1970-01-01
+    dimensions  small integer codes per row, with their labels:
+                indicator, place (Geo Type Name × Geo Join ID), geo_type, year, month, season
+
+Group-bys are sort-based. For each combination of dimensions, the rows are sorted by a
+composite key once; the sorted order, keys and values are kept as that combination's
+group index. A query maps its filters to a row mask through per-dimension lookup tables.
+It reads the mask in the index's order, finds group boundaries where the key changes,
+and aggregates each run with ufunc.reduceat. No per-query sort or hash table is needed.
+Answers are memoized, so repeated dashboard queries come straight from memory.
+
+The engine loads from the pre-parsed cache the importer writes (.gofetch_cache), so the CSV
+is not parsed again when the cache is current. It can also load a CSV, a columnar
+snapshot or any prepared DataFrame.
+
+Usage:
+    python -m gofetch_import.analytics query --by indicator year --indicator 375 --start 2015-01-01
+    python -m gofetch_import.analytics serve --port 8765  # GET /stats?by=indicator,year&indicator=375
+
+    from gofetch_import.analytics import AnalyticsEngine
+    engine = AnalyticsEngine.from_csv("Air_Quality_20250613.csv")
+    engine.stats(by=['year', 'month'], years=[2015])      # getMonthlyTrends
+    engine.stats()                                         # getStatistics
+"""
+
+import argparse
+import json
+import sys
+import threading
+import time
+from datetime import date, datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pandas as pd
+
+from .manifest import file_sha256
+from .prepared_cache import PreparedCache
+from .schema import validate_frame
+from .sources import is_stdin, read_csv
+
+DIMENSIONS = ['indicator', 'place', 'geo_type', 'year', 'month', 'season']
+
+# Same labels as the seasonal rollup (rollups.season_expression)
+SEASONS = ['Winter', 'Summer', 'Annual', 'Multi-year']
+
+# Memoized answers kept per engine
+CACHE_SIZE = 512
+
+EPOCH = np.datetime64('1970-01-01', 'D')
+
+
+def season_codes(time_periods):
+    """Season code per row from 'Time Period', classifying each distinct label once"""
+    codes, labels = pd.factorize(time_periods)
+    labels = pd.Series(labels, dtype=object).astype(str)
+    label_seasons = np.select(
+        [labels.str.match(r'^Winter'), labels.str.match(r'^Summer'), labels.str.fullmatch(r'\d{4}-\d{4}')],
+        [SEASONS.index('Winter'), SEASONS.index('Summer'), SEASONS.index('Multi-year')],
+        default=SEASONS.index('Annual')
+    ).astype(np.int8)
+    return label_seasons[codes]
+
+
+def smallest_int(count):
+    for dtype in (np.int8, np.int16, np.int32):
+        if count <= np.iinfo(dtype).max:
+            return dtype
+    return np.int64
+
+
+def to_day(value):
+    """'2015-01-01', date or datetime as days since the epoch"""
+    return int((np.datetime64(pd.Timestamp(value).date(), 'D') - EPOCH).astype(np.int64))
+
+
+class GroupIndex:
+    """Rows sorted by the composite key of some dimensions, with keys and values in that order"""
+
+    def __init__(self, engine, by):
+        self.by = by
+        self.radices = [len(engine.labels[name]) for name in by]
+        key = np.zeros(engine.rows, dtype=np.int64)
+        for name, radix in zip(by, self.radices):
+            key = key * radix + engine.codes[name]
+        self.order = np.argsort(key, kind='stable')
+        self.keys = key[self.order]
+        self.values = engine.values[self.order]
+
+    def decode(self, keys):
+        """Split composite keys back into one code array per dimension"""
+        codes = []
+        for radix in reversed(self.radices):
+            codes.append(keys % radix)
+            keys = keys // radix
+        return list(reversed(codes))
+
+
+class AnalyticsEngine:
+    """Grouped statistics over a prepared air quality frame held as NumPy arrays"""
+
+    def __init__(self, df):
+        # Rows sorted by date: series come out in date order
+        df = df.sort_values('Start_Date', kind='stable').reset_index(drop=True)
+        self.rows = len(df)
+        self.values = df['Data Value'].to_numpy(dtype=np.float64)
+        self.days = (df['Start_Date'].to_numpy(dtype='datetime64[D]') - EPOCH).astype(np.int32)
+        self.time_periods = df['Time Period'].astype(str).to_numpy(dtype=object)
+
+        self.codes = {}
+        self.labels = {}
+
+        codes, indicators = pd.factorize(df['Indicator ID'], sort=True)
+        names = df.groupby('Indicator ID', sort=True)[['Name', 'Measure Info']].first()
+        self.add_dimension('indicator', codes, [
+            {'indicator_id': int(indicator_id), 'name': names.at[indicator_id, 'Name'],
+             'unit': names.at[indicator_id, 'Measure Info']}
+            for indicator_id in indicators
+        ])
+
+        places = pd.MultiIndex.from_arrays([df['Geo Type Name'].astype(str), df['Geo Join ID'].astype(np.int64)])
+        codes, place_keys = pd.factorize(places, sort=True)
+        place_names = df['Geo Place Name'].astype(str).groupby(codes).first()
+        self.add_dimension('place', codes, [
+            {'geo_type': geo_type, 'geo_join_id': int(geo_join_id), 'geo_place_name': place_names.iat[code]}
+            for code, (geo_type, geo_join_id) in enumerate(place_keys)
+        ])
+
+        codes, geo_types = pd.factorize(df['Geo Type Name'].astype(str), sort=True)
+        self.add_dimension('geo_type', codes, [{'geo_type': geo_type} for geo_type in geo_types])
+
+        dates = df['Start_Date'].dt
+        codes, years = pd.factorize(dates.year, sort=True)
+        self.add_dimension('year', codes, [{'year': int(year)} for year in years])
+        self.add_dimension('month', dates.month.to_numpy() - 1, [{'month': month} for month in range(1, 13)])
+        self.add_dimension('season', season_codes(df['Time Period']), [{'season': season} for season in SEASONS])
+
+        # Reverse lookups for filters: label value -> code. A place name can belong to several
+        # places (Borough Park is both a UHF34 and a UHF42 area), so it maps to all their codes
+        place_codes = {}
+        for code, label in enumerate(self.labels['place']):
+            place_codes.setdefault(label['geo_place_name'], []).append(code)
+        self.lookup = {
+            'indicator': {label['indicator_id']: code for code, label in enumerate(self.labels['indicator'])},
+            'place': place_codes,
+            'place_id': {(label['geo_type'], label['geo_join_id']): code
+                         for code, label in enumerate(self.labels['place'])},
+            'geo_type': {label['geo_type']: code for code, label in enumerate(self.labels['geo_type'])},
+            'year': {label['year']: code for code, label in enumerate(self.labels['year'])},
+            'month': {month: month - 1 for month in range(1, 13)},
+            'season': {season: code for code, season in enumerate(SEASONS)}
+        }
+
+        self.indexes = {}
+        self.answers = {}
+        self.lock = threading.Lock()
+
+    def add_dimension(self, name, codes, labels):
+        self.codes[name] = np.asarray(codes).astype(smallest_int(len(labels)))
+        self.labels[name] = labels
+
+    @classmethod
+    def from_frame(cls, df):
+        return cls(df)
+
+    @classmethod
+    def from_csv(cls, csv_file_path, use_cache=True, cache_dir=None):
+        """Load from the importer's pre-parsed cache when it is current, else parse and validate the CSV"""
+        if use_cache and not is_stdin(csv_file_path):
+            cached = PreparedCache(csv_file_path, file_sha256(csv_file_path), cache_dir).load()
+            if cached is not None:
+                return cls(cached)
+        df, _ = validate_frame(read_csv(csv_file_path))
+        return cls(df)
+
+    @classmethod
+    def from_snapshot(cls, snapshot_dir):
+        from .snapshot import SnapshotReader
+        columns = ['Indicator ID', 'Name', 'Measure Info', 'Geo Type Name', 'Geo Join ID', 'Geo Place Name',
+                   'Time Period', 'Start_Date', 'Data Value']
+        return cls(SnapshotReader(snapshot_dir).query(columns=columns))
+
+    def group_index(self, by):
+        """Precomputed sort order for a dimension combination, built on first use"""
+        by = tuple(by)
+        index = self.indexes.get(by)
+        if index is None:
+            index = GroupIndex(self, by)
+            with self.lock:
+                self.indexes.setdefault(by, index)
+        return index
+
+    def codes_for(self, name, values):
+        """Codes of the given label values (unknown values match nothing)"""
+        lookup = self.lookup[name]
+        codes = []
+        for value in values:
+            code = lookup.get(value, [])
+            codes.extend(code if isinstance(code, list) else [code])
+        return codes
+
+    def mask(self, indicator_ids=None, places=None, place_ids=None, geo_types=None, years=None, months=None,
+             seasons=None, start=None, end=None):
+        """Boolean row mask for the filters, or None when nothing is filtered"""
+        mask = None
+
+        def restrict(name, codes, dimension=None):
+            nonlocal mask
+            # Lookup table per dimension: one gather per row instead of comparing against each value
+            table = np.zeros(len(self.labels[dimension or name]), dtype=bool)
+            table[codes] = True
+            selected = table[self.codes[dimension or name]]
+            mask = selected if mask is None else mask & selected
+
+        if indicator_ids is not None:
+            restrict('indicator', self.codes_for('indicator', indicator_ids))
+        if places is not None:
+            restrict('place', self.codes_for('place', places))
+        if place_ids is not None:
+            restrict('place', self.codes_for('place_id', place_ids))
+        if geo_types is not None:
+            restrict('geo_type', self.codes_for('geo_type', geo_types))
+        if years is not None:
+            restrict('year', self.codes_for('year', years))
+        if months is not None:
+            restrict('month', self.codes_for('month', months))
+        if seasons is not None:
+            restrict('season', self.codes_for('season', seasons))
+        if start is not None or end is not None:
+            # Rows are in date order, so a date range is one contiguous slice
+            lo = np.searchsorted(self.days, to_day(start)) if start is not None else 0
+            hi = np.searchsorted(self.days, to_day(end)) if end is not None else self.rows
+            selected = np.zeros(self.rows, dtype=bool)
+            selected[lo:hi] = True
+            mask = selected if mask is None else mask & selected
+        return mask
+
+    def stats(self, by=(), **filters):
+        """count/sum/avg/min/max of Data Value per group of the `by` dimensions, for the filtered rows"""
+        unknown = [name for name in by if name not in DIMENSIONS]
+        if unknown:
+            raise ValueError(f"Unknown dimensions {unknown}; choose from {DIMENSIONS}")
+
+        query = (tuple(by), tuple(sorted((name, self.freeze(value)) for name, value in filters.items()
+                                         if value is not None)))
+        answer = self.answers.get(query)
+        if answer is not None:
+            return answer
+
+        index = self.group_index(by)
+        mask = self.mask(**filters)
+        keys, values = index.keys, index.values
+        if mask is not None:
+            selected = mask[index.order]
+            keys, values = keys[selected], values[selected]
+
+        groups = []
+        if len(keys):
+            starts = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+            counts = np.diff(np.append(starts, len(keys)))
+            sums = np.add.reduceat(values, starts)
+            minimums = np.minimum.reduceat(values, starts)
+            maximums = np.maximum.reduceat(values, starts)
+            codes = index.decode(keys[starts])
+            for i in range(len(starts)):
+                group = {}
+                for name, dimension_codes in zip(by, codes):
+                    group.update(self.labels[name][dimension_codes[i]])
+                group.update(count=int(counts[i]), sum=float(sums[i]), avg=float(sums[i] / counts[i]),
+                             min=float(minimums[i]), max=float(maximums[i]))
+                groups.append(group)
+
+        with self.lock:
+            if len(self.answers) >= CACHE_SIZE:
+                self.answers.pop(next(iter(self.answers)))
+            self.answers[query] = groups
+        return groups
+
+    def series(self, indicator_id, geo_type, geo_join_id, start=None, end=None):
+        """Readings of one indicator at one place, in date order"""
+        index = self.group_index(('indicator', 'place'))
+        indicator = self.lookup['indicator'].get(indicator_id)
+        place = self.lookup['place_id'].get((geo_type, geo_join_id))
+        if indicator is None or place is None:
+            return []
+
+        key = indicator * index.radices[1] + place
+        lo, hi = np.searchsorted(index.keys, [key, key + 1])
+        rows = index.order[lo:hi]
+        days = self.days[rows]
+        if start is not None or end is not None:
+            keep = np.ones(len(rows), dtype=bool)
+            if start is not None:
+                keep &= days >= to_day(start)
+            if end is not None:
+                keep &= days < to_day(end)
+            rows, days = rows[keep], days[keep]
+        dates = (EPOCH + days.astype('timedelta64[D]')).astype(str)
+        return [{'date': day, 'time_period': self.time_periods[row], 'value': float(self.values[row])}
+                for day, row in zip(dates.tolist(), rows.tolist())]
+
+    @staticmethod
+    def freeze(value):
+        if isinstance(value, (list, tuple, set)):
+            return tuple(sorted(value, key=str))
+        return str(value) if isinstance(value, (date, datetime)) else value
+
+
+# Query-string parameter -> (stats filter, value type)
+HTTP_FILTERS = {
+    'indicator': ('indicator_ids', int),
+    'place': ('places', str),
+    'geo_type': ('geo_types', str),
+    'year': ('years', int),
+    'month': ('months', int),
+    'season': ('seasons', str)
+}
+
+
+def parse_filters(params):
+    """stats() keyword arguments from parsed query parameters (comma-separated or repeated)"""
+    filters = {}
+    for param, (name, cast) in HTTP_FILTERS.items():
+        if param in params:
+            filters[name] = [cast(value) for raw in params[param] for value in raw.split(',') if value]
+    for param in ('start', 'end'):
+        if param in params:
+            filters[param] = params[param][-1]
+    return filters
+
+
+class AnalyticsHandler(BaseHTTPRequestHandler):
+    """GET /stats, /trends, /series and /health as JSON"""
+
+    engine = None
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = parse_qs(url.query)
+        started = time.perf_counter()
+        try:
+            if url.path == '/health':
+                body = {'status': 'ok', 'rows': self.engine.rows}
+            elif url.path == '/stats':
+                by = [name for raw in params.get('by', []) for name in raw.split(',') if name]
+                body = {'groups': self.engine.stats(by=by, **parse_filters(params))}
+            elif url.path == '/trends':
+                # Same shape as the backend's getMonthlyTrends
+                body = {'groups': self.engine.stats(by=['year', 'month'], **parse_filters(params))}
+            elif url.path == '/series':
+                body = {'readings': self.engine.series(
+                    int(params['indicator'][-1]), params['geo_type'][-1], int(params['geo_join_id'][-1]),
+                    start=params.get('start', [None])[-1], end=params.get('end', [None])[-1]
+                )}
+            else:
+                self.send_json(404, {'error': f"Unknown path {url.path}"})
+                return
+        except (KeyError, ValueError) as e:
+            self.send_json(400, {'error': f"Bad request: {e}"})
+            return
+        body['took_ms'] = (time.perf_counter() - started) * 1000
+        self.send_json(200, body)
+
+    def send_json(self, status, body):
+        payload = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        # One line per request is noise for a dashboard polling every few seconds
+        pass
+
+
+def serve(engine, host='127.0.0.1', port=8765):
+    handler = type('BoundAnalyticsHandler', (AnalyticsHandler,), {'engine': engine})
+    server = ThreadingHTTPServer((host, port), handler)
+    print(f"📡 Analytics service on http://{host}:{server.server_port} ({engine.rows:,} rows)")
+    print("  GET /stats?by=indicator,year&indicator=375&start=2015-01-01")
+    print("  GET /trends?year=2015    GET /series?indicator=375&geo_type=CD&geo_join_id=407")
+    return server
+
+
+def load_engine(args):
+    started = time.perf_counter()
+    if args.snapshot:
+        engine = AnalyticsEngine.from_snapshot(args.snapshot)
+    else:
+        engine = AnalyticsEngine.from_csv(args.csv, use_cache=not args.no_cache, cache_dir=args.cache_dir)
+    print(f"⚡ Loaded {engine.rows:,} rows in {time.perf_counter() - started:.2f}s")
+    return engine
+
+
+def run(args):
+    """Run the analytics query or service, returning an exit code"""
+    try:
+        engine = load_engine(args)
+    except Exception as e:
+        print(f"❌ Cannot load data: {e}")
+        return 1
+
+    if args.command == 'serve':
+        server = serve(engine, args.host, args.port)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+        return 0
+
+    filters = {
+        'indicator_ids': args.indicator, 'places': args.place, 'geo_types': args.geo_type,
+        'years': args.year, 'months': args.month, 'seasons': args.season, 'start': args.start, 'end': args.end
+    }
+    started = time.perf_counter()
+    groups = engine.stats(by=args.by, **filters)
+    took = (time.perf_counter() - started) * 1000
+    print(f"📊 {len(groups):,} groups in {took:.2f} ms")
+    if groups:
+        print(pd.DataFrame(groups).drop(columns=['sum']).to_string(index=False))
+    return 0
+
+
+def add_arguments(parser):
+    parser.add_argument("--csv", default="Air_Quality_20250613.csv",
+                        help="Source CSV (the pre-parsed cache is used when current)")
+    parser.add_argument("--snapshot", metavar="DIR", help="Load a columnar snapshot instead of the CSV")
+    parser.add_argument("--no-cache", action="store_true", help="Parse the CSV even if a cache entry exists")
+    parser.add_argument("--cache-dir", metavar="DIR", help="Pre-parsed cache location (default: .gofetch_cache)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    query_parser = commands.add_parser("query", help="Print grouped statistics")
+    query_parser.add_argument("--by", nargs="*", default=[], choices=DIMENSIONS, help="Dimensions to group by")
+    query_parser.add_argument("--indicator", type=int, action="append", help="Indicator ID (repeatable)")
+    query_parser.add_argument("--place", action="append", help="Geo Place Name (repeatable)")
+    query_parser.add_argument("--geo-type", action="append", help="Geo Type Name (repeatable)")
+    query_parser.add_argument("--year", type=int, action="append", help="Year (repeatable)")
+    query_parser.add_argument("--month", type=int, action="append", help="Month 1-12 (repeatable)")
+    query_parser.add_argument("--season", action="append", choices=SEASONS, help="Season (repeatable)")
+    query_parser.add_argument("--start", help="First Start_Date included (YYYY-MM-DD)")
+    query_parser.add_argument("--end", help="First Start_Date excluded (YYYY-MM-DD)")
+
+    serve_parser = commands.add_parser("serve", help="Serve the statistics over local HTTP")
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=8765)
+    return parser
+
+
+def main(argv=None):
+    parser = add_arguments(argparse.ArgumentParser(description="Query GoFetch air quality data in memory"))
+    return run(parser.parse_args(argv))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,316 @@
+"""
+Benchmark command: time each stage of the import pipeline, and keep the numbers.
+
+Stages are timed separately, so a change shows up in the stage it affects:
+
+    parse        read_csv of the whole source
+    prepare      schema validation, derived fields (and --memory-efficient, if set)
+    documents    build_documents() for every row
+    insert       insert_many batches into an empty collection without secondary indexes
+    index_build  create_indexes() on the loaded collection
+    upsert       ReplaceOne upserts of every row again, keyed on the Unique ID index
+
+The source is a real CSV (--csv) or synthetic data at one or more scales (--rows). The
+synthetic data comes from synthetic.py and is cached under .gofetch_cache/benchmark/.
+The write stages are repeated for each --workers count, on a fresh collection each
+time, so results can be used to size the writer pool. Writes go to a scratch
+database on a local mongod by default (MONGODB_BENCHMARK_URI). The database is
+dropped afterwards.
+
+Each run appends one JSON line per scale × workers combination to
+benchmark_results.jsonl. A run is compared with the latest earlier run that used the
+same source, scale, batch size and workers. Stages that became slower than
+--threshold are flagged. With --fail-on-regression, the command exits with 1 when
+any stage regresses.
+
+Usage:
+    python -m gofetch_import benchmark --rows 18000 100000 1000000 --workers 1 4 8
+    python -m gofetch_import benchmark --csv Air_Quality_20250613.csv --label "before raw bson"
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import pandas as pd
+import pymongo
+
+from .client import DEFAULT_URI, close_client, get_client
+from .importer import SOURCE_DTYPES, GoFetchMongoImporter
+from .prepared_cache import CACHE_DIR_NAME
+from .sources import read_csv
+from .synthetic import load_profile, write_synthetic_csv
+
+BENCHMARK_DB = 'gofetch_benchmark'
+BENCHMARK_COLLECTION = 'air_quality_benchmark'
+RESULTS_FILE = 'benchmark_results.jsonl'
+STAGES = ['parse', 'prepare', 'documents', 'insert', 'index_build', 'upsert']
+# Rows converted to documents at a time, so a 10M-row run never holds every document
+SLICE_ROWS = 100000
+
+
+def record(results, stage, rows, seconds):
+    """Add `seconds` of work on `rows` rows to a stage's timing"""
+    timing = results.setdefault(stage, {'seconds': 0.0, 'rows': 0})
+    timing['seconds'] += seconds
+    timing['rows'] += rows
+    timing['rows_per_sec'] = timing['rows'] / timing['seconds'] if timing['seconds'] else None
+
+
+def timed(fn):
+    """Run fn, returning (value, seconds)"""
+    started = time.perf_counter()
+    value = fn()
+    return value, time.perf_counter() - started
+
+
+def synthetic_source(rows, seed, data_dir, profile_csv):
+    """Path of the synthetic dataset for this scale, generated on first use"""
+    path = os.path.join(data_dir, f"synthetic-{rows}-{seed}.csv.gz")
+    if not os.path.exists(path):
+        os.makedirs(data_dir, exist_ok=True)
+        print(f"🧪 Generating {rows:,} synthetic rows into {path}...")
+        # Written under a temporary name so an interrupted run never leaves a short dataset behind
+        partial = os.path.join(data_dir, f".synthetic-{rows}-{seed}.partial.csv.gz")
+        write_synthetic_csv(partial, rows, seed, profile=load_profile(profile_csv))
+        os.replace(partial, path)
+    return path
+
+
+def write_batches(importer, batches, workers, update_existing=False):
+    """Write prebuilt batches with `workers` threads, returning the number of documents written"""
+    if workers > 1:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="benchmark-writer") as pool:
+            results = list(pool.map(lambda batch: importer.write_batch(batch, update_existing), batches))
+    else:
+        results = [importer.write_batch(batch, update_existing) for batch in batches]
+    return sum(inserted + updated for inserted, updated in results)
+
+
+def iter_slices(df, batch_size):
+    """(slice, list of batch row ranges) pairs over the prepared frame"""
+    for start in range(0, len(df), SLICE_ROWS):
+        part = df.iloc[start:start + SLICE_ROWS]
+        yield part, [(i, i + batch_size) for i in range(0, len(part), batch_size)]
+
+
+def benchmark_writes(importer, df, batch_size, workers):
+    """Time the document, insert, index build and upsert stages on a fresh collection"""
+    results = {}
+    importer.collection.drop()
+
+    for part, ranges in iter_slices(df, batch_size):
+        documents, seconds = timed(lambda: importer.to_documents(part))
+        record(results, 'documents', len(part), seconds)
+        batches = [documents[start:stop] for start, stop in ranges]
+        _, seconds = timed(lambda: write_batches(importer, batches, workers))
+        record(results, 'insert', len(part), seconds)
+
+    _, seconds = timed(importer.create_indexes)
+    record(results, 'index_build', len(df), seconds)
+
+    for part, ranges in iter_slices(df, batch_size):
+        documents = importer.to_documents(part, update_existing=True)
+        batches = [documents[start:stop] for start, stop in ranges]
+        _, seconds = timed(lambda: write_batches(importer, batches, workers, update_existing=True))
+        record(results, 'upsert', len(part), seconds)
+
+    return results
+
+
+def benchmark_source(importer, source, batch_size, workers_counts):
+    """Time every stage for one source file, returning {workers: {stage: timing}}"""
+    results = {}
+
+    df, seconds = timed(lambda: read_csv(source, dtype=SOURCE_DTYPES))
+    record(results, 'parse', len(df), seconds)
+    rows = len(df)
+    df, seconds = timed(lambda: importer.optimize_memory(importer.prepare_frame(df)))
+    record(results, 'prepare', rows, seconds)
+
+    runs = {}
+    for workers in workers_counts:
+        print(f"  🧵 Timing writes with {workers} worker(s)...")
+        runs[workers] = dict(results, **benchmark_writes(importer, df, batch_size, workers))
+    return runs
+
+
+def git_commit():
+    """Commit the benchmark ran against, when run from a git checkout"""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip() or None
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment(client):
+    try:
+        server = client.server_info().get('version')
+    except Exception:
+        server = None
+    return {
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'pymongo': pymongo.version,
+        'mongodb': server,
+        'platform': platform.platform(),
+        'cpus': os.cpu_count()
+    }
+
+
+def load_results(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding='utf-8') as handle:
+        return [json.loads(line) for line in handle if line.strip()]
+
+
+def append_results(path, entries):
+    with open(path, 'a', encoding='utf-8') as handle:
+        for entry in entries:
+            handle.write(json.dumps(entry) + '\n')
+
+
+def comparable(entry, other):
+    keys = ('source', 'rows', 'batch_size', 'workers', 'raw_bson', 'memory_efficient')
+    return all(entry.get(key) == other.get(key) for key in keys)
+
+
+def compare(entry, history, threshold):
+    """Print each stage against the latest comparable run, returning the regressed stages"""
+    previous = next((old for old in reversed(history) if comparable(entry, old)), None)
+    if previous is None:
+        print("  🆕 No earlier comparable run to compare with")
+        return []
+
+    print(f"  📊 Compared with {previous['timestamp']} ({previous.get('label') or previous.get('commit') or 'unlabelled'}):")
+    regressed = []
+    for stage in STAGES:
+        now, before = entry['stages'].get(stage), previous['stages'].get(stage)
+        if not now or not before or not before['seconds']:
+            continue
+        change = (now['seconds'] - before['seconds']) / before['seconds']
+        flag = '⚠️' if change > threshold else '✅'
+        print(f"    {flag} {stage}: {before['seconds']:.3f}s → {now['seconds']:.3f}s ({change:+.1%})")
+        if change > threshold:
+            regressed.append(stage)
+    return regressed
+
+
+def print_results(entry):
+    print(f"\n⏱️ {entry['rows']:,} rows, batch size {entry['batch_size']}, {entry['workers']} worker(s):")
+    for stage in STAGES:
+        timing = entry['stages'].get(stage)
+        if timing is None:
+            continue
+        rate = f"{timing['rows_per_sec']:,.0f} rows/s" if timing['rows_per_sec'] else "n/a"
+        print(f"  • {stage}: {timing['seconds']:.3f}s ({rate})")
+
+
+def run(args):
+    """Run the benchmark suite, returning an exit code"""
+    if args.csv:
+        sources = [(args.csv, args.csv)]
+    else:
+        sources = [(f"synthetic:{args.seed}", synthetic_source(rows, args.seed, args.data_dir, args.profile_csv))
+                   for rows in args.rows]
+
+    importer = GoFetchMongoImporter(
+        max_pool_size=max(max(args.workers) * 2, 100),
+        raw_bson=args.raw_bson,
+        maintain_latest=False,
+        memory_efficient=args.memory_efficient
+    )
+    try:
+        print(f"🔌 Connecting to the benchmark server {args.uri}...")
+        importer.client = get_client(args.uri, maxPoolSize=importer.max_pool_size)
+        importer.client.admin.command('ping')
+    except Exception as e:
+        print(f"❌ Cannot benchmark without a MongoDB connection: {e}")
+        return 1
+    importer.db = importer.client[BENCHMARK_DB]
+    importer.collection = importer.db[BENCHMARK_COLLECTION]
+
+    history = load_results(args.results)
+    commit = git_commit()
+    env = environment(importer.client)
+    entries = []
+    regressed = []
+    try:
+        for source, path in sources:
+            print(f"\n🏁 Benchmarking {path}...")
+            for workers, stages in benchmark_source(importer, path, args.batch_size, args.workers).items():
+                entry = {
+                    'timestamp': datetime.now().isoformat(timespec='seconds'),
+                    'label': args.label,
+                    'commit': commit,
+                    'source': source,
+                    'rows': stages['parse']['rows'],
+                    'batch_size': args.batch_size,
+                    'workers': workers,
+                    'raw_bson': args.raw_bson,
+                    'memory_efficient': args.memory_efficient,
+                    'stages': stages,
+                    'environment': env
+                }
+                print_results(entry)
+                regressed += compare(entry, history, args.threshold)
+                entries.append(entry)
+    except Exception as e:
+        print(f"❌ Benchmark failed: {e}")
+        return 1
+    finally:
+        if entries:
+            append_results(args.results, entries)
+            print(f"\n📝 {len(entries)} result(s) appended to {args.results}")
+        if not args.keep:
+            importer.client.drop_database(BENCHMARK_DB)
+        close_client(importer.client)
+
+    if regressed and args.fail_on_regression:
+        print(f"❌ Regressed stages: {sorted(set(regressed))}")
+        return 1
+    return 0
+
+
+def add_arguments(parser):
+    parser.add_argument("--rows", type=int, nargs="+", default=[100000],
+                        help="Synthetic dataset sizes to benchmark (e.g. 18000 1000000 10000000)")
+    parser.add_argument("--csv", help="Benchmark this CSV instead of synthetic data")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the synthetic data")
+    parser.add_argument("--profile-csv", default="Air_Quality_20250613.csv",
+                        help="Real export the synthetic data is modelled on")
+    parser.add_argument("--data-dir", default=os.path.join(CACHE_DIR_NAME, "benchmark"),
+                        help="Where generated datasets are kept between runs")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Documents per write batch")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1],
+                        help="Writer thread counts to time the write stages with")
+    parser.add_argument("--raw-bson", action="store_true", help="Insert pre-encoded RawBSONDocuments")
+    parser.add_argument("--memory-efficient", action="store_true", help="Time the memory-efficient preparation")
+    parser.add_argument("--uri", default=os.getenv('MONGODB_BENCHMARK_URI', DEFAULT_URI),
+                        help="Server to benchmark against (default: MONGODB_BENCHMARK_URI or local mongod)")
+    parser.add_argument("--results", default=RESULTS_FILE, help="JSON Lines file the results are appended to")
+    parser.add_argument("--label", help="Name for this run in the results file")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Slowdown against the previous comparable run that counts as a regression")
+    parser.add_argument("--fail-on-regression", action="store_true",
+                        help="Exit with 1 when a stage regressed beyond --threshold")
+    parser.add_argument("--keep", action="store_true",
+                        help=f"Keep the {BENCHMARK_DB} database after the run")
+    return parser
+
+
+def main(argv=None):
+    parser = add_arguments(argparse.ArgumentParser(description="Benchmark the GoFetch import pipeline"))
+    return run(parser.parse_args(argv))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
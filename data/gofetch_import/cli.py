@@ -0,0 +1,84 @@
+"""
+GoFetch data command line.
+
+Usage (from the data/ directory):
+    python -m gofetch_import load [--stream] [--csv FILE ...]   # import CSV exports
+    python -m gofetch_import sync [--delete-removed]            # incremental refresh
+    python -m gofetch_import rollups                            # rebuild dashboard rollups
+    python -m gofetch_import forecast [--backtest]              # retrain the predictions collection
+    python -m gofetch_import verify                             # health report of the import
+    python -m gofetch_import benchmark [--rows N ...]           # time the pipeline stages
+    python -m gofetch_import generate --rows N                  # write a synthetic export
+    python -m gofetch_import analytics serve                    # in-memory statistics over HTTP
+
+Every command connects through the shared client factory in client.py.
+"""
+
+import argparse
+import sys
+
+from . import analytics, benchmark, forecast, load, synthetic, verify
+from .client import close_client, database_name, get_client
+from .rollups import build_rollups
+
+
+def run_rollups(args):
+    """Rebuild every rollup collection, returning an exit code"""
+    client = get_client()
+    try:
+        print("📊 Building rollup collections...")
+        build_rollups(client[database_name()][args.collection])
+        print("✅ Rollups complete!")
+        return 0
+    except Exception as e:
+        print(f"❌ Error building rollups: {e}")
+        return 1
+    finally:
+        close_client(client)
+
+
+def run_sync(args):
+    args.incremental = True
+    return load.run(args)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m gofetch_import",
+                                     description="GoFetch air quality data tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    load_parser = commands.add_parser("load", help="Import CSV exports into MongoDB")
+    load.add_arguments(load_parser).set_defaults(handler=load.run)
+
+    sync_parser = commands.add_parser("sync", help="Write only new or changed rows (same options as load)")
+    load.add_arguments(sync_parser).set_defaults(handler=run_sync)
+
+    rollups_parser = commands.add_parser("rollups", help="Rebuild the dashboard rollup collections")
+    rollups_parser.add_argument("--collection", default="air_quality_data", help="Source collection")
+    rollups_parser.set_defaults(handler=run_rollups)
+
+    forecast_parser = commands.add_parser("forecast", help="Retrain the per-series forecasts in the predictions collection")
+    forecast.add_arguments(forecast_parser).set_defaults(handler=forecast.run)
+
+    verify_parser = commands.add_parser("verify", help="Check an import against the backend's fields")
+    verify.add_arguments(verify_parser).set_defaults(handler=verify.run)
+
+    benchmark_parser = commands.add_parser("benchmark", help="Time the import pipeline stages and record the results")
+    benchmark.add_arguments(benchmark_parser).set_defaults(handler=benchmark.run)
+
+    generate_parser = commands.add_parser("generate", help="Write synthetic NYC air quality data at any scale")
+    synthetic.add_arguments(generate_parser).set_defaults(handler=synthetic.run)
+
+    analytics_parser = commands.add_parser("analytics", help="Query the data in memory, or serve the queries over HTTP")
+    analytics.add_arguments(analytics_parser).set_defaults(handler=analytics.run)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+"""
+Shared MongoDB client factory for every GoFetch data job.
+
+A MongoClient owns a connection pool, so each process should create one per
+cluster and share it between threads. get_client() hands out that one client,
+built from the same tuned settings everywhere:
+
+    maxPoolSize / minPoolSize   MONGODB_MAX_POOL_SIZE (100), MONGODB_MIN_POOL_SIZE (0)
+    compressors                 MONGODB_COMPRESSORS, default: zstd/snappy when their
+                                packages are installed, then zlib
+    timeouts                    MONGODB_SERVER_SELECTION_TIMEOUT_MS (10s),
+                                MONGODB_CONNECT_TIMEOUT_MS (10s),
+                                MONGODB_SOCKET_TIMEOUT_MS (120s, bulk writes can be slow)
+    write concern               MONGODB_WRITE_CONCERN ('majority'): checkpointed batches
+                                must survive a failover, or a resume would skip lost rows
+    retryable reads and writes  on
+
+Keyword arguments override any of these per call (e.g. a larger pool for parallel loads).
+
+get_async_client() builds an AsyncMongoClient (pymongo 4.10+) with the same settings for the
+pipelined importer. Async clients belong to the event loop they were created on, so they
+are not shared: the caller closes it with `await client.close()`.
+"""
+
+import os
+import threading
+
+from dotenv import load_dotenv
+from pymongo import MongoClient
+
+# Load environment variables
+load_dotenv()
+
+DEFAULT_URI = 'mongodb://localhost:27017/'
+DEFAULT_DB = 'datainsight_db'
+
+_clients = {}
+_lock = threading.Lock()
+
+
+def connection_uri():
+    """MONGODB_URI (Atlas) or the local server"""
+    return os.getenv('MONGODB_URI') or DEFAULT_URI
+
+
+def database_name():
+    """MONGODB_DB on Atlas (MONGODB_URI set); the local server always uses datainsight_db"""
+    if os.getenv('MONGODB_URI'):
+        return os.getenv('MONGODB_DB', DEFAULT_DB)
+    return DEFAULT_DB
+
+
+def available_compressors():
+    """Wire compressors in preference order, limited to what this Python can decode"""
+    compressors = []
+    try:
+        import zstandard  # noqa: F401
+        compressors.append('zstd')
+    except ImportError:
+        pass
+    try:
+        import snappy  # noqa: F401
+        compressors.append('snappy')
+    except ImportError:
+        pass
+    compressors.append('zlib')
+    return compressors
+
+
+def write_concern():
+    value = os.getenv('MONGODB_WRITE_CONCERN', 'majority')
+    return int(value) if value.isdigit() else value
+
+
+def client_options(**overrides):
+    """Tuned MongoClient keyword arguments, from the environment plus overrides"""
+    options = {
+        'maxPoolSize': int(os.getenv('MONGODB_MAX_POOL_SIZE', '100')),
+        'minPoolSize': int(os.getenv('MONGODB_MIN_POOL_SIZE', '0')),
+        'compressors': os.getenv('MONGODB_COMPRESSORS') or ','.join(available_compressors()),
+        'serverSelectionTimeoutMS': int(os.getenv('MONGODB_SERVER_SELECTION_TIMEOUT_MS', '10000')),
+        'connectTimeoutMS': int(os.getenv('MONGODB_CONNECT_TIMEOUT_MS', '10000')),
+        'socketTimeoutMS': int(os.getenv('MONGODB_SOCKET_TIMEOUT_MS', '120000')),
+        'w': write_concern(),
+        'retryWrites': True,
+        'retryReads': True,
+        'appname': 'gofetch-import'
+    }
+    options.update(overrides)
+    return options
+
+
+def get_client(uri=None, **overrides):
+    """The shared MongoClient for uri and these options, created on first use"""
+    uri = uri or connection_uri()
+    options = client_options(**overrides)
+    key = (uri, tuple(sorted((name, str(value)) for name, value in options.items())))
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            client = MongoClient(uri, **options)
+            _clients[key] = client
+        return client
+
+
+def get_async_client(uri=None, **overrides):
+    """A new AsyncMongoClient with the tuned settings, for use on the running event loop"""
+    from pymongo import AsyncMongoClient
+    return AsyncMongoClient(uri or connection_uri(), **client_options(**overrides))
+
+
+def get_database(uri=None, name=None, **overrides):
+    """Shortcut for the configured database on the shared client"""
+    return get_client(uri, **overrides)[name or database_name()]
+
+
+def close_client(client):
+    """Close a client from get_client() and forget it, so the next call builds a fresh one"""
+    with _lock:
+        for key, cached in list(_clients.items()):
+            if cached is client:
+                del _clients[key]
+    client.close()
+
+
+def close_all():
+    with _lock:
+        clients = list(_clients.values())
+        _clients.clear()
+    for client in clients:
+        client.close()
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Compact Storage Mode: Dimension Collections and Integer-Coded Facts
+================================================================
+
+The wide documents repeat long strings on every row (Name, Measure, Measure Info,
+Geo Type Name, Geo Place Name, Time Period, an empty Message) and carry both
+Start_Date and Date plus a per-row import_timestamp. In compact mode those strings
+live once in small dimension collections and each fact keeps only codes, the date and
+the value:
+
+    dim_indicators  {_id: Indicator ID, name, measure, measure_info}
+    dim_places      {_id: place code, geo_type, geo_join_id, geo_place_name}
+    dim_periods     {_id: period code, time_period}
+    air_quality_facts
+                    {_id: Unique ID, i: indicator, p: place code, t: period code,
+                     d: Start_Date, v: Data Value}
+
+Null fields are omitted. Place and period codes are assigned once and reused on later
+runs, so facts from different imports stay comparable.
+
+expand() / expand_pipeline() turn facts back into the field names API consumers use.
+
+Usage:
+    python -m gofetch_import load --storage compact
+"""
+
+import pandas as pd
+from pymongo import ReplaceOne
+from pymongo.errors import BulkWriteError
+
+FACTS_COLLECTION = 'air_quality_facts'
+INDICATORS_COLLECTION = 'dim_indicators'
+PLACES_COLLECTION = 'dim_places'
+PERIODS_COLLECTION = 'dim_periods'
+
+DUPLICATE_KEY_ERROR = 11000
+
+
+class CompactStore:
+    """Reads and writes the normalized representation of the air quality data"""
+
+    def __init__(self, db):
+        self.db = db
+        self.facts = db[FACTS_COLLECTION]
+        self.indicators = {}
+        self.places = {}
+        self.periods = {}
+        self.load_dimensions()
+
+    def load_dimensions(self):
+        """Cache the dimension collections (they hold at most a few hundred documents)"""
+        self.indicators = {doc['_id']: doc for doc in self.db[INDICATORS_COLLECTION].find()}
+        self.places = {doc['_id']: doc for doc in self.db[PLACES_COLLECTION].find()}
+        self.periods = {doc['_id']: doc for doc in self.db[PERIODS_COLLECTION].find()}
+        self.place_codes = {(doc['geo_type'], doc['geo_join_id']): code for code, doc in self.places.items()}
+        self.period_codes = {doc['time_period']: code for code, doc in self.periods.items()}
+
+    def ensure_indexes(self):
+        """Indexes mirroring the backend query shapes, on the short field names"""
+        self.facts.create_index([('d', -1)])
+        self.facts.create_index([('i', 1), ('d', 1)])
+        self.facts.create_index([('p', 1), ('d', -1)])
+        self.facts.create_index([('v', -1)])
+
+    def update_dimensions(self, df):
+        """Add unseen indicators, places and periods, assigning new codes after the current maximum"""
+        operations = {INDICATORS_COLLECTION: [], PLACES_COLLECTION: [], PERIODS_COLLECTION: []}
+
+        indicators = df[['Indicator ID', 'Name', 'Measure', 'Measure Info']].drop_duplicates('Indicator ID')
+        for indicator_id, name, measure, measure_info in indicators.itertuples(index=False):
+            indicator_id = int(indicator_id)
+            doc = {'_id': indicator_id, 'name': name, 'measure': measure, 'measure_info': measure_info}
+            if self.indicators.get(indicator_id) != doc:
+                self.indicators[indicator_id] = doc
+                operations[INDICATORS_COLLECTION].append(ReplaceOne({'_id': indicator_id}, doc, upsert=True))
+
+        places = df[['Geo Type Name', 'Geo Join ID', 'Geo Place Name']].drop_duplicates(['Geo Type Name', 'Geo Join ID'])
+        next_code = max(self.places, default=0) + 1
+        for geo_type, geo_join_id, geo_place_name in places.itertuples(index=False):
+            key = (geo_type, int(geo_join_id))
+            code = self.place_codes.get(key)
+            if code is None:
+                code, next_code = next_code, next_code + 1
+                self.place_codes[key] = code
+            doc = {'_id': code, 'geo_type': key[0], 'geo_join_id': key[1], 'geo_place_name': geo_place_name}
+            if self.places.get(code) != doc:
+                self.places[code] = doc
+                operations[PLACES_COLLECTION].append(ReplaceOne({'_id': code}, doc, upsert=True))
+
+        next_code = max(self.periods, default=0) + 1
+        for time_period in df['Time Period'].drop_duplicates().tolist():
+            if time_period not in self.period_codes:
+                code, next_code = next_code, next_code + 1
+                self.period_codes[time_period] = code
+                self.periods[code] = {'_id': code, 'time_period': time_period}
+                operations[PERIODS_COLLECTION].append(
+                    ReplaceOne({'_id': code}, self.periods[code], upsert=True)
+                )
+
+        for name, ops in operations.items():
+            if ops:
+                self.db[name].bulk_write(ops, ordered=False)
+
+    def encode(self, df):
+        """Turn a prepared frame into compact fact documents (codes, date, value; no nulls)"""
+        self.update_dimensions(df)
+
+        place_index = pd.MultiIndex.from_tuples(list(self.place_codes), names=['Geo Type Name', 'Geo Join ID'])
+        place_lookup = pd.Series(list(self.place_codes.values()), index=place_index)
+        place_codes = place_lookup.reindex(
+            pd.MultiIndex.from_arrays([df['Geo Type Name'], df['Geo Join ID'].astype('int64')])
+        ).to_numpy()
+        period_codes = df['Time Period'].map(self.period_codes).to_numpy()
+
+        ids = df['Unique ID'].astype('int64').tolist()
+        indicators = df['Indicator ID'].astype('int64').tolist()
+        places = place_codes.astype('int64').tolist()
+        periods = period_codes.astype('int64').tolist()
+        dates = df['Start_Date'].to_numpy(dtype='datetime64[us]').astype(object).tolist()
+        values = df['Data Value'].to_numpy(dtype='float64').tolist()
+
+        documents = []
+        for uid, i, p, t, d, v in zip(ids, indicators, places, periods, dates, values):
+            doc = {'_id': uid, 'i': i, 'p': p, 't': t}
+            if d is not None:
+                doc['d'] = d
+            if v == v:  # NaN is the only value not equal to itself
+                doc['v'] = v
+            documents.append(doc)
+        return documents
+
+    def write(self, df, batch_size=1000, upsert=False):
+        """Write a prepared frame as compact facts, returning (written, duplicates)"""
+        documents = self.encode(df)
+        written = duplicates = 0
+        for i in range(0, len(documents), batch_size):
+            batch = documents[i:i + batch_size]
+            if upsert:
+                result = self.facts.bulk_write(
+                    [ReplaceOne({'_id': doc['_id']}, doc, upsert=True) for doc in batch], ordered=False
+                )
+                written += result.upserted_count + result.modified_count
+                continue
+            try:
+                written += len(self.facts.insert_many(batch, ordered=False).inserted_ids)
+            except BulkWriteError as bwe:
+                details = bwe.details
+                written += details.get('nInserted', 0)
+                errors = details.get('writeErrors', [])
+                duplicates += sum(1 for err in errors if err.get('code') == DUPLICATE_KEY_ERROR)
+                if any(err.get('code') != DUPLICATE_KEY_ERROR for err in errors):
+                    raise
+        return written, duplicates
+
+    def expand(self, facts):
+        """Expand compact facts back into the wide field names the API returns"""
+        expanded = []
+        for fact in facts:
+            indicator = self.indicators.get(fact.get('i'), {})
+            place = self.places.get(fact.get('p'), {})
+            period = self.periods.get(fact.get('t'), {})
+            expanded.append({
+                'Unique ID': fact.get('_id'),
+                'Indicator ID': fact.get('i'),
+                'Name': indicator.get('name'),
+                'Measure': indicator.get('measure'),
+                'Measure Info': indicator.get('measure_info'),
+                'Geo Type Name': place.get('geo_type'),
+                'Geo Join ID': place.get('geo_join_id'),
+                'Geo Place Name': place.get('geo_place_name'),
+                'Time Period': period.get('time_period'),
+                'Start_Date': fact.get('d'),
+                'Data Value': fact.get('v')
+            })
+        return expanded
+
+    def find(self, query=None, sort=None, limit=0):
+        """Query facts by their short field names and return expanded documents"""
+        cursor = self.facts.find(query or {})
+        if sort:
+            cursor = cursor.sort(sort)
+        if limit:
+            cursor = cursor.limit(limit)
+        return self.expand(cursor)
+
+
+def expand_pipeline():
+    """Aggregation stages that expand facts server-side with $lookup (for the Node backend)"""
+    return [
+        {'$lookup': {'from': INDICATORS_COLLECTION, 'localField': 'i', 'foreignField': '_id', 'as': 'indicator'}},
+        {'$lookup': {'from': PLACES_COLLECTION, 'localField': 'p', 'foreignField': '_id', 'as': 'place'}},
+        {'$lookup': {'from': PERIODS_COLLECTION, 'localField': 't', 'foreignField': '_id', 'as': 'period'}},
+        {'$set': {
+            'indicator': {'$first': '$indicator'},
+            'place': {'$first': '$place'},
+            'period': {'$first': '$period'}
+        }},
+        {'$project': {
+            '_id': 0,
+            'Unique ID': '$_id',
+            'Indicator ID': '$i',
+            'Name': '$indicator.name',
+            'Measure': '$indicator.measure',
+            'Measure Info': '$indicator.measure_info',
+            'Geo Type Name': '$place.geo_type',
+            'Geo Join ID': '$place.geo_join_id',
+            'Geo Place Name': '$place.geo_place_name',
+            'Time Period': '$period.time_period',
+            'Start_Date': '$d',
+            'Data Value': '$v'
+        }}
+    ]
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Memory-Efficient Layout for Prepared GoFetch Frames
+================================================================
+
+The prepared frame keeps every text column as one Python string per row and every
+number as int64/float64. Most of those columns repeat a few hundred values at most and
+the integers are small, so with --memory-efficient the importer converts:
+
+    Name, Measure, Measure Info, Geo Type Name,
+    Geo Place Name, Time Period, Message          -> category (when low-cardinality)
+    Unique ID, Geo Join ID                         -> int32
+    Indicator ID, year, day_of_year                -> int16
+    month                                          -> int8
+
+Each integer target is only applied when the column has no missing values and every
+value fits. Data Value stays float64: readings like 23.97 don't survive a float32 round
+trip, and MongoDB stores doubles anyway. content_hash is computed before this step and
+is left untouched.
+
+memory_report() gives the per-column footprint so the budget of an import worker can be
+checked before the load starts.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Repeated text: stored once per distinct value as a category
+CATEGORY_COLUMNS = [
+    'Name',
+    'Measure',
+    'Measure Info',
+    'Geo Type Name',
+    'Geo Place Name',
+    'Time Period',
+    'Message'
+]
+
+# Convert text to a category only if it has at most this many distinct values per row
+MAX_CATEGORY_RATIO = 0.5
+
+# Fixed targets (not inferred per frame) so streamed chunks get the same dtypes
+INTEGER_COLUMNS = {
+    'Unique ID': np.int32,
+    'Geo Join ID': np.int32,
+    'Indicator ID': np.int16,
+    'year': np.int16,
+    'day_of_year': np.int16,
+    'month': np.int8
+}
+
+
+def is_text(series):
+    """Plain string columns (object or pandas string dtype); categories are already compact"""
+    dtype = series.dtype
+    return not isinstance(dtype, pd.CategoricalDtype) and (dtype == object or pd.api.types.is_string_dtype(dtype))
+
+
+def fits(series, dtype):
+    """True when every value of a complete integral column is representable in dtype"""
+    if series.isna().any():
+        return False
+    values = series.to_numpy()
+    if pd.api.types.is_float_dtype(values.dtype) and not np.array_equal(values, np.trunc(values)):
+        return False
+    limits = np.iinfo(dtype)
+    return len(values) == 0 or (values.min() >= limits.min and values.max() <= limits.max)
+
+
+def optimize_frame(df, max_category_ratio=MAX_CATEGORY_RATIO):
+    """Convert low-cardinality text to categories and downcast integer columns in place"""
+    for column in CATEGORY_COLUMNS:
+        if column not in df.columns or not is_text(df[column]):
+            continue
+        if df[column].nunique(dropna=True) <= max(1, len(df) * max_category_ratio):
+            df[column] = df[column].astype('category')
+
+    for column, dtype in INTEGER_COLUMNS.items():
+        if column in df.columns and df[column].dtype != dtype and fits(df[column], dtype):
+            df[column] = df[column].astype(dtype)
+    return df
+
+
+def memory_report(df):
+    """Per-column dtype and deep memory usage in bytes"""
+    usage = df.memory_usage(deep=True, index=False)
+    return {column: {'dtype': str(df[column].dtype), 'bytes': int(usage[column])} for column in df.columns}
+
+
+def print_memory_report(before, after, budget_mb=None):
+    """Print the per-column footprint before and after optimize_frame()
+
+    Returns False when the optimized frame is over budget_mb.
+    """
+    total_before = sum(entry['bytes'] for entry in before.values())
+    total_after = sum(entry['bytes'] for entry in after.values())
+
+    print("🧠 Prepared frame memory by column:")
+    for column, entry in sorted(after.items(), key=lambda item: -item[1]['bytes']):
+        old = before.get(column, entry)
+        share = entry['bytes'] / total_after * 100 if total_after else 0
+        change = f"{old['dtype']} → {entry['dtype']}" if old['dtype'] != entry['dtype'] else entry['dtype']
+        print(f"  • {column}: {old['bytes'] / 1e6:.2f} MB → {entry['bytes'] / 1e6:.2f} MB "
+              f"({share:.1f}%, {change})")
+    print(f"  📉 Total: {total_before / 1e6:.2f} MB → {total_after / 1e6:.2f} MB")
+
+    if budget_mb is not None and total_after > budget_mb * 1e6:
+        print(f"  ⚠️ Over the {budget_mb:,.0f} MB memory budget")
+        return False
+    return True
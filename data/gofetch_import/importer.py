@@ -0,0 +1,1426 @@
+"""
+GoFetchMongoImporter: loads NYC air quality CSV exports into MongoDB.
+
+Covers data preparation (schema validation, the pre-parsed cache, the memory-efficient
+layout), batch and parallel writes with checkpoints, the wide/compact/time-series storage
+layouts, incremental sync, index strategies and query testing. The command line lives in
+load.py (python -m gofetch_import load).
+"""
+
+import pandas as pd
+import numpy as np
+import bson
+from bson import ObjectId
+from bson.raw_bson import RawBSONDocument
+from pymongo import IndexModel, ReplaceOne, UpdateOne
+from pymongo.errors import BulkWriteError, ConnectionFailure
+from datetime import datetime
+import os
+import json
+import asyncio
+import queue
+import threading
+import time
+
+from .client import close_client, connection_uri, database_name, get_client
+from .compact import FACTS_COLLECTION, CompactStore
+from .forecast import HORIZON, build_predictions
+from .frame_memory import memory_report, optimize_frame, print_memory_report
+from .index_advisor import format_keys, is_served, recommended_indexes
+from .manifest import batch_id, file_sha256
+from .metrics import ImportMetrics
+from .prepared_cache import PreparedCache
+from .rollups import LATEST_COLLECTION, LATEST_FIELDS, build_rollups, update_latest
+from .schema import summarize_reasons, validate_frame, write_quarantine
+from .snapshot import SnapshotWriter
+from .sources import is_stdin, prefetch, read_csv
+from .timeseries import (TIMESERIES_COLLECTION, ensure_timeseries_collection, ensure_timeseries_indexes,
+                         write_frame)
+
+# Columns identifying one indicator series at one place (Geo Join IDs repeat across Geo Types)
+SERIES_COLUMNS = ['Indicator ID', 'Geo Type Name', 'Geo Join ID']
+
+# Server error code for a duplicate key on a unique index
+DUPLICATE_KEY_ERROR = 11000
+
+# Columns as published in the NYC Open Data export; the content hash covers exactly these
+SOURCE_COLUMNS = [
+    'Unique ID',
+    'Indicator ID',
+    'Name',
+    'Measure',
+    'Measure Info',
+    'Geo Type Name',
+    'Geo Join ID',
+    'Geo Place Name',
+    'Time Period',
+    'Start_Date',
+    'Data Value',
+    'Message'
+]
+
+# Source columns are read as the exact strings in the file: the content hash is taken
+# from them, and validate_frame does the typing explicitly
+SOURCE_DTYPES = {column: str for column in SOURCE_COLUMNS}
+
+def build_documents(df, raw_bson=False):
+    """Turn a typed DataFrame into BSON-ready documents, working column by column
+
+    NaN/NaT/None values become missing fields, datetime64 columns are converted to
+    datetime in one pass, and numeric columns are unboxed with ndarray.tolist().
+    With raw_bson=True each document is pre-encoded as a RawBSONDocument (with an
+    _id assigned) so insert_many only has to ship bytes.
+    """
+    names = []
+    columns = []
+    missing = []
+    
+    for name in df.columns:
+        series = df[name]
+        if pd.api.types.is_datetime64_any_dtype(series.dtype):
+            array = series.to_numpy(dtype='datetime64[us]')
+            mask = np.isnat(array)
+            # datetime64[us] -> datetime.datetime for the whole column (NaT -> None)
+            values = array.astype(object).tolist()
+        elif pd.api.types.is_float_dtype(series.dtype):
+            array = series.to_numpy(dtype=np.float64)
+            mask = np.isnan(array)
+            values = array.tolist()
+        elif pd.api.types.is_integer_dtype(series.dtype) or pd.api.types.is_bool_dtype(series.dtype):
+            if series.hasnans:
+                array = series.to_numpy(dtype=object)
+                mask = pd.isna(array)
+            else:
+                array = series.to_numpy()
+                mask = None
+            values = array.tolist()
+        else:
+            array = series.to_numpy(dtype=object)
+            mask = pd.isna(array)
+            values = array.tolist()
+        
+        names.append(name)
+        columns.append(values)
+        missing.append(np.flatnonzero(mask) if mask is not None and mask.any() else None)
+    
+    documents = [dict(zip(names, row)) for row in zip(*columns)]
+    
+    # Remove missing values column-wise instead of testing every cell
+    for name, rows in zip(names, missing):
+        if rows is not None:
+            for row in rows.tolist():
+                del documents[row][name]
+    
+    if raw_bson:
+        documents = [
+            RawBSONDocument(bson.encode({'_id': ObjectId(), **document}))
+            for document in documents
+        ]
+    
+    return documents
+
+class GoFetchMongoImporter:
+    """MongoDB importer for GoFetch NYC air quality data"""
+    
+    def __init__(self, max_pool_size=None, dead_letter_path=None, raw_bson=False, maintain_latest=True,
+                 use_cache=False, cache_dir=None, memory_efficient=False, memory_budget_mb=None,
+                 quarantine_path=None, prefetch_depth=2, quiet=False, measure_bytes=False):
+        """Initialize the MongoDB importer with configuration"""
+        self.collection_name = "air_quality_data"
+        
+        # Connection pool shared by all import worker threads
+        self.max_pool_size = max_pool_size or int(os.getenv('MONGODB_MAX_POOL_SIZE', '100'))
+        
+        self.client = None
+        self.db = None
+        self.collection = None
+        
+        # Shared across all chunks of a run
+        self.import_timestamp = None
+        
+        # Keep the latest_by_place collection current as frames are written
+        # (parallel workers fold a frame in once all of its batches are written)
+        self.maintain_latest = maintain_latest
+        self.chunk_lock = threading.Lock()
+        
+        # Optional columnar snapshot of every prepared frame
+        self.snapshot_writer = None
+        
+        # Pre-parsed cache of prepared frames, keyed by source file hash
+        self.use_cache = use_cache
+        self.cache_dir = cache_dir
+        self.file_hashes = {}
+        
+        # Categorical text and downcast integers in prepared frames
+        self.memory_efficient = memory_efficient
+        self.memory_budget_mb = memory_budget_mb
+        self.memory_reported = False
+        
+        # Resume support: batches an interrupted run already committed are skipped
+        self.checkpoint = None
+        self.rows_read = 0
+        
+        # Pre-encode inserted documents as RawBSONDocument
+        self.raw_bson = raw_bson
+        
+        # Rows rejected by schema validation before any network I/O
+        self.quarantine_path = quarantine_path
+        self.rows_rejected = 0
+        
+        # Streamed chunks parsed ahead of the writers
+        self.prefetch_depth = prefetch_depth
+        
+        # Per-stage timings, batch latencies and counters (see metrics.py);
+        # quiet drops the per-batch and per-chunk progress lines
+        self.metrics = ImportMetrics(measure_bytes=measure_bytes)
+        self.quiet = quiet
+        
+        # Per-document write failures (updated from worker threads)
+        self.dead_letter_path = dead_letter_path
+        self.stats_lock = threading.Lock()
+        self.duplicates_skipped = 0
+        self.dead_lettered = 0
+        # Measurements this run wrote to the time-series collection
+        self.timeseries_written = 0
+        
+    def progress(self, message):
+        """Print a per-batch or per-chunk progress line unless running quietly"""
+        if not self.quiet:
+            print(message)
+    
+    def metrics_report(self, success=None):
+        """Metrics of the run so far, including the importer's row counters"""
+        return self.metrics.report(rows={
+            'read': self.rows_read,
+            'rejected': self.rows_rejected,
+            'duplicates_skipped': self.duplicates_skipped,
+            'dead_lettered': self.dead_lettered
+        }, success=success)
+    
+    def get_connection_uri(self):
+        """Get MongoDB connection URI"""
+        return connection_uri()
+    
+    def get_database_name(self):
+        """Get database name"""
+        return database_name()
+    
+    def connect_mongodb(self):
+        """Establish MongoDB connection"""
+        try:
+            print("🔌 Connecting to MongoDB...")
+            # Shared, tuned client (pool, compression, timeouts, write concern: see client.py)
+            self.client = get_client(self.get_connection_uri(), maxPoolSize=self.max_pool_size)
+            
+            # Test the connection
+            self.client.admin.command('ping')
+            print("✅ MongoDB connection successful!")
+            
+            # Get database and collection
+            self.db = self.client[self.get_database_name()]
+            self.collection = self.db[self.collection_name]
+            
+            # Check existing data
+            existing_count = self.collection.count_documents({})
+            print(f"📊 Existing documents in collection: {existing_count:,}")
+            
+            return True
+            
+        except ConnectionFailure as e:
+            print(f"❌ MongoDB connection failed: {e}")
+            print("💡 Make sure MongoDB is running locally or check your Atlas connection string")
+            return False
+        except Exception as e:
+            print(f"❌ Error connecting to MongoDB: {e}")
+            return False
+    
+    def prepare_frame(self, df):
+        """Apply type conversions and derived fields to a raw CSV frame"""
+        with self.metrics.stage('prepare', len(df)):
+            # Fingerprint the row's source strings, before any conversion, so the same
+            # row hashes the same whatever file, chunk or pandas version it comes from
+            df['content_hash'] = self.compute_content_hash(df)
+        
+            # Coerce to the declared schema (explicit date format, numeric IDs and values);
+            # rows that don't fit are quarantined instead of reaching MongoDB as NaN/NaT
+            df, rejects = validate_frame(df)
+            self.quarantine(rejects)
+        
+            # Create a proper Date field from Start_Date for consistency with old data model
+            df['Date'] = df['Start_Date']
+        
+            # Extract year, month from the date
+            df['year'] = df['Date'].dt.year
+            df['month'] = df['Date'].dt.month
+            df['day_of_year'] = df['Date'].dt.dayofyear
+        
+            # Handle potential coordinates
+            # Note: Currently the dataset doesn't have direct lat/lon columns
+            # If coordinates exist in the dataset (either as separate columns or can be derived),
+            # add the location field for geospatial queries
+        
+            df = self.add_run_fields(df)
+        return df
+    
+    def quarantine(self, rejects):
+        """Record rows that failed schema validation, with the reasons"""
+        if rejects.empty:
+            return
+        
+        rejects = rejects.drop(columns=['content_hash'])
+        self.rows_rejected += len(rejects)
+        print(f"  🚫 {len(rejects):,} rows failed validation:")
+        for reason, count in summarize_reasons(rejects).items():
+            print(f"    • {reason}: {count:,}")
+        
+        if self.quarantine_path is None:
+            print(f"  ⚠️ Rejected rows not kept (no quarantine file configured)")
+            return
+        write_quarantine(rejects, self.quarantine_path)
+        print(f"  📝 Rejected rows written to {self.quarantine_path}")
+    
+    def add_run_fields(self, df):
+        """Fields that belong to this run rather than the source (also applied to cached frames)"""
+        self.rows_read += len(df)
+        
+        # Add import timestamp (one per run so streamed chunks share it)
+        if self.import_timestamp is None:
+            self.import_timestamp = datetime.now()
+        df['import_timestamp'] = self.import_timestamp
+        return df
+    
+    def optimize_memory(self, df):
+        """Apply the memory-efficient layout if enabled, reporting the footprint of the first frame"""
+        if not self.memory_efficient:
+            return df
+        if self.memory_reported:
+            return optimize_frame(df)
+        before = memory_report(df)
+        df = optimize_frame(df)
+        print_memory_report(before, memory_report(df), self.memory_budget_mb)
+        self.memory_reported = True
+        return df
+    
+    def source_sha256(self, csv_file_path):
+        """SHA-256 of a source file, hashed once per run"""
+        key = os.path.abspath(csv_file_path)
+        if key not in self.file_hashes:
+            self.file_hashes[key] = file_sha256(csv_file_path)
+        return self.file_hashes[key]
+    
+    def prepared_cache(self, csv_file_path):
+        """The pre-parsed cache entry for a source file, or None when caching is off"""
+        if not self.use_cache or is_stdin(csv_file_path):
+            return None
+        return PreparedCache(csv_file_path, self.source_sha256(csv_file_path), self.cache_dir)
+    
+    @staticmethod
+    def compute_content_hash(df):
+        """Vectorized 64-bit hash of each row's source columns (stored as signed int64 for BSON)
+
+        Expects the columns as read with SOURCE_DTYPES: the text of each field in the file,
+        empty fields as missing. Other dtypes would be hashed through their str() form,
+        which is not stable ("5" vs "5.0"), so they are rejected.
+        """
+        columns = [col for col in SOURCE_COLUMNS if col in df.columns]
+        inferred = [col for col in columns
+                    if not (pd.api.types.is_string_dtype(df[col].dtype) or df[col].isna().all())]
+        if inferred:
+            raise ValueError(f"Content hash needs the source text of {inferred}; read them with SOURCE_DTYPES")
+        text = df[columns].astype(object).where(df[columns].notna(), '')
+        hashes = pd.util.hash_pandas_object(text, index=False)
+        return hashes.to_numpy().view(np.int64)
+    
+    def enable_snapshot(self, output_dir, file_format='parquet'):
+        """Also write every prepared frame to a partitioned Parquet/Arrow snapshot"""
+        try:
+            self.snapshot_writer = SnapshotWriter(output_dir, file_format)
+            print(f"🗂️ Columnar snapshot enabled: {output_dir} ({file_format})")
+            return True
+        except Exception as e:
+            print(f"❌ Cannot write snapshot to {output_dir}: {e}")
+            return False
+    
+    def write_snapshot(self, df):
+        """Append a prepared frame to the snapshot, if one is enabled"""
+        if self.snapshot_writer is not None:
+            self.snapshot_writer.write(df)
+    
+    def finish_snapshot(self, source=None):
+        """Finalize the snapshot manifest"""
+        if self.snapshot_writer is None:
+            return None
+        manifest = self.snapshot_writer.close(source)
+        print(f"🗂️ Snapshot written: {self.snapshot_writer.output_dir} ({manifest['rows']:,} rows)")
+        self.snapshot_writer = None
+        return manifest
+    
+    def load_and_prepare_data(self, csv_file_path):
+        """Load and prepare NYC air quality data for MongoDB"""
+        print(f"📥 Loading data from {csv_file_path}...")
+        
+        try:
+            cache = self.prepared_cache(csv_file_path)
+            df = None
+            if cache is not None:
+                with self.metrics.stage('cache_load') as timing:
+                    df = cache.load()
+                    timing['rows'] = len(df) if df is not None else 0
+            
+            if df is not None:
+                print(f"⚡ Prepared data loaded from cache: {cache.path}")
+                rejected = cache.read_meta().get('rejected', 0)
+                if rejected:
+                    print(f"  🚫 {rejected:,} rows failed validation when the cache was built")
+                df = self.add_run_fields(df)
+            else:
+                # Load the CSV file (compressed files are decompressed while parsing)
+                with self.metrics.stage('parse') as timing:
+                    df = read_csv(csv_file_path, dtype=SOURCE_DTYPES)
+                    timing['rows'] = len(df)
+                print(f"✅ Dataset loaded: {df.shape[0]:,} rows × {df.shape[1]} columns")
+                
+                # Data preparation
+                print("🧹 Preparing data for MongoDB...")
+                rejected_before = self.rows_rejected
+                df = self.prepare_frame(df)
+                
+                if cache is not None:
+                    try:
+                        # Only this file's rejects; rows_rejected runs across every source
+                        cache.write(df, rejected=self.rows_rejected - rejected_before)
+                        print(f"💾 Prepared data cached: {cache.path}")
+                    except Exception as cache_error:
+                        print(f"⚠️ Could not cache prepared data: {cache_error}")
+            
+            self.write_snapshot(df)
+            df = self.optimize_memory(df)
+            
+            print(f"✅ Data preparation complete!")
+            print(f"  📊 Records prepared: {len(df):,}")
+            print(f"  📅 Date range: {df['Date'].min()} to {df['Date'].max()}")
+            print(f"  🗂️ Columns: {len(df.columns)}")
+            
+            return df
+            
+        except FileNotFoundError:
+            print(f"❌ File not found: {csv_file_path}")
+            return None
+        except Exception as e:
+            print(f"❌ Error loading/preparing data: {e}")
+            return None
+    
+    def iter_prepared_chunks(self, csv_file_path, chunk_size=50000):
+        """Prepared DataFrame chunks without loading the whole CSV, parsed ahead of the consumer"""
+        chunks = self.read_prepared_chunks(csv_file_path, chunk_size)
+        if self.prefetch_depth > 0:
+            # Parsing releases the GIL for much of its work, as do socket writes
+            return prefetch(chunks, self.prefetch_depth)
+        return chunks
+    
+    def read_prepared_chunks(self, csv_file_path, chunk_size=50000):
+        """Yield prepared DataFrame chunks from the cache or the (possibly compressed) CSV"""
+        cache = self.prepared_cache(csv_file_path)
+        if cache is not None and cache.exists():
+            # Slices of the memory-mapped columns: no parsing and still one chunk in memory
+            print(f"⚡ Streaming prepared data from cache {cache.path} in chunks of {chunk_size:,} rows...")
+            for chunk in self.metrics.timed_iter('cache_load', cache.iter_chunks(chunk_size)):
+                chunk = self.add_run_fields(chunk)
+                self.write_snapshot(chunk)
+                yield self.optimize_memory(chunk)
+            return
+        
+        print(f"📥 Streaming data from {csv_file_path} in chunks of {chunk_size:,} rows...")
+        
+        reader = read_csv(csv_file_path, chunksize=chunk_size, dtype=SOURCE_DTYPES)
+        for chunk in self.metrics.timed_iter('parse', reader):
+            chunk = self.prepare_frame(chunk)
+            self.write_snapshot(chunk)
+            yield self.optimize_memory(chunk)
+    
+    def ensure_unique_id_index(self):
+        """Make sure upserts keyed on Unique ID hit an index instead of scanning"""
+        try:
+            self.collection.create_index([('Unique ID', 1)], name="unique_id_index", unique=True)
+        except Exception as e:
+            print(f"  ⚠️ Could not create unique Unique ID index ({e}); falling back to non-unique")
+            try:
+                self.collection.create_index([('Unique ID', 1)], name="unique_id_index")
+            except Exception as e:
+                print(f"  ⚠️ Could not create Unique ID index: {e}")
+    
+    def upsert_batch(self, batch, mode="replace"):
+        """Upsert a batch keyed on Unique ID with one bulk_write, returning (inserted, updated)"""
+        if mode == "replace":
+            operations = [
+                ReplaceOne({'Unique ID': record.get('Unique ID')}, record, upsert=True)
+                for record in batch
+            ]
+        elif mode == "update":
+            # $set keeps any fields added to the document outside the importer
+            operations = [
+                UpdateOne({'Unique ID': record.get('Unique ID')}, {'$set': record}, upsert=True)
+                for record in batch
+            ]
+        else:
+            raise ValueError(f"Unknown upsert mode: {mode}")
+        
+        try:
+            result = self.collection.bulk_write(operations, ordered=False)
+            return result.upserted_count, result.modified_count
+        except BulkWriteError as bwe:
+            # Unordered: everything except the reported errors was applied
+            details = bwe.details
+            write_errors = details.get('writeErrors', [])
+            print(f"  ⚠️ Bulk upsert error: {len(write_errors)} failed operations")
+            self.dead_letter([(batch[err['index']], err) for err in write_errors])
+            return details.get('nUpserted', 0), details.get('nModified', 0)
+    
+    def write_batch(self, batch, update_existing=False, upsert_mode="replace"):
+        """Write one batch of records, returning (inserted, updated) and recording its latency"""
+        started = time.perf_counter()
+        inserted, updated = self.apply_batch(batch, update_existing, upsert_mode)
+        seconds = time.perf_counter() - started
+        
+        self.metrics.count('rows_inserted', inserted)
+        self.metrics.count('rows_updated', updated)
+        self.metrics.observe_batch('upsert' if update_existing else 'insert', seconds, len(batch),
+                                   self.payload_bytes(batch))
+        return inserted, updated
+    
+    def payload_bytes(self, batch):
+        """Uncompressed BSON size of a batch (dict documents are only sized when measure_bytes is on)"""
+        if batch and isinstance(batch[0], RawBSONDocument):
+            return sum(len(document.raw) for document in batch)
+        if not self.metrics.measure_bytes:
+            return 0
+        return sum(len(bson.encode(document)) for document in batch)
+    
+    def apply_batch(self, batch, update_existing=False, upsert_mode="replace"):
+        """Send one batch to the server, retrying a failed insert once"""
+        if update_existing:
+            # Upsert the whole batch in one unordered bulk_write round trip
+            return self.upsert_batch(batch, mode=upsert_mode)
+        
+        # Insert new records only
+        try:
+            result = self.collection.insert_many(batch, ordered=False)
+            return len(result.inserted_ids), 0
+        except BulkWriteError as bwe:
+            return self.handle_insert_errors(batch, bwe.details), 0
+        except Exception as batch_error:
+            # Not a per-document failure (e.g. a dropped connection): retry the batch once.
+            # insert_many has already assigned _ids, so documents that did land come back
+            # as duplicate keys and are skipped instead of being written twice.
+            print(f"  ⚠️ Batch insert error: {batch_error}; retrying batch once")
+            self.metrics.count('retries')
+            try:
+                result = self.collection.insert_many(batch, ordered=False)
+                return len(result.inserted_ids), 0
+            except BulkWriteError as bwe:
+                return self.handle_insert_errors(batch, bwe.details), 0
+            except Exception as retry_error:
+                print(f"  ❌ Batch retry failed: {retry_error}")
+                self.dead_letter([(record, {'errmsg': str(retry_error)}) for record in batch])
+                return 0, 0
+    
+    def handle_insert_errors(self, batch, details, retry=True):
+        """Account for a partially applied unordered insert_many, returning the inserted count"""
+        inserted = details.get('nInserted', 0)
+        write_errors = details.get('writeErrors', [])
+        
+        duplicates = [err for err in write_errors if err.get('code') == DUPLICATE_KEY_ERROR]
+        failed = [err for err in write_errors if err.get('code') != DUPLICATE_KEY_ERROR]
+        
+        with self.stats_lock:
+            self.duplicates_skipped += len(duplicates)
+        
+        print(f"  ⚠️ Batch partially written: {inserted} inserted, "
+              f"{len(duplicates)} duplicates skipped, {len(failed)} failed")
+        
+        if not failed:
+            return inserted
+        
+        if retry:
+            # Only the failed indices go back to the server, never the whole batch
+            retry_batch = [batch[err['index']] for err in failed]
+            self.metrics.count('retries')
+            try:
+                result = self.collection.insert_many(retry_batch, ordered=False)
+                return inserted + len(result.inserted_ids)
+            except BulkWriteError as bwe:
+                return inserted + self.handle_insert_errors(retry_batch, bwe.details, retry=False)
+            except Exception as retry_error:
+                self.dead_letter([(record, {'errmsg': str(retry_error)}) for record in retry_batch])
+                return inserted
+        
+        self.dead_letter([(batch[err['index']], err) for err in failed])
+        return inserted
+    
+    def dead_letter(self, failures):
+        """Record documents that could not be written, with the server's reason"""
+        if not failures:
+            return
+        
+        with self.stats_lock:
+            self.dead_lettered += len(failures)
+            if self.dead_letter_path is None:
+                print(f"  ⚠️ {len(failures)} records could not be written (no dead-letter file configured)")
+                return
+            with open(self.dead_letter_path, 'a', encoding='utf-8') as f:
+                for record, error in failures:
+                    entry = {
+                        'error_code': error.get('code'),
+                        'error': error.get('errmsg'),
+                        'record': {k: v for k, v in record.items() if k != '_id'}
+                    }
+                    f.write(json.dumps(entry, default=str) + "\n")
+        print(f"  📝 {len(failures)} failed records written to {self.dead_letter_path}")
+    
+    def print_write_issues(self):
+        """Report duplicates skipped and records dead-lettered during this run"""
+        if self.duplicates_skipped:
+            print(f"  ⏭️ Duplicates skipped: {self.duplicates_skipped:,}")
+        if self.dead_lettered:
+            print(f"  📝 Records not written: {self.dead_lettered:,}")
+    
+    def insert_records(self, records, batch_size=1000, update_existing=False,
+                       batch_offset=0, total_batches=None, upsert_mode="replace", unique_ids=None):
+        """Write a list of record dicts in batches, returning (inserted, updated)
+
+        `unique_ids` (aligned with `records`) names each batch for the checkpoint;
+        without it the IDs are read from the records.
+        """
+        total_inserted = 0
+        total_updated = 0
+        
+        for i in range(0, len(records), batch_size):
+            batch = records[i:i + batch_size]
+            batch_num = batch_offset + (i // batch_size) + 1
+            of_total = f"/{total_batches}" if total_batches else ""
+            
+            batch_key = None
+            if self.checkpoint is not None:
+                ids = unique_ids[i:i + batch_size] if unique_ids is not None else [r.get('Unique ID') for r in batch]
+                batch_key = batch_id(ids)
+                if self.checkpoint.is_committed(batch_key):
+                    self.progress(f"  ⏭️ Batch {batch_num}{of_total} ({batch_key}) committed by an earlier run, skipping")
+                    continue
+            
+            self.progress(f"  📦 Processing batch {batch_num}{of_total} ({len(batch)} records)...")
+            
+            inserted, updated = self.write_batch(batch, update_existing, upsert_mode)
+            total_inserted += inserted
+            total_updated += updated
+            if batch_key is not None:
+                self.checkpoint.commit(batch_key, len(batch))
+        
+        return total_inserted, total_updated
+    
+    def update_latest_by_place(self, df):
+        """Fold the newest reading per place (and per place × indicator) of a frame into latest_by_place"""
+        if not self.maintain_latest or len(df) == 0:
+            return
+        try:
+            update_latest(self.collection, df)
+        except Exception as e:
+            # Derived data: never fail the import over it, a rollup rebuild restores it
+            print(f"  ⚠️ Could not update {LATEST_COLLECTION}: {e}")
+    
+    def to_documents(self, df, update_existing=False):
+        """Build documents for a frame; upserts keep plain dicts so no _id is forced on them"""
+        with self.metrics.stage('documents', len(df)):
+            return build_documents(df, raw_bson=self.raw_bson and not update_existing)
+    
+    def iter_record_batches(self, frames, batch_size=1000, update_existing=False):
+        """Turn a DataFrame (or an iterable of DataFrame chunks) into (batch ID, documents, chunk) triples
+
+        Batches an earlier run already committed are skipped before any documents are built.
+        The chunk tracks the frame's unwritten batches; see release_chunk.
+        """
+        if isinstance(frames, pd.DataFrame):
+            frames = [frames]
+        for frame in frames:
+            parts = []
+            for i in range(0, len(frame), batch_size):
+                part = frame.iloc[i:i + batch_size]
+                batch_key = batch_id(part['Unique ID'].to_numpy())
+                if self.checkpoint is not None and self.checkpoint.is_committed(batch_key):
+                    self.progress(f"  ⏭️ Batch {batch_key} committed by an earlier run, skipping")
+                    continue
+                parts.append((batch_key, part))
+            
+            chunk = {'frame': frame, 'pending': len(parts)}
+            if not parts:
+                self.update_latest_by_place(frame)
+            # Convert per batch so only the in-flight batches exist as documents
+            for batch_key, part in parts:
+                yield batch_key, self.to_documents(part, update_existing), chunk
+    
+    def release_chunk(self, chunk):
+        """Count one written batch of a chunk; once all are written, fold it into latest_by_place"""
+        with self.chunk_lock:
+            chunk['pending'] -= 1
+            frame = chunk.pop('frame') if chunk['pending'] == 0 else None
+        if frame is not None:
+            self.update_latest_by_place(frame)
+    
+    def import_parallel(self, batches, workers=4, update_existing=False, upsert_mode="replace",
+                        queue_size=None):
+        """Write (batch ID, documents, chunk) triples with a pool of worker threads sharing one MongoClient"""
+        
+        if self.collection is None:
+            print("❌ No MongoDB connection available")
+            return False
+        
+        queue_size = queue_size or workers * 2
+        print(f"🚀 Starting parallel MongoDB import...")
+        print(f"  🧵 Workers: {workers}")
+        print(f"  📥 Queue size: {queue_size} batches")
+        print(f"  🔄 Update existing: {update_existing}")
+        
+        if update_existing:
+            self.ensure_unique_id_index()
+        
+        # Bounded queue: the producer blocks instead of preparing the whole file ahead of the writers
+        batch_queue = queue.Queue(maxsize=queue_size)
+        lock = threading.Lock()
+        totals = {'inserted': 0, 'updated': 0, 'batches': 0}
+        failed_batches = []
+        sentinel = None
+        
+        def worker():
+            while True:
+                item = batch_queue.get()
+                try:
+                    if item is sentinel:
+                        return
+                    batch_num, batch_key, batch, chunk = item
+                    try:
+                        inserted, updated = self.write_batch(batch, update_existing, upsert_mode)
+                    except Exception as e:
+                        # A failed batch doesn't stop the other workers
+                        print(f"  ⚠️ Batch {batch_num} failed: {e}")
+                        with lock:
+                            failed_batches.append(batch_num)
+                        continue
+                    with lock:
+                        totals['inserted'] += inserted
+                        totals['updated'] += updated
+                        totals['batches'] += 1
+                    if self.checkpoint is not None:
+                        self.checkpoint.commit(batch_key, len(batch))
+                    self.release_chunk(chunk)
+                    self.progress(f"  📦 Batch {batch_num} written ({len(batch)} records)")
+                finally:
+                    batch_queue.task_done()
+        
+        threads = [threading.Thread(target=worker, name=f"import-worker-{n}", daemon=True)
+                   for n in range(workers)]
+        for thread in threads:
+            thread.start()
+        
+        try:
+            for batch_num, (batch_key, batch, chunk) in enumerate(batches, start=1):
+                batch_queue.put((batch_num, batch_key, batch, chunk))
+        except Exception as e:
+            print(f"❌ Error producing batches: {e}")
+            failed_batches.append('producer')
+        finally:
+            for _ in threads:
+                batch_queue.put(sentinel)
+            for thread in threads:
+                thread.join()
+        
+        print(f"\n✅ Parallel import completed!")
+        print(f"  📦 Batches written: {totals['batches']:,}")
+        print(f"  📈 Records inserted: {totals['inserted']:,}")
+        if update_existing:
+            print(f"  🔄 Records updated: {totals['updated']:,}")
+        self.print_write_issues()
+        if failed_batches:
+            print(f"  ⚠️ Failed batches: {failed_batches}")
+        
+        final_count = self.collection.count_documents({})
+        print(f"  📊 Total documents in collection: {final_count:,}")
+        
+        return not failed_batches
+    
+    def import_data(self, df, batch_size=1000, update_existing=False, upsert_mode="replace"):
+        """Import dataframe to MongoDB with batch processing"""
+        
+        if self.collection is None:
+            print("❌ No MongoDB connection available")
+            return False
+        
+        print(f"🚀 Starting MongoDB import...")
+        print(f"  📊 Total records to import: {len(df):,}")
+        print(f"  📦 Batch size: {batch_size:,}")
+        print(f"  🔄 Update existing: {update_existing}")
+        
+        try:
+            if update_existing:
+                self.ensure_unique_id_index()
+            
+            # Convert DataFrame to BSON-ready documents
+            records = self.to_documents(df, update_existing)
+            
+            # Process in batches
+            total_batches = (len(records) + batch_size - 1) // batch_size
+            total_inserted, total_updated = self.insert_records(
+                records, batch_size, update_existing, total_batches=total_batches,
+                upsert_mode=upsert_mode, unique_ids=df['Unique ID'].to_numpy()
+            )
+            
+            self.update_latest_by_place(df)
+            
+            print(f"\n✅ Import completed successfully!")
+            print(f"  📈 Records inserted: {total_inserted:,}")
+            if update_existing:
+                print(f"  🔄 Records updated: {total_updated:,}")
+            self.print_write_issues()
+            
+            # Verify import
+            final_count = self.collection.count_documents({})
+            print(f"  📊 Total documents in collection: {final_count:,}")
+            
+            return True
+            
+        except Exception as e:
+            print(f"❌ Import failed: {e}")
+            return False
+    
+    def import_stream(self, csv_file_path, chunk_size=50000, batch_size=1000, update_existing=False,
+                      upsert_mode="replace"):
+        """Stream a CSV into MongoDB chunk by chunk, keeping memory flat"""
+        
+        if self.collection is None:
+            print("❌ No MongoDB connection available")
+            return False
+        
+        print(f"🚀 Starting streaming MongoDB import...")
+        print(f"  🧩 Chunk size: {chunk_size:,}")
+        print(f"  📦 Batch size: {batch_size:,}")
+        print(f"  🔄 Update existing: {update_existing}")
+        
+        try:
+            if update_existing:
+                self.ensure_unique_id_index()
+            
+            total_rows = 0
+            total_inserted = 0
+            total_updated = 0
+            batches_done = 0
+            min_date = None
+            max_date = None
+            
+            for chunk_num, chunk in enumerate(self.iter_prepared_chunks(csv_file_path, chunk_size), start=1):
+                self.progress(f"  🧩 Chunk {chunk_num}: {len(chunk):,} rows")
+                total_rows += len(chunk)
+                
+                chunk_min, chunk_max = chunk['Date'].min(), chunk['Date'].max()
+                min_date = chunk_min if min_date is None or chunk_min < min_date else min_date
+                max_date = chunk_max if max_date is None or chunk_max > max_date else max_date
+                
+                # Only one chunk's worth of records is alive at a time
+                records = self.to_documents(chunk, update_existing)
+                unique_ids = chunk['Unique ID'].to_numpy()
+                latest_source = chunk[list(LATEST_FIELDS.values())]
+                del chunk
+                
+                inserted, updated = self.insert_records(
+                    records, batch_size, update_existing, batch_offset=batches_done,
+                    upsert_mode=upsert_mode, unique_ids=unique_ids
+                )
+                total_inserted += inserted
+                total_updated += updated
+                batches_done += (len(records) + batch_size - 1) // batch_size
+                
+                self.update_latest_by_place(latest_source)
+                del latest_source
+            
+            print(f"\n✅ Streaming import completed successfully!")
+            print(f"  📊 Rows read: {total_rows:,}")
+            print(f"  📅 Date range: {min_date} to {max_date}")
+            print(f"  📈 Records inserted: {total_inserted:,}")
+            if update_existing:
+                print(f"  🔄 Records updated: {total_updated:,}")
+            self.print_write_issues()
+            
+            final_count = self.collection.count_documents({})
+            print(f"  📊 Total documents in collection: {final_count:,}")
+            
+            return True
+            
+        except FileNotFoundError:
+            print(f"❌ File not found: {csv_file_path}")
+            return False
+        except Exception as e:
+            print(f"❌ Streaming import failed: {e}")
+            return False
+    
+    def import_pipelined(self, csv_file_path, chunk_size=50000, batch_size=1000, in_flight=4,
+                         update_existing=False, upsert_mode="replace"):
+        """Import a CSV through the asyncio parse → prepare → encode → write pipeline (pipeline.py)"""
+        
+        if self.collection is None:
+            print("❌ No MongoDB connection available")
+            return False
+        
+        # Imported here: the pipeline needs pymongo's AsyncMongoClient, nothing else does
+        from .pipeline import ImportPipeline
+        
+        print(f"🚀 Starting pipelined MongoDB import...")
+        print(f"  🧩 Chunk size: {chunk_size:,}")
+        print(f"  📦 Batch size: {batch_size:,}")
+        print(f"  ✈️ Batches in flight: {in_flight}")
+        print(f"  🔄 Update existing: {update_existing}")
+        
+        try:
+            if update_existing:
+                self.ensure_unique_id_index()
+            
+            pipeline = ImportPipeline(self, chunk_size=chunk_size, batch_size=batch_size, in_flight=in_flight,
+                                      queue_depth=max(self.prefetch_depth, 1),
+                                      update_existing=update_existing, upsert_mode=upsert_mode)
+            totals = asyncio.run(pipeline.run(csv_file_path))
+            
+            print(f"\n✅ Pipelined import completed successfully!")
+            print(f"  📊 Rows read: {totals['rows']:,}")
+            print(f"  📦 Batches written: {totals['batches']:,}")
+            print(f"  📈 Records inserted: {totals['inserted']:,}")
+            if update_existing:
+                print(f"  🔄 Records updated: {totals['updated']:,}")
+            self.print_write_issues()
+            
+            final_count = self.collection.count_documents({})
+            print(f"  📊 Total documents in collection: {final_count:,}")
+            
+            return True
+            
+        except FileNotFoundError:
+            print(f"❌ File not found: {csv_file_path}")
+            return False
+        except Exception as e:
+            print(f"❌ Pipelined import failed: {e}")
+            return False
+    
+    def import_compact(self, frames, batch_size=1000, upsert=False):
+        """Write prepared frames as integer-coded facts plus dimension collections"""
+        
+        if self.db is None:
+            print("❌ No MongoDB connection available")
+            return False
+        
+        print(f"🚀 Starting compact MongoDB import into {FACTS_COLLECTION}...")
+        
+        try:
+            store = CompactStore(self.db)
+            if isinstance(frames, pd.DataFrame):
+                frames = [frames]
+            
+            total_written = 0
+            total_duplicates = 0
+            for frame in frames:
+                with self.metrics.stage('compact_write', len(frame)):
+                    written, duplicates = store.write(frame, batch_size=batch_size, upsert=upsert)
+                self.metrics.count('rows_inserted', written)
+                total_written += written
+                total_duplicates += duplicates
+                self.progress(f"  📦 {len(frame):,} rows encoded, {written:,} facts written")
+            
+            store.ensure_indexes()
+            
+            print(f"\n✅ Compact import completed successfully!")
+            print(f"  📈 Facts written: {total_written:,}")
+            if total_duplicates:
+                print(f"  ⏭️ Duplicates skipped: {total_duplicates:,}")
+            print(f"  🏷️ Indicators: {len(store.indicators):,}, places: {len(store.places):,}, "
+                  f"periods: {len(store.periods):,}")
+            
+            final_count = store.facts.count_documents({})
+            print(f"  📊 Total facts in collection: {final_count:,}")
+            return True
+            
+        except Exception as e:
+            print(f"❌ Compact import failed: {e}")
+            return False
+    
+    def import_timeseries(self, frames, batch_size=1000):
+        """Write prepared frames into the time-series collection (indicator/place as metaField)
+        
+        Time-series collections can't carry a unique Unique ID index, so batches are
+        checkpointed and skipped like insert_records does. On a resume, the first batch not
+        committed may have landed before the crash; its stored rows are left out.
+        """
+        
+        if self.db is None:
+            print("❌ No MongoDB connection available")
+            return False
+        
+        print(f"🚀 Starting time-series MongoDB import into {TIMESERIES_COLLECTION}...")
+        
+        try:
+            collection = ensure_timeseries_collection(self.db)
+            if isinstance(frames, pd.DataFrame):
+                frames = [frames]
+            
+            resuming = self.checkpoint is not None and self.checkpoint.rows_committed > 0
+            total_written = 0
+            for frame in frames:
+                for start in range(0, len(frame), batch_size):
+                    part = frame.iloc[start:start + batch_size]
+                    batch_rows = len(part)
+                    
+                    batch_key = None
+                    if self.checkpoint is not None:
+                        batch_key = batch_id(part['Unique ID'].to_numpy())
+                        if self.checkpoint.is_committed(batch_key):
+                            self.progress(f"  ⏭️ Batch {batch_key} committed by an earlier run, skipping")
+                            continue
+                        if resuming:
+                            landed = collection.distinct('Unique ID', {'Unique ID': {'$in': part['Unique ID'].tolist()}})
+                            if landed:
+                                print(f"  ⏭️ {len(landed):,} rows of batch {batch_key} landed before the interruption")
+                                self.duplicates_skipped += len(landed)
+                            part = part[~part['Unique ID'].isin(landed)]
+                            resuming = False
+                    
+                    with self.metrics.stage('timeseries_write', len(part)):
+                        written = write_frame(collection, part, batch_size)
+                    self.metrics.count('rows_inserted', written)
+                    self.timeseries_written += written
+                    total_written += written
+                    if batch_key is not None:
+                        self.checkpoint.commit(batch_key, batch_rows)
+                    self.progress(f"  📦 {written:,} measurements written")
+            
+            print(f"\n✅ Time-series import completed successfully!")
+            print(f"  📈 Measurements written: {total_written:,}")
+            return True
+            
+        except Exception as e:
+            print(f"❌ Time-series import failed: {e}")
+            return False
+    
+    def sync_incremental(self, df, batch_size=1000, delete_removed=False, upsert_mode="replace"):
+        """Write only new or changed rows, comparing content hashes against the collection"""
+        
+        if self.collection is None:
+            print("❌ No MongoDB connection available")
+            return None
+        
+        print(f"🔁 Starting incremental sync...")
+        
+        try:
+            # One projection query for every stored key, fingerprint and place
+            existing = {}
+            stored_place = {}
+            projection = {'_id': 0, 'Unique ID': 1, 'content_hash': 1, 'Geo Place Name': 1}
+            for doc in self.collection.find({}, projection):
+                if 'Unique ID' in doc:
+                    existing[doc['Unique ID']] = doc.get('content_hash')
+                    stored_place[doc['Unique ID']] = doc.get('Geo Place Name')
+            print(f"  📊 Existing documents: {len(existing):,}")
+            
+            # Compare as Python ints: a float64 NaN-padded map would lose hash precision
+            stored_hash = pd.Series(
+                [existing.get(uid) for uid in df['Unique ID'].tolist()], index=df.index, dtype=object
+            )
+            is_new = ~df['Unique ID'].isin(existing.keys())
+            is_changed = ~is_new & (stored_hash != df['content_hash'].astype(object))
+            delta = df[is_new | is_changed]
+            
+            incoming_ids = set(df['Unique ID'].dropna().tolist())
+            removed_ids = [uid for uid in existing if uid not in incoming_ids]
+            
+            print(f"  🆕 New rows: {int(is_new.sum()):,}")
+            print(f"  ✏️ Changed rows: {int(is_changed.sum()):,}")
+            print(f"  💤 Unchanged rows: {len(df) - len(delta):,}")
+            print(f"  🗑️ Rows no longer in source: {len(removed_ids):,}")
+            
+            # Series whose rollups need recomputing, and places whose latest readings do. Places
+            # are taken from the stored rows too: once they are replaced or deleted, a place
+            # whose rows all changed name or were removed can no longer be found from the data
+            affected_series = set(zip(*(delta[col].tolist() for col in SERIES_COLUMNS)))
+            affected_places = set(delta['Geo Place Name'].dropna().tolist())
+            affected_places.update(stored_place[uid] for uid in df.loc[is_changed, 'Unique ID'].tolist())
+            if delete_removed:
+                affected_places.update(stored_place[uid] for uid in removed_ids)
+            affected_places.discard(None)
+            
+            inserted = updated = deleted = 0
+            if len(delta) > 0:
+                self.ensure_unique_id_index()
+                inserted, updated = self.insert_records(
+                    self.to_documents(delta, update_existing=True), batch_size, update_existing=True,
+                    upsert_mode=upsert_mode, unique_ids=delta['Unique ID'].to_numpy()
+                )
+                self.update_latest_by_place(delta)
+            
+            if delete_removed and removed_ids:
+                for i in range(0, len(removed_ids), batch_size):
+                    id_filter = {'Unique ID': {'$in': removed_ids[i:i + batch_size]}}
+                    for doc in self.collection.find(id_filter, {'_id': 0, **{col: 1 for col in SERIES_COLUMNS}}):
+                        affected_series.add(tuple(doc.get(col) for col in SERIES_COLUMNS))
+                    result = self.collection.delete_many(id_filter)
+                    deleted += result.deleted_count
+                self.metrics.count('rows_deleted', deleted)
+            
+            print(f"\n✅ Incremental sync completed!")
+            print(f"  📈 Records inserted: {inserted:,}")
+            print(f"  🔄 Records updated: {updated:,}")
+            if delete_removed:
+                print(f"  🗑️ Records deleted: {deleted:,}")
+            
+            return {
+                'new': int(is_new.sum()),
+                'changed': int(is_changed.sum()),
+                'unchanged': len(df) - len(delta),
+                'removed': len(removed_ids),
+                'inserted': inserted,
+                'updated': updated,
+                'deleted': deleted,
+                'removed_ids': removed_ids,
+                'affected_series': affected_series,
+                'affected_places': affected_places
+            }
+            
+        except Exception as e:
+            print(f"❌ Incremental sync failed: {e}")
+            return None
+    
+    def refresh_rollups(self, affected_series=None, affected_places=None):
+        """Rebuild the dashboard rollup collections (only the affected series and places when given)"""
+        
+        if self.collection is None:
+            print("❌ No MongoDB connection available")
+            return False
+        
+        print("📊 Refreshing rollup collections...")
+        
+        try:
+            with self.metrics.stage('rollups'):
+                build_rollups(self.collection, affected_series, affected_places)
+            print("✅ Rollups refreshed!")
+            return True
+        except Exception as e:
+            print(f"❌ Error building rollups: {e}")
+            return False
+    
+    def refresh_predictions(self, horizon=HORIZON):
+        """Retrain the per-series forecasts on the collection and rewrite the predictions"""
+        
+        if self.collection is None:
+            print("❌ No MongoDB connection available")
+            return False
+        
+        try:
+            with self.metrics.stage('predictions') as timing:
+                timing['rows'] = build_predictions(self.collection, horizon=horizon)
+            print("✅ Predictions refreshed!")
+            return True
+        except Exception as e:
+            print(f"❌ Error building predictions: {e}")
+            return False
+    
+    def index_target(self, storage="wide"):
+        """The collection a --storage layout writes to, and the function creating its indexes"""
+        if storage == "compact":
+            return self.db[FACTS_COLLECTION], lambda: CompactStore(self.db).ensure_indexes()
+        if storage == "timeseries":
+            # Created up front so its indexes exist to be deferred
+            collection = ensure_timeseries_collection(self.db)
+            return collection, lambda: ensure_timeseries_indexes(collection)
+        return self.collection, self.create_indexes
+    
+    def drop_secondary_indexes(self, collection=None):
+        """Drop non-unique secondary indexes before a bulk load, returning their definitions"""
+        collection = self.collection if collection is None else collection
+        dropped = []
+        for index in list(collection.list_indexes()):
+            # _id and unique indexes stay: they enforce correctness (duplicate detection, upsert keys)
+            if index['name'] == '_id_' or index.get('unique'):
+                continue
+            collection.drop_index(index['name'])
+            dropped.append(dict(index))
+            print(f"  🗑️ Dropped index {index['name']}")
+        return dropped
+    
+    @staticmethod
+    def index_model_from_info(info):
+        """Rebuild an IndexModel from a list_indexes() entry"""
+        options = {k: v for k, v in info.items() if k not in ('v', 'key', 'ns')}
+        if 'weights' in info:
+            # Text indexes report their key as _fts/_ftsx; the fields live in weights
+            keys = [(field, 'text') for field in info['weights']]
+            keys += [(field, direction) for field, direction in info['key'].items()
+                     if field not in ('_fts', '_ftsx')]
+        else:
+            keys = list(info['key'].items())
+        return IndexModel(keys, **options)
+    
+    def rebuild_indexes(self, index_infos, collection=None):
+        """Recreate indexes previously removed by drop_secondary_indexes"""
+        collection = self.collection if collection is None else collection
+        if not index_infos:
+            return True
+        try:
+            names = collection.create_indexes([self.index_model_from_info(info) for info in index_infos])
+            for name in names:
+                print(f"  ✅ Rebuilt index {name}")
+            return True
+        except Exception as e:
+            print(f"  ⚠️ Could not rebuild indexes: {e}")
+            return False
+    
+    def load_with_index_strategy(self, load_fn, strategy="live", storage="wide"):
+        """Run load_fn with indexes kept live or deferred until after the load, timing each phase
+        
+        The strategy applies to the collection the --storage layout writes to.
+        """
+        timings = {}
+        collection, create_indexes = self.index_target(storage)
+        
+        def timed(phase, fn):
+            started = time.perf_counter()
+            try:
+                return fn()
+            finally:
+                timings[phase] = time.perf_counter() - started
+                if phase != 'load':
+                    # The load itself is broken down by its own stages
+                    self.metrics.add_stage(phase, timings[phase])
+        
+        print(f"\n🔗 Index strategy: {strategy} ({collection.name})")
+        
+        if strategy == "deferred":
+            dropped = timed('drop_indexes', lambda: self.drop_secondary_indexes(collection))
+            try:
+                success = timed('load', load_fn)
+            finally:
+                # Put the indexes back even if the load failed part way
+                print("\n🔗 Rebuilding deferred indexes...")
+                timed('rebuild_indexes', lambda: self.rebuild_indexes(dropped, collection))
+                timed('create_indexes', create_indexes)
+        elif strategy == "live":
+            print("\n🔗 Creating database indexes...")
+            timed('create_indexes', create_indexes)
+            success = timed('load', load_fn)
+        else:
+            raise ValueError(f"Unknown index strategy: {strategy}")
+        
+        print(f"\n⏱️ Load timing ({strategy} indexes):")
+        for phase, seconds in timings.items():
+            print(f"  • {phase}: {seconds:.2f}s")
+        print(f"  • total: {sum(timings.values()):.2f}s")
+        
+        return success, timings
+    
+    def create_indexes(self):
+        """Create the indexes the backend's query shapes need (see index_advisor.py)"""
+        
+        if self.collection is None:
+            print("❌ No MongoDB connection available")
+            return False
+        
+        print("🔗 Creating indexes for optimal query performance...")
+        
+        try:
+            # Create text index for text search capabilities
+            self.collection.create_index([
+                ("Name", "text"),
+                ("Geo Place Name", "text"),
+                ("Measure", "text"),
+                ("Message", "text")
+            ], name="text_search_index")
+            print(f"  ✅ Text search index created")
+        except Exception as e:
+            print(f"  ⚠️ Warning: Could not create text search index: {e}")
+        
+        # Key used by upserts and incremental sync
+        self.ensure_unique_id_index()
+        
+        # Minimal set derived from the backend's query shapes; an index that already exists
+        # under another name or direction (e.g. the backend's start_date_desc_idx for
+        # {Start_Date: 1}), or that starts with the same keys, counts as present
+        existing = [list(info['key'].items()) for info in self.collection.list_indexes()]
+        for keys in recommended_indexes():
+            label = format_keys(keys)
+            if is_served(keys, existing):
+                print(f"  ✅ {label} already exists")
+                continue
+            try:
+                self.collection.create_index(keys)
+                print(f"  ✅ {label} created")
+            except Exception as idx_error:
+                print(f"  ⚠️ Warning: Could not create {label}: {idx_error}")
+        
+        print("\n✅ Index creation completed!")
+        return True
+    
+    def test_queries(self, storage="wide"):
+        """Test various query patterns for GoFetch platform"""
+        
+        if storage != "wide":
+            return self.test_storage_queries(storage)
+        
+        if self.collection is None:
+            print("❌ No MongoDB connection available for testing")
+            return False
+        
+        print("🧪 Testing MongoDB queries for GoFetch platform...")
+        
+        try:
+            # 1. Basic count
+            total_docs = self.collection.count_documents({})
+            print(f"\n📊 Total documents: {total_docs:,}")
+            
+            # 2. Date range query
+            end_date = datetime(2022, 1, 1)
+            start_date = datetime(2015, 1, 1)
+            
+            date_range_count = self.collection.count_documents({
+                "Start_Date": {"$gte": start_date, "$lt": end_date}
+            })
+            print(f"📅 Records from 2015-2022: {date_range_count:,}")
+            
+            # 3. High pollution measurements (for example, Nitrogen dioxide > 30)
+            high_pollution = self.collection.count_documents({
+                "Name": "Nitrogen dioxide (NO2)",
+                "Data Value": {"$gt": 30}
+            })
+            print(f"🚨 High Nitrogen dioxide measurements (>30): {high_pollution}")
+            
+            # 4. Geographic query (specific neighborhood)
+            geo_count = self.collection.count_documents({
+                "Geo Place Name": {"$regex": "Flushing", "$options": "i"}
+            })
+            print(f"🗺️ Records in Flushing area: {geo_count:,}")
+            
+            # 5. Text search
+            text_results = list(self.collection.find(
+                {"$text": {"$search": "air quality nitrogen"}},
+                {"score": {"$meta": "textScore"}}
+            ).sort([("score", {"$meta": "textScore"})]).limit(3))
+            
+            print(f"\n🔍 Text search results (first 3):")
+            for doc in text_results:
+                print(f"  • {doc.get('Name')} in {doc.get('Geo Place Name')}: {doc.get('Data Value')} {doc.get('Measure Info')}")
+            
+            # 6. Aggregation query (average by neighborhood)
+            neighborhood_avg = list(self.collection.aggregate([
+                {
+                    "$match": {
+                        "Name": "Nitrogen dioxide (NO2)"
+                    }
+                },
+                {
+                    "$group": {
+                        "_id": "$Geo Place Name",
+                        "avg_value": {"$avg": "$Data Value"},
+                        "count": {"$sum": 1}
+                    }
+                },
+                {"$sort": {"avg_value": -1}},
+                {"$limit": 3}
+            ]))
+            
+            print(f"\n📊 Neighborhood averages for NO2 (top 3):")
+            for place in neighborhood_avg:
+                print(f"  • {place['_id']}: {place['avg_value']:.2f} ppb ({place['count']} records)")
+            
+            print("\n✅ All test queries completed successfully!")
+            print("🚀 MongoDB is ready for GoFetch platform integration!")
+            
+            return True
+            
+        except Exception as e:
+            print(f"❌ Error testing queries: {e}")
+            return False
+    
+    def test_storage_queries(self, storage):
+        """Spot-check the compact or time-series collection a --storage run wrote to"""
+        
+        if self.db is None:
+            print("❌ No MongoDB connection available for testing")
+            return False
+        
+        if storage == "compact":
+            collection, date_field = self.db[FACTS_COLLECTION], 'd'
+        else:
+            collection, date_field = self.db[TIMESERIES_COLLECTION], 'Start_Date'
+        
+        print(f"🧪 Testing MongoDB queries on {collection.name}...")
+        
+        try:
+            total_docs = collection.count_documents({})
+            print(f"\n📊 Total documents: {total_docs:,}")
+            
+            date_range_count = collection.count_documents({
+                date_field: {"$gte": datetime(2015, 1, 1), "$lt": datetime(2022, 1, 1)}
+            })
+            print(f"📅 Records from 2015-2022: {date_range_count:,}")
+            
+            # Latest readings, read back the way the backend would see them
+            print(f"\n🕒 Latest readings (first 3):")
+            if storage == "compact":
+                for doc in CompactStore(self.db).find(sort=[(date_field, -1)], limit=3):
+                    print(f"  • {doc.get('Name')} in {doc.get('Geo Place Name')}: {doc.get('Data Value')} {doc.get('Measure Info')}")
+            else:
+                for doc in collection.find().sort([(date_field, -1)]).limit(3):
+                    meta = doc.get('meta', {})
+                    print(f"  • {meta.get('name')} in {meta.get('geo_place_name')}: {doc.get('Data Value')} {meta.get('measure_info')}")
+            
+            print("\n✅ All test queries completed successfully!")
+            return True
+            
+        except Exception as e:
+            print(f"❌ Error testing queries: {e}")
+            return False
+    
+    def print_summary(self):
+        """Print final summary and next steps"""
+        print("\n" + "="*70)
+        print("🎯 MONGODB IMPORT SUMMARY FOR GOFETCH NYC AIR QUALITY")
+        print("="*70)
+        
+        if self.collection is not None:
+            final_count = self.collection.count_documents({})
+            
+            print(f"\n✅ IMPORT SUCCESSFUL:")
+            print(f"  📊 Total documents imported: {final_count:,}")
+            print(f"  🗄️ Database: {self.get_database_name()}")
+            print(f"  📋 Collection: {self.collection_name}")
+            
+            print(f"\n🔗 INDEXES CREATED:")
+            print(f"  ✅ Indexes matched to backend query shapes (index_advisor.py)")
+            print(f"  ✅ Text indexes for natural language search")
+            print(f"  ✅ Unique ID index for upserts and incremental sync")
+            
+            print(f"\n🚀 READY FOR GOFETCH FEATURES:")
+            print(f"  🗺️ NYC neighborhood-based air quality mapping")
+            print(f"  🔍 Natural language search capabilities")
+            print(f"  📈 Time-series analysis and forecasting")
+            print(f"  📊 Real-time air quality monitoring by pollutant type")
+            
+        print(f"\n🛠️ NEXT STEPS:")
+        print(f"  1. 🔧 Update backend API endpoints for new data structure")
+        print(f"  2. 🎨 Adapt frontend components to NYC focus")
+        print(f"  3. 🤖 Implement NLP search and prediction features")
+        print(f"  4. 📱 Test and optimize for mobile")
+        
+        print(f"\n💡 CONNECTION INFO:")
+        print(f"  URI: {self.get_connection_uri()}")
+        print(f"  Database: {self.get_database_name()}")
+        print(f"  Collection: {self.collection_name}")
+        
+        print("\n" + "="*70)
+        print("🎉 NYC GOFETCH PLATFORM READY FOR DEVELOPMENT!")
+        print("="*70)
+    
+    def close_connection(self):
+        """Close MongoDB connection"""
+        if self.client:
+            close_client(self.client)
+            print("\n🔌 MongoDB connection closed.")
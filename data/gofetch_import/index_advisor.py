@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+Index Advisor for the GoFetch Air Quality Collection
+================================================================
+
+Records the query shapes the application actually runs and proposes the smallest
+set of indexes that serves them, plus the existing indexes that can be dropped.
+
+Query shapes come from one of:
+    - the built-in catalogue of backend queries (backend/models/AirQuality.js)
+    - the database profiler (db.system.profile, enable with db.setProfilingLevel(1))
+    - a captured query log: mongod JSON log lines or JSON Lines of {"filter": ..., "sort": ...}
+
+Indexes are laid out with the Equality, Sort, Range rule. Unanchored or
+case-insensitive regexes cannot bound an index scan, so they are left out of the key.
+
+Usage:
+    python -m gofetch_import.index_advisor                      # backend query catalogue
+    python -m gofetch_import.index_advisor --profile            # shapes from system.profile
+    python -m gofetch_import.index_advisor --log queries.jsonl  # shapes from a captured log
+    python -m gofetch_import.index_advisor --profile --apply    # create missing indexes
+"""
+
+import argparse
+import json
+import sys
+
+from .client import close_client, database_name, get_client
+
+RANGE_OPERATORS = {'$gt', '$gte', '$lt', '$lte', '$ne', '$nin', '$exists'}
+
+# Index names used by backend/models/AirQuality.js (ensureIndexes and the Atlas indexes it
+# relies on). The backend recreates them on startup, so they are kept in preference to
+# duplicates and never proposed for dropping.
+BACKEND_INDEX_NAMES = {
+    'start_date_desc_idx', 'geo_start_date_idx', 'Geo Place Name_1_Start_Date_-1',
+    'data_value_idx', 'data_value_index', 'geo_place_name_idx', 'indicator_name_idx', 'geo_join_id_idx'
+}
+
+# Query shapes issued by backend/models/AirQuality.js and the importer itself.
+# Each shape: equality fields, sort spec, range fields, and how it is used.
+BACKEND_QUERY_SHAPES = [
+    {
+        'source': 'AirQualityModel.findAll / getStatistics / getMonthlyTrends (date window)',
+        'filter': {'Start_Date': {'$gte': 'date', '$lte': 'date'}},
+        'sort': [('Start_Date', -1)]
+    },
+    {
+        'source': 'AirQualityModel.findAll / getByGeoPlaceName (location regex)',
+        'filter': {'Geo Place Name': {'$regex': 'name', '$options': 'i'}},
+        'sort': [('Start_Date', -1)]
+    },
+    {
+        'source': 'AirQualityModel.getGeoData (latest reading per place)',
+        'filter': {'Geo Place Name': 'name'},
+        'sort': [('Start_Date', -1)]
+    },
+    {
+        'source': 'AirQualityModel.getHighValueEvents',
+        'filter': {'Data Value': {'$gt': 0}},
+        'sort': [('Data Value', -1)]
+    },
+    {
+        'source': 'AirQualityModel.search (measures filter)',
+        'filter': {'Name': {'$in': ['name']}, 'Start_Date': {'$gte': 'date'}},
+        'sort': [('Start_Date', -1)]
+    },
+    {
+        'source': 'Indicator time series (dashboards, rollups)',
+        'filter': {'Indicator ID': 0, 'Start_Date': {'$gte': 'date', '$lt': 'date'}},
+        'sort': [('Start_Date', 1)]
+    },
+]
+
+
+def _is_indexable_regex(value, options=''):
+    """Only case-sensitive, ^-anchored regexes give the planner index bounds"""
+    pattern = getattr(value, 'pattern', value)
+    flags = options or getattr(value, 'flags', '')
+    if isinstance(flags, int):
+        flags = 'i' if flags & 2 else ''
+    return isinstance(pattern, str) and pattern.startswith('^') and 'i' not in str(flags)
+
+
+def _flatten_filter(query_filter):
+    """Yield (field, condition) pairs, expanding top-level $and"""
+    for field, condition in (query_filter or {}).items():
+        if field == '$and':
+            for clause in condition:
+                yield from _flatten_filter(clause)
+        elif not field.startswith('$'):
+            yield field, condition
+
+
+def shape_from_query(query_filter, sort=None, source=None):
+    """Reduce a filter/sort pair to its index-relevant shape"""
+    equality, ranges = [], []
+
+    for field, condition in _flatten_filter(query_filter):
+        if isinstance(condition, dict) and any(key.startswith('$') for key in condition):
+            operators = set(condition)
+            if '$regex' in operators:
+                if _is_indexable_regex(condition['$regex'], condition.get('$options', '')):
+                    ranges.append(field)
+            elif operators <= {'$eq', '$in'}:
+                equality.append(field)
+            elif operators & RANGE_OPERATORS:
+                ranges.append(field)
+        elif hasattr(condition, 'pattern'):
+            # Compiled regex / BSON Regex used directly as the value
+            if _is_indexable_regex(condition):
+                ranges.append(field)
+        else:
+            equality.append(field)
+
+    if isinstance(sort, dict):
+        sort = list(sort.items())
+    sort = [(field, int(direction)) for field, direction in (sort or [])
+            if isinstance(direction, (int, float))]
+
+    return {
+        'source': source,
+        'equality': sorted(set(equality)),
+        'sort': sort,
+        'range': sorted(set(ranges) - set(equality))
+    }
+
+
+def recommend_index(shape):
+    """Equality, Sort, Range key order for one shape"""
+    keys = [(field, 1) for field in shape['equality']]
+    used = set(shape['equality'])
+
+    for field, direction in shape['sort']:
+        if field not in used:
+            keys.append((field, direction))
+            used.add(field)
+
+    for field in shape['range']:
+        if field not in used:
+            keys.append((field, 1))
+            used.add(field)
+
+    return keys
+
+
+def _reverse(keys):
+    return [(field, -direction) for field, direction in keys]
+
+
+def _is_prefix(prefix, keys):
+    """True if an index on `keys` can do everything an index on `prefix` can"""
+    if len(prefix) > len(keys):
+        return False
+    head = list(keys[:len(prefix)])
+    return list(prefix) == head or _reverse(prefix) == head
+
+
+def _is_equivalent(keys, other):
+    """Same key list, or the same one scanned backwards"""
+    return len(keys) == len(other) and _is_prefix(keys, other)
+
+
+def is_served(keys, existing_key_lists):
+    """True if one of the existing indexes can do everything an index on `keys` can"""
+    return any(_is_prefix(keys, existing) for existing in existing_key_lists)
+
+
+def minimal_index_set(key_lists):
+    """Drop duplicates and any index that is a prefix of another proposed index"""
+    unique = []
+    for keys in key_lists:
+        if keys and keys not in unique and _reverse(keys) not in unique:
+            unique.append(keys)
+
+    return [
+        keys for keys in unique
+        if not any(other is not keys and _is_prefix(keys, other) for other in unique)
+    ]
+
+
+def recommended_indexes(shapes=None):
+    """Minimal index key lists for the given shapes (the backend catalogue by default)"""
+    if shapes is None:
+        shapes = [shape_from_query(q['filter'], q['sort'], q['source']) for q in BACKEND_QUERY_SHAPES]
+    return minimal_index_set([recommend_index(shape) for shape in shapes])
+
+
+def shapes_from_command(command, source=None):
+    """Extract shapes from a find/count/aggregate command document"""
+    if 'find' in command:
+        return [shape_from_query(command.get('filter'), command.get('sort'), source)]
+    if 'count' in command:
+        return [shape_from_query(command.get('query'), None, source)]
+    if 'aggregate' in command:
+        pipeline = command.get('pipeline', [])
+        match = next((stage['$match'] for stage in pipeline if '$match' in stage), None)
+        sort = next((stage['$sort'] for stage in pipeline if '$sort' in stage), None)
+        # Only a leading $match/$sort can use an index
+        if pipeline and ('$match' in pipeline[0] or '$sort' in pipeline[0]):
+            return [shape_from_query(match, sort, source)]
+    return []
+
+
+def load_profile_shapes(collection, limit=10000):
+    """Read query shapes recorded by the database profiler for this collection"""
+    namespace = f"{collection.database.name}.{collection.name}"
+    shapes = []
+    cursor = collection.database['system.profile'].find(
+        {'ns': namespace, 'op': {'$in': ['query', 'command']}}
+    ).limit(limit)
+    for entry in cursor:
+        shapes.extend(shapes_from_command(entry.get('command', {}), source='system.profile'))
+    return shapes
+
+
+def load_log_shapes(log_path, collection_name=None):
+    """Read query shapes from mongod JSON log lines or JSON Lines of {filter, sort}"""
+    shapes = []
+    with open(log_path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+            command = entry.get('attr', {}).get('command')
+            if command is not None:
+                target = command.get('find') or command.get('aggregate') or command.get('count')
+                if collection_name and target != collection_name:
+                    continue
+                shapes.extend(shapes_from_command(command, source=log_path))
+            elif 'filter' in entry or 'sort' in entry:
+                shapes.append(shape_from_query(entry.get('filter'), entry.get('sort'), log_path))
+    return shapes
+
+
+def advise(shapes, existing_indexes):
+    """Compare the minimal index set for `shapes` with the indexes on the collection"""
+    proposed = minimal_index_set([recommend_index(shape) for shape in shapes])
+
+    secondary = []
+    for info in existing_indexes:
+        # _id, unique and text indexes are structural, not query-shape driven
+        if info['name'] == '_id_' or info.get('unique') or 'weights' in info:
+            continue
+        secondary.append((info['name'], list(info['key'].items())))
+
+    # Identical or reversed indexes: keep one of each group (the backend's, else the first
+    # listed, which is the oldest) and drop the others
+    keepers, to_drop = [], []
+    ranked = sorted(enumerate(secondary), key=lambda item: (item[1][0] not in BACKEND_INDEX_NAMES, item[0]))
+    for _, (name, keys) in ranked:
+        keeper = next((kept for kept in keepers if _is_equivalent(keys, kept[1])), None)
+        if keeper is None:
+            keepers.append((name, keys))
+        else:
+            to_drop.append((name, keys, f'duplicate of {keeper[0]}'))
+    keepers.sort(key=lambda kept: secondary.index(kept))
+
+    for name, keys in keepers:
+        if name in BACKEND_INDEX_NAMES:
+            continue
+        # Redundant: another kept index starts with these keys
+        if any(other_name != name and _is_prefix(keys, other) for other_name, other in keepers):
+            to_drop.append((name, keys, 'prefix of another index'))
+        # Unused: no proposed index can be served by it
+        elif not any(_is_prefix(p, keys) or _is_prefix(keys, p) for p in proposed):
+            to_drop.append((name, keys, 'serves no recorded query shape'))
+
+    # Only what survives the drops counts as present
+    dropped = {name for name, _, _ in to_drop}
+    remaining = [keys for name, keys in secondary if name not in dropped]
+    to_create = [keys for keys in proposed if not is_served(keys, remaining)]
+
+    return {'proposed': proposed, 'create': to_create, 'drop': to_drop}
+
+
+def format_keys(keys):
+    return "{" + ", ".join(f"'{field}': {direction}" for field, direction in keys) + "}"
+
+
+def main(argv=None):
+    """Run the advisor against the configured collection"""
+    parser = argparse.ArgumentParser(description="Propose indexes for the GoFetch air quality collection")
+    parser.add_argument("--profile", action="store_true", help="Read query shapes from db.system.profile")
+    parser.add_argument("--log", help="Read query shapes from a captured query log")
+    parser.add_argument("--apply", action="store_true", help="Create the missing indexes")
+    parser.add_argument("--drop", action="store_true", help="Also drop the redundant indexes")
+    args = parser.parse_args(argv)
+
+    client = get_client()
+    collection = client[database_name()]['air_quality_data']
+
+    try:
+        if args.profile:
+            shapes = load_profile_shapes(collection)
+        elif args.log:
+            shapes = load_log_shapes(args.log, collection.name)
+        else:
+            shapes = [shape_from_query(q['filter'], q['sort'], q['source']) for q in BACKEND_QUERY_SHAPES]
+
+        print(f"📋 Query shapes recorded: {len(shapes):,}")
+        distinct = {(tuple(s['equality']), tuple(s['sort']), tuple(s['range'])) for s in shapes}
+        for equality, sort, ranges in sorted(distinct):
+            print(f"  • eq={list(equality)} sort={list(sort)} range={list(ranges)}")
+
+        report = advise(shapes, list(collection.list_indexes()))
+
+        print(f"\n✅ Minimal index set ({len(report['proposed'])}):")
+        for keys in report['proposed']:
+            print(f"  • {format_keys(keys)}")
+
+        print(f"\n➕ Indexes to create ({len(report['create'])}):")
+        for keys in report['create']:
+            print(f"  • db.air_quality_data.createIndex({format_keys(keys)})")
+
+        print(f"\n🗑️ Indexes to drop ({len(report['drop'])}):")
+        for name, keys, reason in report['drop']:
+            print(f"  • {name} {format_keys(keys)} – {reason}")
+
+        if args.apply:
+            for keys in report['create']:
+                name = collection.create_index(keys)
+                print(f"  ✅ Created {name}")
+            if args.drop:
+                for name, _, _ in report['drop']:
+                    collection.drop_index(name)
+                    print(f"  🗑️ Dropped {name}")
+
+        return 0
+    finally:
+        close_client(client)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
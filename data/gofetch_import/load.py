@@ -0,0 +1,437 @@
+"""
+Load command: import NYC air quality CSV exports into MongoDB.
+
+Usage:
+    python -m gofetch_import load
+    python -m gofetch_import load --stream --chunk-size 50000   # flat-memory import of large exports
+    python -m gofetch_import load --csv "exports/*.csv.gz"      # several (compressed) exports
+    python -m gofetch_import sync --delete-removed              # incremental refresh
+
+Requirements:
+    - pandas
+    - pymongo
+    - python-dotenv
+    - MongoDB Atlas connection string in .env file
+"""
+
+import argparse
+import sys
+import time
+
+from .compact import FACTS_COLLECTION
+from .forecast import HORIZON
+from .importer import GoFetchMongoImporter
+from .manifest import MANIFEST_COLLECTION, ImportCheckpoint, ImportManifest, file_schema, file_stat
+from .metrics import print_report, write_json, write_prometheus
+from .sources import expand_sources, is_stdin
+from .timeseries import TIMESERIES_COLLECTION
+
+def add_arguments(parser):
+    """Options of the load (and sync) command"""
+    parser.add_argument("--csv", nargs="+", default=["Air_Quality_20250613.csv"],
+                        help="CSV files, globs or '-' for stdin; .gz/.bz2/.xz/.zst are decompressed on the fly")
+    parser.add_argument("--batch-size", type=int, default=500, help="Documents per insert batch")
+    parser.add_argument("--storage", choices=["wide", "compact", "timeseries"], default="wide",
+                        help="wide: one self-describing document per row; compact: dimension collections "
+                             "plus integer-coded facts in air_quality_facts; timeseries: MongoDB time-series "
+                             "collection air_quality_timeseries")
+    parser.add_argument("--replace", action="store_true",
+                        help="With --storage timeseries: drop the target first (needed to load into one with data)")
+    parser.add_argument("--stream", action="store_true",
+                        help="Read the CSV in chunks and insert each chunk directly (flat memory)")
+    parser.add_argument("--chunk-size", type=int, default=50000, help="Rows per CSV chunk in --stream mode")
+    parser.add_argument("--upsert", action="store_true",
+                        help="Upsert on Unique ID with bulk_write instead of inserting new documents")
+    parser.add_argument("--upsert-mode", choices=["replace", "update"], default="replace",
+                        help="Use ReplaceOne (whole document) or UpdateOne/$set operations when upserting")
+    parser.add_argument("--prefetch", type=int, default=2, metavar="CHUNKS",
+                        help="With --stream, chunks parsed ahead on a background thread while writes run "
+                             "(0 parses inline)")
+    parser.add_argument("--pipeline", action="store_true",
+                        help="Overlap parsing, preparing, encoding and writes with the asyncio pipeline "
+                             "(AsyncMongoClient, pymongo 4.10+)")
+    parser.add_argument("--in-flight", type=int, default=4,
+                        help="With --pipeline, insert_many/bulk_write calls outstanding at once")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Number of parallel writer threads (1 keeps the sequential import)")
+    parser.add_argument("--raw-bson", action="store_true",
+                        help="Pre-encode inserted documents as RawBSONDocument before sending")
+    parser.add_argument("--dead-letter", default=None,
+                        help="JSON Lines file for records the server rejected (duplicates are skipped, not recorded)")
+    parser.add_argument("--quarantine", metavar="PATH",
+                        help="CSV file for rows that fail schema validation, with the reasons")
+    parser.add_argument("--rollups", action="store_true",
+                        help="Build the dashboard rollup collections after the load "
+                             "(with --incremental only the changed series are refreshed)")
+    parser.add_argument("--predictions", action="store_true",
+                        help="Retrain the per-series forecasts and rewrite the predictions collection after the load")
+    parser.add_argument("--forecast-horizon", type=int, default=HORIZON,
+                        help="Yearly readings to forecast per series and season")
+    parser.add_argument("--snapshot", metavar="DIR",
+                        help="Also write the prepared data as a columnar snapshot partitioned by indicator and year")
+    parser.add_argument("--snapshot-format", choices=["parquet", "arrow"], default="parquet",
+                        help="Snapshot file format (arrow files are memory-mapped on read)")
+    parser.add_argument("--no-latest", action="store_true",
+                        help="Don't maintain the latest_by_place collection during the import")
+    parser.add_argument("--manifest-file", metavar="PATH",
+                        help="Keep the import manifest in a local JSON file instead of the import_manifest collection")
+    parser.add_argument("--no-manifest", action="store_true",
+                        help="Don't consult or record the import manifest")
+    parser.add_argument("--force", action="store_true",
+                        help="Import even if the manifest says this file was already imported")
+    parser.add_argument("--memory-efficient", action="store_true",
+                        help="Keep repeated text as categories and downcast integer columns, "
+                             "printing the per-column memory footprint")
+    parser.add_argument("--memory-budget-mb", type=float, metavar="MB",
+                        help="With --memory-efficient, warn when the prepared frame is larger than this")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Always parse the CSV; don't read or write the pre-parsed cache")
+    parser.add_argument("--cache-dir", metavar="DIR",
+                        help="Where to keep the pre-parsed cache (default: .gofetch_cache next to the CSV)")
+    parser.add_argument("--index-strategy", choices=["live", "deferred"], default="live",
+                        help="live: create indexes first and maintain them during the load; "
+                             "deferred: drop secondary indexes, bulk load, then rebuild them")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only write rows that are new or whose content hash changed")
+    parser.add_argument("--delete-removed", action="store_true",
+                        help="With --incremental and a single source, delete documents whose Unique ID "
+                             "is no longer in the CSV")
+    parser.add_argument("--quiet", action="store_true",
+                        help="Skip the per-batch and per-chunk progress lines")
+    parser.add_argument("--metrics-json", metavar="PATH",
+                        help="Write per-stage metrics (throughput, batch latencies, bytes, retries, peak RSS) as JSON")
+    parser.add_argument("--metrics-prom", metavar="PATH",
+                        help="Write the same metrics as a Prometheus textfile (node_exporter textfile collector)")
+    return parser
+
+def parse_args(argv=None):
+    """Parse command line options for the import"""
+    parser = argparse.ArgumentParser(description="Import NYC air quality data into MongoDB for GoFetch")
+    return add_arguments(parser).parse_args(argv)
+
+def run_import(importer, args, csv_file):
+    """Import one source with the mode selected on the command line, returning True on success"""
+    
+    if args.storage in ("compact", "timeseries"):
+        # Alternative layouts: coded facts + dimensions, or a time-series collection
+        if args.stream:
+            frames = importer.iter_prepared_chunks(csv_file, args.chunk_size)
+        else:
+            frames = importer.load_and_prepare_data(csv_file)
+            if frames is None:
+                print("❌ Cannot proceed without data")
+                return False
+        
+        print("\n" + "="*50)
+        print(f"🚀 STARTING {args.storage.upper()} IMPORT PROCESS")
+        print("="*50)
+        
+        if args.storage == "compact":
+            import_success = importer.import_compact(frames, batch_size=args.batch_size, upsert=args.upsert)
+        else:
+            import_success = importer.import_timeseries(frames, batch_size=args.batch_size)
+    elif args.incremental:
+        df = importer.load_and_prepare_data(csv_file)
+        
+        if df is None:
+            print("❌ Cannot proceed without data")
+            return False
+        
+        print("\n" + "="*50)
+        print("🔁 STARTING INCREMENTAL SYNC")
+        print("="*50)
+        
+        sync_result = importer.sync_incremental(
+            df, batch_size=args.batch_size, delete_removed=args.delete_removed, upsert_mode=args.upsert_mode
+        )
+        import_success = sync_result is not None
+        
+        if import_success and args.rollups:
+            importer.refresh_rollups(sync_result['affected_series'], sync_result['affected_places'])
+    elif args.pipeline:
+        # Pipelined mode: parse, prepare, encode and write stages run concurrently
+        print("\n" + "="*50)
+        print("🚀 STARTING PIPELINED IMPORT PROCESS")
+        print("="*50)
+        
+        import_success = importer.import_pipelined(
+            csv_file, chunk_size=args.chunk_size, batch_size=args.batch_size, in_flight=args.in_flight,
+            update_existing=args.upsert, upsert_mode=args.upsert_mode
+        )
+    elif args.workers > 1:
+        # Parallel mode: prepared batches feed a bounded queue drained by writer threads
+        if args.stream:
+            frames = importer.iter_prepared_chunks(csv_file, args.chunk_size)
+        else:
+            frames = importer.load_and_prepare_data(csv_file)
+            if frames is None:
+                print("❌ Cannot proceed without data")
+                return False
+        
+        print("\n" + "="*50)
+        print("🚀 STARTING PARALLEL IMPORT PROCESS")
+        print("="*50)
+        
+        import_success = importer.import_parallel(
+            importer.iter_record_batches(frames, args.batch_size, args.upsert), workers=args.workers,
+            update_existing=args.upsert, upsert_mode=args.upsert_mode
+        )
+    elif args.stream:
+        # Streaming mode: parse, prepare and insert one chunk at a time
+        print("\n" + "="*50)
+        print("🚀 STARTING STREAMING IMPORT PROCESS")
+        print("="*50)
+        
+        import_success = importer.import_stream(
+            csv_file, chunk_size=args.chunk_size, batch_size=args.batch_size,
+            update_existing=args.upsert, upsert_mode=args.upsert_mode
+        )
+    else:
+        # Load and prepare data
+        df = importer.load_and_prepare_data(csv_file)
+        
+        if df is None:
+            print("❌ Cannot proceed without data")
+            return False
+        
+        # Import data
+        print("\n" + "="*50)
+        print("🚀 STARTING IMPORT PROCESS")
+        print("="*50)
+        
+        import_success = importer.import_data(
+            df, batch_size=args.batch_size, update_existing=args.upsert, upsert_mode=args.upsert_mode
+        )
+    
+    return import_success
+
+def manifest_target(importer, args):
+    """Where this run writes, so the same file imported elsewhere is not skipped"""
+    collection = {
+        'compact': FACTS_COLLECTION,
+        'timeseries': TIMESERIES_COLLECTION
+    }.get(args.storage, importer.collection_name)
+    mode = 'incremental' if args.incremental else 'upsert' if args.upsert else 'insert'
+    return f"{importer.get_database_name()}.{collection}:{mode}"
+
+def open_manifest(importer, args):
+    """Manifest backed by a local JSON file or the import_manifest collection"""
+    if args.manifest_file:
+        return ImportManifest(path=args.manifest_file)
+    return ImportManifest(collection=importer.db[MANIFEST_COLLECTION])
+
+def plan_source(importer, args, manifest, source):
+    """Check one source against the manifest, returning its plan or None when it can be skipped"""
+    plan = {'source': source, 'key': None}
+    if manifest is None:
+        return plan
+    if is_stdin(source):
+        print("ℹ️ stdin can't be fingerprinted; it is imported without the manifest")
+        return plan
+    
+    target = manifest_target(importer, args)
+    stat = file_stat(source)
+    
+    # Same path, size and mtime as a completed import: skip without hashing
+    previous = manifest.find_completed_by_stat(stat, target)
+    if previous is not None and not args.force:
+        print(f"⏭️ {source} is unchanged since {previous.get('finished_at')} "
+              f"({previous.get('row_count') or 0:,} rows); nothing to import")
+        return None
+    
+    sha256 = importer.source_sha256(source)
+    key = ImportManifest.key(sha256, target)
+    previous = manifest.get(key)
+    if previous is not None and previous.get('status') == 'completed' and not args.force:
+        print(f"⏭️ {source} matches a completed import (sha256 {sha256[:12]}…); nothing to import")
+        manifest.update(key, {'stat': stat})
+        return None
+    
+    plan.update(key=key, sha256=sha256, stat=stat, target=target)
+    return plan
+
+def timeseries_target_ready(importer):
+    """A time-series collection can't skip duplicate rows, so only load into an empty one,
+    one this run is filling, or one an interrupted run is resuming"""
+    checkpoint = importer.checkpoint
+    if importer.timeseries_written or (checkpoint is not None and checkpoint.rows_committed):
+        return True
+    if TIMESERIES_COLLECTION not in importer.db.list_collection_names():
+        return True
+    if importer.db[TIMESERIES_COLLECTION].estimated_document_count() == 0:
+        return True
+    print(f"❌ {TIMESERIES_COLLECTION} already has data and would get a second copy of every row; "
+          f"use --replace to rebuild it")
+    return False
+
+def import_source(importer, args, manifest, plan):
+    """Import one planned source, checkpointing its batches in the manifest"""
+    source = plan['source']
+    importer.checkpoint = None
+    
+    print(f"\n📄 Source: {source}")
+    if plan['key'] is not None:
+        chunked = args.stream or args.pipeline
+        settings = {'batch_size': args.batch_size, 'stream': chunked,
+                    'chunk_size': args.chunk_size if chunked else None, 'storage': args.storage}
+        committed = manifest.start(plan['key'], plan['sha256'], plan['stat'], plan['target'],
+                                   file_schema(source), settings, fresh=args.force)
+        importer.checkpoint = ImportCheckpoint(manifest, plan['key'], committed)
+        if committed:
+            print(f"🔁 Resuming interrupted import: {len(committed):,} batches "
+                  f"({importer.checkpoint.rows_committed:,} rows) already committed")
+            # A batch that landed after its last checkpoint is re-sent; the unique
+            # index turns its rows into skipped duplicates instead of copies
+            if args.storage == "wide":
+                importer.ensure_unique_id_index()
+    
+    before = (importer.rows_read, importer.duplicates_skipped, importer.dead_lettered, importer.rows_rejected)
+    started = time.perf_counter()
+    ready = args.storage != "timeseries" or timeseries_target_ready(importer)
+    success = ready and run_import(importer, args, source)
+    
+    if plan['key'] is not None:
+        manifest.finish(plan['key'], success, row_count=importer.rows_read - before[0], result={
+            'duplicates_skipped': importer.duplicates_skipped - before[1],
+            'dead_lettered': importer.dead_lettered - before[2],
+            'rejected': importer.rows_rejected - before[3],
+            'seconds': time.perf_counter() - started
+        })
+    return success
+
+def write_metrics(importer, args, success):
+    """Print the run's metrics and write the requested report files"""
+    report = importer.metrics_report(success)
+    print_report(report)
+    for path, writer in ((args.metrics_json, write_json), (args.metrics_prom, write_prometheus)):
+        if not path:
+            continue
+        try:
+            writer(report, path)
+            print(f"  📝 Metrics written to {path}")
+        except Exception as e:
+            print(f"  ⚠️ Could not write metrics to {path}: {e}")
+
+def run(args):
+    """Run the import process for parsed load options, returning an exit code"""
+    print("🌟 NYC GoFetch Air Quality Data MongoDB Import")
+    print("=" * 50)
+    
+    if args.replace and args.storage != "timeseries":
+        print("❌ --replace only applies to --storage timeseries")
+        return 1
+    if args.replace:
+        # The target is rebuilt, so every source is loaded again from its first batch
+        args.force = True
+    
+    try:
+        sources = expand_sources(args.csv)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+    
+    # Each source is compared with the whole collection, so with several of them every
+    # file would delete the rows of all the others
+    if args.delete_removed and len(sources) > 1:
+        print(f"❌ --delete-removed needs a single source; {len(sources)} were given")
+        return 1
+    
+    # Initialize importer
+    importer = GoFetchMongoImporter(
+        max_pool_size=max(args.workers * 2, 100) if args.workers > 1 else None,
+        dead_letter_path=args.dead_letter,
+        raw_bson=args.raw_bson,
+        maintain_latest=not args.no_latest,
+        use_cache=not args.no_cache,
+        cache_dir=args.cache_dir,
+        memory_efficient=args.memory_efficient,
+        memory_budget_mb=args.memory_budget_mb,
+        quarantine_path=args.quarantine,
+        prefetch_depth=args.prefetch,
+        quiet=args.quiet,
+        # Sizing dict documents re-encodes them, so only when a report is written
+        measure_bytes=bool(args.metrics_json or args.metrics_prom)
+    )
+    
+    # Connect to MongoDB
+    if not importer.connect_mongodb():
+        print("❌ Cannot proceed without MongoDB connection")
+        write_metrics(importer, args, False)
+        return 1
+    
+    manifest = None if args.no_manifest else open_manifest(importer, args)
+    plans = []
+    for source in sources:
+        try:
+            plan = plan_source(importer, args, manifest, source)
+        except FileNotFoundError:
+            print(f"❌ File not found: {source}")
+            write_metrics(importer, args, False)
+            importer.close_connection()
+            return 1
+        if plan is not None:
+            plans.append(plan)
+    
+    if not plans:
+        print("✅ Every source is already imported")
+        write_metrics(importer, args, True)
+        importer.close_connection()
+        return 0
+    print(f"📚 Sources to import: {len(plans)} of {len(sources)}")
+    
+    if args.replace and args.storage == "timeseries":
+        print(f"🗑️ Dropping {TIMESERIES_COLLECTION} (--replace)")
+        importer.db.drop_collection(TIMESERIES_COLLECTION)
+    
+    if args.snapshot and not importer.enable_snapshot(args.snapshot, args.snapshot_format):
+        importer.close_connection()
+        return 1
+    
+    # Load every source under the chosen index strategy, applied to the collection the
+    # --storage layout writes to; a failed source doesn't stop the rest
+    try:
+        import_success, timings = importer.load_with_index_strategy(
+            lambda: all([import_source(importer, args, manifest, plan) for plan in plans]),
+            strategy=args.index_strategy, storage=args.storage
+        )
+    except ValueError as e:
+        print(f"❌ {e}")
+        import_success = False
+    
+    if not import_success:
+        print("❌ Import failed")
+        write_metrics(importer, args, False)
+        importer.close_connection()
+        return 1
+    
+    importer.finish_snapshot(", ".join(plan['source'] for plan in plans))
+    
+    # Full rollup rebuild after a full load (incremental runs refresh their own series)
+    if args.rollups and not args.incremental:
+        print("\n📊 Building rollup collections...")
+        importer.refresh_rollups()
+    
+    # Forecasts always retrain on the whole history, after full and incremental loads alike
+    if args.predictions:
+        print("\n🔮 Building predictions...")
+        importer.refresh_predictions(horizon=args.forecast_horizon)
+    
+    # Test queries
+    print("\n🧪 Testing database queries...")
+    importer.test_queries(args.storage)
+    
+    # Print summary
+    importer.print_summary()
+    write_metrics(importer, args, True)
+    
+    # Close connection
+    importer.close_connection()
+    
+    return 0
+
+def main(argv=None):
+    """Main function to run the import process"""
+    return run(parse_args(argv))
+
+if __name__ == "__main__":
+    sys.exit(main())
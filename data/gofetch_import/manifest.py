@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Content-Addressed Import Manifest for GoFetch
+================================================================
+
+Records every source file the importer has processed — SHA-256, size, row count,
+schema and the import result — in a small MongoDB collection (import_manifest) or a
+local JSON file. Before parsing anything the importer asks the manifest whether this
+exact file was already imported into the same target:
+
+    - completed before  -> exit immediately (unless --force)
+    - interrupted run   -> skip the batches it already committed
+
+A file whose path, size and modification time match a completed entry is skipped
+without even hashing it; otherwise the SHA-256 decides.
+
+Each entry also carries the run's progress document: the IDs of the batches written so
+far (derived from their Unique ID range, see batch_id()) and their row counts. Batches
+are written with a unique index on Unique ID, so a batch that landed just before a
+crash but was never recorded is harmlessly re-sent as duplicates on restart.
+
+Usage:
+    python -m gofetch_import load                                       # manifest in MongoDB
+    python -m gofetch_import load --manifest-file import_manifest.json
+    python -m gofetch_import load --force                               # import even if unchanged
+"""
+
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+
+import pandas as pd
+
+from .sources import read_csv
+
+MANIFEST_COLLECTION = 'import_manifest'
+
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+def file_stat(path):
+    """Cheap identity of a file: absolute path, size and modification time"""
+    stat = os.stat(path)
+    return {'path': os.path.abspath(path), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def file_sha256(path):
+    """SHA-256 of the file contents, read in 1 MiB blocks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def file_schema(path):
+    """Column names from the CSV header (compressed files included)"""
+    return list(read_csv(path, nrows=0).columns)
+
+
+class ImportManifest:
+    """Manifest entries keyed by (sha256, target), stored in MongoDB or a JSON file"""
+
+    def __init__(self, collection=None, path=None):
+        if (collection is None) == (path is None):
+            raise ValueError("ImportManifest needs exactly one of collection or path")
+        self.collection = collection
+        self.path = path
+        self.lock = threading.Lock()
+        self.entries = {}
+        if path is not None and os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                self.entries = json.load(f)
+
+    @staticmethod
+    def key(sha256, target):
+        return f"{sha256}:{target}"
+
+    def _save_file(self):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f, indent=2, default=str)
+        os.replace(tmp_path, self.path)
+
+    def get(self, key):
+        if self.collection is not None:
+            return self.collection.find_one({'_id': key})
+        return self.entries.get(key)
+
+    def find_completed_by_stat(self, stat, target):
+        """A completed entry for the same path/size/mtime, found without hashing the file"""
+        query = {'target': target, 'status': 'completed', **{f'stat.{k}': v for k, v in stat.items()}}
+        if self.collection is not None:
+            return self.collection.find_one(query)
+        for entry in self.entries.values():
+            if entry.get('target') == target and entry.get('status') == 'completed' and entry.get('stat') == stat:
+                return entry
+        return None
+
+    def update(self, key, fields):
+        with self.lock:
+            if self.collection is not None:
+                self.collection.update_one({'_id': key}, {'$set': fields}, upsert=True)
+            else:
+                self.entries.setdefault(key, {'_id': key}).update(fields)
+                self._save_file()
+
+    def start(self, key, sha256, stat, target, schema, settings, fresh=False):
+        """Mark a run as started and return the batches an interrupted run already committed
+
+        Progress is only kept when the previous run used the same settings; otherwise
+        (or with fresh=True) the run starts from the first batch.
+        """
+        previous = self.get(key) or {}
+        committed = {}
+        if not fresh and previous.get('settings') == settings:
+            committed = (previous.get('progress') or {}).get('batches', {})
+        self.update(key, {
+            'sha256': sha256,
+            'stat': stat,
+            'target': target,
+            'schema': schema,
+            'settings': settings,
+            'status': 'running',
+            'started_at': datetime.now(),
+            'progress': {'batches': committed, 'updated_at': datetime.now()}
+        })
+        return dict(committed)
+
+    def commit_batch(self, key, batch, rows):
+        """Record one batch as written; setting the same batch twice is harmless"""
+        now = datetime.now()
+        with self.lock:
+            if self.collection is not None:
+                self.collection.update_one({'_id': key}, {'$set': {
+                    f'progress.batches.{batch}': rows,
+                    'progress.updated_at': now
+                }})
+            else:
+                progress = self.entries[key].setdefault('progress', {'batches': {}})
+                progress['batches'][batch] = rows
+                progress['updated_at'] = now
+                self._save_file()
+
+    def finish(self, key, success, row_count=None, result=None):
+        self.update(key, {
+            'status': 'completed' if success else 'failed',
+            'finished_at': datetime.now(),
+            'row_count': row_count,
+            'result': result or {}
+        })
+
+
+def batch_id(unique_ids):
+    """Stable ID for a batch from its Unique ID range and size, e.g. '336867-409718:1000'
+
+    It names the same rows whatever order the batches are written in, so a restart can
+    tell which batches landed even after parallel writers finished out of order.
+    """
+    ids = pd.Series(unique_ids, dtype='float64').dropna()
+    if ids.empty:
+        raise ValueError("A batch needs at least one Unique ID")
+    return f"{int(ids.min())}-{int(ids.max())}:{len(unique_ids)}"
+
+
+class ImportCheckpoint:
+    """Which batches of one import run have been committed, backed by its manifest entry"""
+
+    def __init__(self, manifest, key, committed=None):
+        self.manifest = manifest
+        self.key = key
+        self.committed = dict(committed or {})
+        self.lock = threading.Lock()
+
+    def is_committed(self, batch):
+        with self.lock:
+            return batch in self.committed
+
+    def commit(self, batch, rows):
+        with self.lock:
+            self.committed[batch] = rows
+        self.manifest.commit_batch(self.key, batch, rows)
+
+    @property
+    def rows_committed(self):
+        with self.lock:
+            return sum(self.committed.values())
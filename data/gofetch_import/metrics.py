@@ -0,0 +1,263 @@
+"""
+Per-stage import metrics: timings, throughput, batch latencies, bytes, retries and memory.
+
+GoFetchMongoImporter records into an ImportMetrics as it runs:
+
+    stages      seconds, rows and calls per stage (parse, cache_load, prepare, documents,
+                insert, upsert, compact_write, timeseries_write, index phases, rollups);
+                with parallel writers, a stage's seconds add up across threads
+    batches     latency histogram per write operation (insert / upsert)
+    counters    rows inserted/updated, retries, bytes sent (uncompressed BSON payload,
+                before wire compression)
+    memory      peak RSS of the process
+
+The report is a plain dict, written as JSON or as a Prometheus textfile for the
+node_exporter textfile collector. Both files are replaced atomically, so a scrape
+never sees a half-written file.
+
+Usage:
+    python -m gofetch_import load --quiet --metrics-json import_metrics.json \\
+        --metrics-prom /var/lib/node_exporter/textfile/gofetch_import.prom
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Upper bounds (seconds) of the batch latency buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+PROMETHEUS_PREFIX = 'gofetch_import'
+
+
+def peak_rss_bytes():
+    """Peak resident set size of this process, or None where getrusage is unavailable"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class Histogram:
+    """Fixed-bucket latency histogram (Prometheus semantics: cumulative, le = upper bound)"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        index = next((i for i, bound in enumerate(self.buckets) if value <= bound), len(self.buckets))
+        self.counts[index] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-quantile (the observed max for the last bucket)"""
+        if self.count == 0:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def cumulative(self):
+        """(upper bound, cumulative count) pairs, ending with +Inf"""
+        total = 0
+        pairs = []
+        for bound, count in zip(list(self.buckets) + [float('inf')], self.counts):
+            total += count
+            pairs.append((bound, total))
+        return pairs
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'sum_seconds': self.sum,
+            'mean_seconds': self.sum / self.count if self.count else None,
+            'max_seconds': self.max,
+            'p50_seconds': self.quantile(0.5),
+            'p95_seconds': self.quantile(0.95),
+            'p99_seconds': self.quantile(0.99),
+            'buckets': {('+Inf' if bound == float('inf') else str(bound)): count
+                        for bound, count in self.cumulative()}
+        }
+
+
+class ImportMetrics:
+    """Thread-safe recorder for one import run"""
+
+    def __init__(self, measure_bytes=False):
+        # Encoding dict documents just to size them costs time, so it is opt-in;
+        # pre-encoded RawBSONDocuments are always measured
+        self.measure_bytes = measure_bytes
+        self.lock = threading.Lock()
+        self.started = time.perf_counter()
+        self.started_at = datetime.now()
+        self.stages = {}
+        self.batches = defaultdict(Histogram)
+        self.counters = defaultdict(int)
+
+    def add_stage(self, name, seconds, rows=0):
+        with self.lock:
+            stage = self.stages.setdefault(name, {'seconds': 0.0, 'rows': 0, 'calls': 0})
+            stage['seconds'] += seconds
+            stage['rows'] += rows
+            stage['calls'] += 1
+
+    @contextmanager
+    def stage(self, name, rows=0):
+        """Time a block as one call of a stage; set timing['rows'] inside when it isn't known upfront"""
+        timing = {'rows': rows}
+        started = time.perf_counter()
+        try:
+            yield timing
+        finally:
+            self.add_stage(name, time.perf_counter() - started, timing['rows'])
+
+    def timed_iter(self, name, frames):
+        """Yield from an iterator of frames, timing each step as one call of a stage"""
+        frames = iter(frames)
+        while True:
+            started = time.perf_counter()
+            frame = next(frames, None)
+            if frame is None:
+                return
+            self.add_stage(name, time.perf_counter() - started, len(frame))
+            yield frame
+
+    def observe_batch(self, operation, seconds, documents, payload_bytes=0):
+        with self.lock:
+            self.batches[operation].observe(seconds)
+            self.counters['bytes_sent'] += payload_bytes
+        self.add_stage(operation, seconds, documents)
+
+    def count(self, name, value=1):
+        with self.lock:
+            self.counters[name] += value
+
+    def report(self, rows=None, success=None):
+        """The run so far as a JSON-serializable dict; `rows` adds the importer's row counters"""
+        elapsed = time.perf_counter() - self.started
+        with self.lock:
+            counters = dict(self.counters)
+            stages = {name: dict(stage) for name, stage in self.stages.items()}
+            batches = {operation: histogram.to_dict() for operation, histogram in self.batches.items()}
+
+        rows = dict(rows or {}, inserted=0, updated=0)
+        for name in [name for name in counters if name.startswith('rows_')]:
+            rows[name[len('rows_'):]] = counters.pop(name)
+        written = rows['inserted'] + rows['updated']
+        for stage in stages.values():
+            stage['rows_per_sec'] = stage['rows'] / stage['seconds'] if stage['rows'] and stage['seconds'] else None
+
+        return {
+            'started_at': self.started_at.isoformat(timespec='seconds'),
+            'finished_at': datetime.now().isoformat(timespec='seconds'),
+            'success': success,
+            'duration_seconds': elapsed,
+            'rows': rows,
+            'rows_per_sec': written / elapsed if elapsed else None,
+            'stages': stages,
+            'batches': batches,
+            'bytes_sent': counters.pop('bytes_sent', 0),
+            'retries': counters.pop('retries', 0),
+            'peak_rss_bytes': peak_rss_bytes(),
+            **counters
+        }
+
+
+def write_atomic(path, text):
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    partial = os.path.join(directory, f".{os.path.basename(path)}.partial")
+    with open(partial, 'w', encoding='utf-8') as handle:
+        handle.write(text)
+    os.replace(partial, path)
+
+
+def write_json(report, path):
+    write_atomic(path, json.dumps(report, indent=2) + '\n')
+
+
+def prometheus_text(report):
+    """Render a report in the Prometheus text exposition format"""
+    lines = []
+
+    def metric(name, kind, help_text, samples):
+        name = f"{PROMETHEUS_PREFIX}_{name}"
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for suffix, labels, value in samples:
+            if value is None:
+                continue
+            label_text = ','.join(f'{key}="{val}"' for key, val in labels.items())
+            lines.append(f"{name}{suffix}{{{label_text}}} {value}" if label_text else f"{name}{suffix} {value}")
+
+    metric('success', 'gauge', 'Whether the last import run succeeded (1) or failed (0)',
+           [('', {}, None if report['success'] is None else int(bool(report['success'])))])
+    metric('last_run_timestamp_seconds', 'gauge', 'When the last import run finished',
+           [('', {}, int(datetime.fromisoformat(report['finished_at']).timestamp()))])
+    metric('duration_seconds', 'gauge', 'Wall time of the last import run',
+           [('', {}, report['duration_seconds'])])
+    metric('rows', 'gauge', 'Rows handled by the last import run, by outcome',
+           [('', {'outcome': outcome}, value) for outcome, value in report['rows'].items()])
+    metric('rows_per_second', 'gauge', 'Rows written per second of wall time',
+           [('', {}, report['rows_per_sec'])])
+    metric('stage_seconds', 'gauge', 'Time spent per import stage',
+           [('', {'stage': name}, stage['seconds']) for name, stage in report['stages'].items()])
+    metric('stage_rows', 'gauge', 'Rows handled per import stage',
+           [('', {'stage': name}, stage['rows']) for name, stage in report['stages'].items()])
+
+    samples = []
+    for operation, histogram in report['batches'].items():
+        for bound, count in histogram['buckets'].items():
+            samples.append(('_bucket', {'operation': operation, 'le': bound}, count))
+        samples.append(('_sum', {'operation': operation}, histogram['sum_seconds']))
+        samples.append(('_count', {'operation': operation}, histogram['count']))
+    metric('batch_duration_seconds', 'histogram', 'Latency of write batches', samples)
+
+    metric('bytes_sent', 'gauge', 'Uncompressed BSON payload sent by the last import run',
+           [('', {}, report['bytes_sent'])])
+    metric('retries', 'gauge', 'Write retries in the last import run', [('', {}, report['retries'])])
+    metric('peak_rss_bytes', 'gauge', 'Peak resident memory of the last import run',
+           [('', {}, report['peak_rss_bytes'])])
+    return '\n'.join(lines) + '\n'
+
+
+def write_prometheus(report, path):
+    write_atomic(path, prometheus_text(report))
+
+
+def print_report(report):
+    rate = f"{report['rows_per_sec']:,.0f} rows/s" if report['rows_per_sec'] else "n/a"
+    written = report['rows']['inserted'] + report['rows']['updated']
+    print(f"\n📈 Import metrics: {written:,} rows written in {report['duration_seconds']:.1f}s ({rate})")
+    for name, stage in report['stages'].items():
+        stage_rate = f", {stage['rows_per_sec']:,.0f} rows/s" if stage['rows_per_sec'] else ""
+        print(f"  • {name}: {stage['seconds']:.2f}s{stage_rate}")
+    for operation, histogram in report['batches'].items():
+        print(f"  ⏱️ {operation} batches: {histogram['count']:,}, p50 ≤ {histogram['p50_seconds']:.3f}s, "
+              f"p95 ≤ {histogram['p95_seconds']:.3f}s, max {histogram['max_seconds']:.3f}s")
+    if report['retries']:
+        print(f"  🔁 Retries: {report['retries']:,}")
+    if report['bytes_sent']:
+        print(f"  📤 Bytes sent: {report['bytes_sent'] / 1024 ** 2:,.1f} MB")
+    if report['peak_rss_bytes']:
+        print(f"  🧠 Peak RSS: {report['peak_rss_bytes'] / 1024 ** 2:,.0f} MB")
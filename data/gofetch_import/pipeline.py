@@ -0,0 +1,211 @@
+"""
+Pipelined import: parse, prepare, encode and write run concurrently on asyncio.
+
+    parse ──▶ [frames] ──▶ prepare ──▶ [prepared] ──▶ encode ──▶ [batches] ──▶ writer × in_flight
+
+Every arrow is a bounded asyncio.Queue, so a fast stage waits for a slow one instead
+of buffering the file in memory. Parsing, preparing and encoding are CPU-bound pandas/BSON
+work and run on worker threads (asyncio.to_thread); the event loop only awaits the
+writes, of which up to `in_flight` are outstanding on the AsyncMongoClient at once.
+The encode stage builds plain dict documents column by column; the driver still
+encodes them to BSON when they are sent. With --raw-bson, inserted documents are
+pre-encoded to RawBSONDocument there instead, so the event loop doesn't have to encode
+them. Upserts always ship ReplaceOne/UpdateOne operations built from dicts.
+
+With the stages overlapped, an import takes about as long as its slowest stage (usually
+parsing or the network) rather than the sum of all of them.
+
+Usage:
+    python -m gofetch_import load --pipeline --chunk-size 50000 --in-flight 8
+"""
+
+import asyncio
+import time
+
+from pymongo import ReplaceOne, UpdateOne
+from pymongo.errors import BulkWriteError
+
+from .client import get_async_client
+from .importer import DUPLICATE_KEY_ERROR, SOURCE_DTYPES
+from .manifest import batch_id
+from .sources import read_csv
+
+# Marks the end of a queue's input
+DONE = object()
+
+
+class ImportPipeline:
+    """Run one CSV through the parse → prepare → encode → write pipeline of an importer"""
+
+    def __init__(self, importer, chunk_size=50000, batch_size=1000, in_flight=4, queue_depth=2,
+                 update_existing=False, upsert_mode="replace"):
+        self.importer = importer
+        self.metrics = importer.metrics
+        self.chunk_size = chunk_size
+        self.batch_size = batch_size
+        self.in_flight = in_flight
+        self.queue_depth = queue_depth
+        self.update_existing = update_existing
+        self.upsert_mode = upsert_mode
+        self.totals = {'rows': 0, 'batches': 0, 'inserted': 0, 'updated': 0}
+
+    async def parse(self, csv_file_path, frames):
+        """Read raw chunks (or already prepared chunks from the pre-parsed cache)"""
+        cache = self.importer.prepared_cache(csv_file_path)
+        if cache is not None and cache.exists():
+            print(f"⚡ Streaming prepared data from cache {cache.path}...")
+            chunks, prepared = cache.iter_chunks(self.chunk_size), True
+        else:
+            chunks, prepared = read_csv(csv_file_path, chunksize=self.chunk_size, dtype=SOURCE_DTYPES), False
+
+        stage = 'cache_load' if prepared else 'parse'
+        while True:
+            with self.metrics.stage(stage) as timing:
+                chunk = await asyncio.to_thread(next, chunks, None)
+                timing['rows'] = len(chunk) if chunk is not None else 0
+            if chunk is None:
+                break
+            await frames.put((chunk, prepared))
+        await frames.put(DONE)
+
+    def prepare_chunk(self, chunk, prepared):
+        importer = self.importer
+        chunk = importer.add_run_fields(chunk) if prepared else importer.prepare_frame(chunk)
+        importer.write_snapshot(chunk)
+        return importer.optimize_memory(chunk)
+
+    async def prepare(self, frames, prepared_frames):
+        while (item := await frames.get()) is not DONE:
+            await prepared_frames.put(await asyncio.to_thread(self.prepare_chunk, *item))
+        await prepared_frames.put(DONE)
+
+    def encode_batch(self, part):
+        """Documents for one batch (RawBSON for inserts with --raw-bson) plus the bulk operations for upserts"""
+        documents = self.importer.to_documents(part, self.update_existing)
+        if not self.update_existing:
+            return documents, None
+        operation = ReplaceOne if self.upsert_mode == "replace" else UpdateOne
+        update = (lambda record: record) if self.upsert_mode == "replace" else (lambda record: {'$set': record})
+        return documents, [operation({'Unique ID': record.get('Unique ID')}, update(record), upsert=True)
+                           for record in documents]
+
+    async def encode(self, prepared_frames, batches):
+        checkpoint = self.importer.checkpoint
+        while (frame := await prepared_frames.get()) is not DONE:
+            self.totals['rows'] += len(frame)
+            self.importer.progress(f"  🧩 Chunk of {len(frame):,} rows prepared")
+            # Held by the encoder until every batch is queued, then by each batch until written
+            chunk = {'frame': frame, 'pending': 1}
+            for start in range(0, len(frame), self.batch_size):
+                part = frame.iloc[start:start + self.batch_size]
+                batch_key = batch_id(part['Unique ID'].to_numpy())
+                if checkpoint is not None and checkpoint.is_committed(batch_key):
+                    self.importer.progress(f"  ⏭️ Batch {batch_key} committed by an earlier run, skipping")
+                    continue
+                documents, operations = await asyncio.to_thread(self.encode_batch, part)
+                chunk['pending'] += 1
+                await batches.put((batch_key, documents, operations, chunk))
+            await self.release(chunk)
+        for _ in range(self.in_flight):
+            await batches.put(DONE)
+
+    async def release(self, chunk):
+        """Drop one hold on a chunk; once all its batches are written, fold it into latest_by_place
+
+        Like the synchronous paths, which fold a frame in after insert_records, so the collection
+        never points at readings a failed or cancelled run did not write.
+        """
+        chunk['pending'] -= 1
+        if chunk['pending'] == 0:
+            await asyncio.to_thread(self.importer.update_latest_by_place, chunk.pop('frame'))
+
+    async def write(self, collection, batches):
+        while (item := await batches.get()) is not DONE:
+            batch_key, documents, operations, chunk = item
+            started = time.perf_counter()
+            if operations is None:
+                inserted, updated = await self.insert(collection, documents), 0
+            else:
+                inserted, updated = await self.upsert(collection, documents, operations)
+            seconds = time.perf_counter() - started
+
+            self.totals['batches'] += 1
+            self.totals['inserted'] += inserted
+            self.totals['updated'] += updated
+            self.metrics.count('rows_inserted', inserted)
+            self.metrics.count('rows_updated', updated)
+            self.metrics.observe_batch('upsert' if self.update_existing else 'insert', seconds, len(documents),
+                                       self.importer.payload_bytes(documents))
+            if self.importer.checkpoint is not None:
+                # The manifest lives behind the synchronous client; keep it off the event loop
+                await asyncio.to_thread(self.importer.checkpoint.commit, batch_key, len(documents))
+            self.importer.progress(f"  📦 Batch {batch_key} written ({len(documents)} records)")
+            await self.release(chunk)
+
+    async def insert(self, collection, documents, retry=True):
+        """insert_many with the same duplicate/retry/dead-letter rules as the synchronous importer"""
+        try:
+            result = await collection.insert_many(documents, ordered=False)
+            return len(result.inserted_ids)
+        except BulkWriteError as bwe:
+            details = bwe.details
+            inserted = details.get('nInserted', 0)
+            write_errors = details.get('writeErrors', [])
+            failed = [err for err in write_errors if err.get('code') != DUPLICATE_KEY_ERROR]
+            with self.importer.stats_lock:
+                self.importer.duplicates_skipped += len(write_errors) - len(failed)
+            if failed and retry:
+                # Only the failed documents go back to the server
+                self.metrics.count('retries')
+                return inserted + await self.insert(collection, [documents[err['index']] for err in failed],
+                                                    retry=False)
+            self.importer.dead_letter([(documents[err['index']], err) for err in failed])
+            return inserted
+        except Exception as e:
+            if not retry:
+                print(f"  ❌ Batch retry failed: {e}")
+                self.importer.dead_letter([(document, {'errmsg': str(e)}) for document in documents])
+                return 0
+            # Documents that did land come back as duplicate keys on the retry (same _id)
+            print(f"  ⚠️ Batch insert error: {e}; retrying batch once")
+            self.metrics.count('retries')
+            return await self.insert(collection, documents, retry=False)
+
+    async def upsert(self, collection, documents, operations):
+        try:
+            result = await collection.bulk_write(operations, ordered=False)
+            return result.upserted_count, result.modified_count
+        except BulkWriteError as bwe:
+            details = bwe.details
+            write_errors = details.get('writeErrors', [])
+            print(f"  ⚠️ Bulk upsert error: {len(write_errors)} failed operations")
+            self.importer.dead_letter([(documents[err['index']], err) for err in write_errors])
+            return details.get('nUpserted', 0), details.get('nModified', 0)
+
+    async def run(self, csv_file_path):
+        """Run every stage until the file is written; the first failing stage cancels the rest"""
+        client = get_async_client(self.importer.get_connection_uri(),
+                                  maxPoolSize=max(self.in_flight, self.importer.max_pool_size))
+        collection = client[self.importer.get_database_name()][self.importer.collection_name]
+
+        frames = asyncio.Queue(maxsize=self.queue_depth)
+        prepared_frames = asyncio.Queue(maxsize=self.queue_depth)
+        batches = asyncio.Queue(maxsize=self.in_flight * 2)
+        tasks = [
+            asyncio.create_task(self.parse(csv_file_path, frames), name="parse"),
+            asyncio.create_task(self.prepare(frames, prepared_frames), name="prepare"),
+            asyncio.create_task(self.encode(prepared_frames, batches), name="encode")
+        ] + [
+            asyncio.create_task(self.write(collection, batches), name=f"writer-{n}")
+            for n in range(self.in_flight)
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        finally:
+            await client.close()
+        return self.totals
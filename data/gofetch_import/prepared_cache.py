@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Pre-Parsed Data Cache for GoFetch Imports
+================================================================
+
+load_and_prepare_data() re-parses the CSV on every run: text to columns,
+pd.to_datetime on Start_Date, four pd.to_numeric passes and the year/month/day_of_year
+derivations. The prepared frame is stored once in a binary columnar form next to the
+CSV, keyed by the file's SHA-256, and later runs memory-map it instead:
+
+    .gofetch_cache/
+        Air_Quality_20250613-<sha256[:16]>/
+            meta.json        column names and order, dtypes, categories, row counts
+            000.values.npy   numeric and datetime columns as-is
+            002.codes.npy    text columns as category codes (-1 = missing)
+            ...
+
+Text columns repeat a handful of values, so they are stored dictionary-encoded: an
+int32 code per row plus the distinct strings in meta.json. import_timestamp is
+per run and is not cached.
+
+A cache entry is only used for the exact file contents (and PREPARE_VERSION) it was
+built from; older entries for the same file name are removed when a new one is written.
+
+Usage:
+    python -m gofetch_import load                 # cache on by default
+    python -m gofetch_import load --no-cache
+    python -m gofetch_import load --cache-dir /tmp/gofetch-cache
+"""
+
+import json
+import os
+import re
+import shutil
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+CACHE_DIR_NAME = '.gofetch_cache'
+META_FILE = 'meta.json'
+ENTRY_PATTERN = re.compile(r'.+-[0-9a-f]{16}')
+
+# Bump when prepare_frame changes what it produces, so stale caches are not reused
+PREPARE_VERSION = 3
+
+# Added per run by prepare_frame, never cached
+RUN_COLUMNS = ['import_timestamp']
+
+
+def default_cache_dir(csv_file_path):
+    return os.path.join(os.path.dirname(os.path.abspath(csv_file_path)), CACHE_DIR_NAME)
+
+
+def is_text_column(series):
+    return not pd.api.types.is_datetime64_any_dtype(series.dtype) and (
+        series.dtype == object or pd.api.types.is_string_dtype(series.dtype)
+    )
+
+
+class PreparedCache:
+    """Prepared frames of one source file, stored as .npy columns under its SHA-256"""
+
+    def __init__(self, csv_file_path, sha256, cache_dir=None):
+        self.cache_dir = cache_dir or default_cache_dir(csv_file_path)
+        self.prefix = os.path.splitext(os.path.basename(csv_file_path))[0]
+        self.sha256 = sha256
+        self.path = os.path.join(self.cache_dir, f"{self.prefix}-{sha256[:16]}")
+
+    def _column_file(self, index, suffix):
+        # Numbered files: column names may contain characters a file system won't accept
+        return os.path.join(self.path, f"{index:03d}.{suffix}.npy")
+
+    def read_meta(self):
+        """The entry's metadata, or None when there is no usable entry"""
+        try:
+            with open(os.path.join(self.path, META_FILE), encoding='utf-8') as f:
+                meta = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        if meta.get('sha256') != self.sha256 or meta.get('version') != PREPARE_VERSION:
+            return None
+        return meta
+
+    def exists(self):
+        return self.read_meta() is not None
+
+    def write(self, df, rejected=0):
+        """Store a prepared frame; written to a temporary directory and renamed into place
+
+        `rejected` records how many source rows failed validation and are not in the frame.
+        """
+        tmp_path = f"{self.path}.tmp-{os.getpid()}"
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        os.makedirs(tmp_path)
+        final_path, self.path = self.path, tmp_path
+
+        try:
+            columns = []
+            for index, name in enumerate(col for col in df.columns if col not in RUN_COLUMNS):
+                series = df[name]
+                column = {'name': name, 'dtype': str(series.dtype)}
+                if is_text_column(series):
+                    codes, categories = pd.factorize(series, use_na_sentinel=True)
+                    categories = list(categories)
+                    if not all(isinstance(value, str) for value in categories):
+                        raise ValueError(f"column {name!r} mixes text with other types")
+                    np.save(self._column_file(index, 'codes'), codes.astype(np.int32))
+                    column.update(encoding='categorical', categories=categories)
+                else:
+                    np.save(self._column_file(index, 'values'), series.to_numpy())
+                    column['encoding'] = 'values'
+                columns.append(column)
+
+            meta = {
+                'sha256': self.sha256,
+                'version': PREPARE_VERSION,
+                'rows': len(df),
+                'rejected': rejected,
+                'columns': columns,
+                'created_at': datetime.now().isoformat()
+            }
+            with open(os.path.join(tmp_path, META_FILE), 'w', encoding='utf-8') as f:
+                json.dump(meta, f)
+        except Exception:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            raise
+        finally:
+            self.path = final_path
+
+        # Only one entry per file name: the previous version of the file is no longer needed
+        for entry in os.listdir(self.cache_dir):
+            if ENTRY_PATTERN.fullmatch(entry) and entry.rsplit('-', 1)[0] == self.prefix:
+                shutil.rmtree(os.path.join(self.cache_dir, entry), ignore_errors=True)
+        os.replace(tmp_path, self.path)
+        return meta
+
+    def _column_arrays(self, meta):
+        """Memory-mapped column arrays; nothing is read from disk until it is sliced"""
+        arrays = []
+        for index, column in enumerate(meta['columns']):
+            suffix = 'codes' if column['encoding'] == 'categorical' else 'values'
+            arrays.append(np.load(self._column_file(index, suffix), mmap_mode='r', allow_pickle=False))
+        return arrays
+
+    @staticmethod
+    def _frame(meta, arrays, start, stop):
+        data = {}
+        for column, array in zip(meta['columns'], arrays):
+            if column['encoding'] == 'categorical':
+                codes = np.asarray(array[start:stop])
+                values = np.asarray(column['categories'] + [None], dtype=object)[codes]
+                data[column['name']] = pd.Series(values, dtype=column['dtype'])
+            else:
+                data[column['name']] = pd.Series(np.asarray(array[start:stop]), dtype=column['dtype'])
+        return pd.DataFrame(data)
+
+    def load(self):
+        """The whole prepared frame (without the per-run columns), or None"""
+        meta = self.read_meta()
+        if meta is None:
+            return None
+        return self._frame(meta, self._column_arrays(meta), 0, meta['rows'])
+
+    def iter_chunks(self, chunk_size):
+        """Prepared frames of chunk_size rows, sliced from the memory-mapped columns"""
+        meta = self.read_meta()
+        if meta is None:
+            return
+        arrays = self._column_arrays(meta)
+        for start in range(0, meta['rows'], chunk_size):
+            yield self._frame(meta, arrays, start, min(start + chunk_size, meta['rows']))
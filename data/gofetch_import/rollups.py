@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+Materialized Rollup Collections for GoFetch Dashboards
+================================================================
+
+Builds small pre-aggregated collections from the raw air quality collection so the
+dashboard endpoints (getMonthlyTrends, getStatistics, getGeoData, getTimeSeriesData)
+can read precomputed documents instead of running $group over every row.
+
+Rollups are keyed by series — Indicator ID × (Geo Type Name, Geo Join ID) — and
+period. Each document stores sum/count/min/max (plus avg), so coarser answers such as
+"all places, per month" are a cheap re-aggregation of the rollup (sum of sums / sum of
+counts).
+
+Collections:
+    air_quality_rollup_monthly   series × year × month
+    air_quality_rollup_seasonal  series × season (Winter/Summer/Annual/Multi-year) × year
+    air_quality_rollup_yearly    series × year
+    latest_by_place              latest reading per place and per place × indicator
+                                 (also maintained row by row during import)
+
+Incremental refresh: pass the affected series and only their groups are recomputed.
+
+Usage:
+    python -m gofetch_import.rollups  # full rebuild
+"""
+
+import sys
+from datetime import datetime
+
+from pymongo import UpdateOne
+
+from .client import close_client, database_name, get_client
+
+ROLLUP_COLLECTIONS = {
+    'monthly': 'air_quality_rollup_monthly',
+    'seasonal': 'air_quality_rollup_seasonal',
+    'yearly': 'air_quality_rollup_yearly'
+}
+
+LATEST_COLLECTION = 'latest_by_place'
+
+# latest_by_place field -> raw collection field (names match what getGeoData returns)
+LATEST_FIELDS = {
+    'Geo Place Name': 'Geo Place Name',
+    'Latest Data Value': 'Data Value',
+    'Latest Date': 'Start_Date',
+    'Measure': 'Measure',
+    'Measure Info': 'Measure Info',
+    'Name': 'Name',
+    'Indicator ID': 'Indicator ID',
+    'Geo Type Name': 'Geo Type Name',
+    'Geo Join ID': 'Geo Join ID'
+}
+
+# A series is one indicator at one place; Geo Join IDs are only unique within a Geo Type
+SERIES_KEY = {
+    'indicator_id': '$Indicator ID',
+    'geo_type': '$Geo Type Name',
+    'geo_join_id': '$Geo Join ID'
+}
+
+# Match at most this many series per pipeline when refreshing incrementally
+SERIES_PER_PIPELINE = 500
+
+
+def season_expression():
+    """Aggregation expression mapping 'Time Period' to a season label"""
+    return {
+        '$switch': {
+            'branches': [
+                {'case': {'$regexMatch': {'input': '$Time Period', 'regex': '^Winter'}}, 'then': 'Winter'},
+                {'case': {'$regexMatch': {'input': '$Time Period', 'regex': '^Summer'}}, 'then': 'Summer'},
+                {'case': {'$regexMatch': {'input': '$Time Period', 'regex': r'^\d{4}-\d{4}$'}},
+                 'then': 'Multi-year'}
+            ],
+            # "Annual Average 2017" and plain "2017"
+            'default': 'Annual'
+        }
+    }
+
+
+def period_keys(period):
+    """Group-key fields added to the series key for each rollup granularity"""
+    year = {'$year': '$Start_Date'}
+    if period == 'monthly':
+        return {'year': year, 'month': {'$month': '$Start_Date'}}
+    if period == 'seasonal':
+        return {'season': season_expression(), 'year': year}
+    if period == 'yearly':
+        return {'year': year}
+    raise ValueError(f"Unknown rollup period: {period}")
+
+
+def series_filter(series_list, prefix=''):
+    """$or filter selecting the given (indicator_id, geo_type, geo_join_id) series"""
+    if prefix:
+        fields = (f'{prefix}indicator_id', f'{prefix}geo_type', f'{prefix}geo_join_id')
+    else:
+        fields = ('Indicator ID', 'Geo Type Name', 'Geo Join ID')
+    return {'$or': [dict(zip(fields, series)) for series in series_list]}
+
+
+def rollup_pipeline(period, target, match=None):
+    """Aggregation that groups raw rows into `target` for one granularity"""
+    pipeline = []
+    if match:
+        pipeline.append({'$match': match})
+
+    group_id = {**SERIES_KEY, **period_keys(period)}
+    pipeline += [
+        {'$match': {'Data Value': {'$type': 'number'}}},
+        {'$group': {
+            '_id': group_id,
+            'name': {'$first': '$Name'},
+            'measure': {'$first': '$Measure'},
+            'measure_info': {'$first': '$Measure Info'},
+            'geo_place_name': {'$first': '$Geo Place Name'},
+            'period_start': {'$min': '$Start_Date'},
+            'sum': {'$sum': '$Data Value'},
+            'count': {'$sum': 1},
+            'min': {'$min': '$Data Value'},
+            'max': {'$max': '$Data Value'}
+        }},
+        {'$set': {
+            **{field: f'$_id.{field}' for field in group_id},
+            'avg': {'$divide': ['$sum', '$count']},
+            'updated_at': '$$NOW'
+        }},
+        {'$merge': {'into': target, 'on': '_id', 'whenMatched': 'replace', 'whenNotMatched': 'insert'}}
+    ]
+    return pipeline
+
+
+def latest_pipelines(target, match=None):
+    """Aggregations writing the most recent reading per place and per place × indicator
+
+    Produces the same documents as latest_operations(), for full rebuilds.
+    """
+    grains = [
+        ('place', {'place': '$Geo Place Name'}),
+        ('place_indicator', {'place': '$Geo Place Name', 'indicator_id': '$Indicator ID'})
+    ]
+    pipelines = []
+    for kind, group_id in grains:
+        pipeline = [{'$match': match}] if match else []
+        pipeline += [
+            {'$sort': {'Start_Date': -1}},
+            {'$group': {
+                '_id': group_id,
+                **{field: {'$first': f'${source}'} for field, source in LATEST_FIELDS.items()}
+            }},
+            {'$set': {'kind': kind, 'updated_at': '$$NOW'}},
+            {'$merge': {'into': target, 'on': '_id', 'whenMatched': 'replace', 'whenNotMatched': 'insert'}}
+        ]
+        pipelines.append(pipeline)
+    return pipelines
+
+
+def latest_operations(df):
+    """Conditional upserts keeping the newest reading per place and per place × indicator
+
+    Computed from a prepared frame during import, so latest_by_place stays current
+    without a scan. A stored document is only replaced by a reading at least as new.
+    """
+    ordered = df.dropna(subset=['Geo Place Name', 'Start_Date']).sort_values('Start_Date', kind='stable')
+    now = datetime.now()
+    operations = []
+
+    grains = [
+        ('place', ['Geo Place Name']),
+        ('place_indicator', ['Geo Place Name', 'Indicator ID'])
+    ]
+    for kind, keys in grains:
+        latest = ordered.drop_duplicates(subset=keys, keep='last')
+        columns = {field: latest[source].astype(object).where(latest[source].notna(), None).tolist()
+                   for field, source in LATEST_FIELDS.items()}
+        columns['Latest Date'] = [timestamp.to_pydatetime() for timestamp in columns['Latest Date']]
+        for i in range(len(latest)):
+            document = {field: values[i] for field, values in columns.items()}
+            key = {'place': document['Geo Place Name']}
+            if kind == 'place_indicator':
+                key['indicator_id'] = document['Indicator ID']
+            new_document = {'_id': key, **document, 'kind': kind, 'updated_at': now}
+            operations.append(UpdateOne(
+                {'_id': key},
+                [{'$replaceWith': {'$cond': [
+                    {'$gte': [document['Latest Date'], {'$ifNull': ['$Latest Date', datetime.min]}]},
+                    {'$literal': new_document},
+                    '$$ROOT'
+                ]}}],
+                upsert=True
+            ))
+    return operations
+
+
+def update_latest(collection, df):
+    """Fold a prepared frame into latest_by_place with one unordered bulk_write"""
+    operations = latest_operations(df)
+    if not operations:
+        return 0
+    result = collection.database[LATEST_COLLECTION].bulk_write(operations, ordered=False)
+    return result.upserted_count + result.modified_count
+
+
+def ensure_rollup_indexes(db):
+    """Indexes for the read patterns of the dashboard endpoints"""
+    for period, name in ROLLUP_COLLECTIONS.items():
+        rollup = db[name]
+        rollup.create_index([('indicator_id', 1), ('year', 1)])
+        rollup.create_index([('geo_type', 1), ('geo_join_id', 1), ('indicator_id', 1)])
+    # getGeoData reads every place document in one query
+    db[LATEST_COLLECTION].create_index([('kind', 1), ('Latest Data Value', -1)])
+
+
+def build_rollups(collection, affected_series=None, affected_places=None):
+    """Rebuild every rollup, or only the groups of `affected_series` when given
+
+    `affected_series` is an iterable of (Indicator ID, Geo Type Name, Geo Join ID).
+    `affected_places` adds Geo Place Names whose latest_by_place documents must be rebuilt
+    even though no row of theirs is left (their rows were deleted before this call).
+    Returns {collection name: document count}.
+    """
+    db = collection.database
+    started = datetime.now()
+
+    if affected_series is None:
+        batches = [None]
+        for name in list(ROLLUP_COLLECTIONS.values()) + [LATEST_COLLECTION]:
+            db[name].delete_many({})
+    else:
+        affected_series = sorted(set(affected_series))
+        if not affected_series:
+            return {}
+        batches = [affected_series[i:i + SERIES_PER_PIPELINE]
+                   for i in range(0, len(affected_series), SERIES_PER_PIPELINE)]
+
+    for batch in batches:
+        match = series_filter(batch) if batch else None
+        for period, name in ROLLUP_COLLECTIONS.items():
+            if batch:
+                # Groups that no longer have rows must disappear, so clear before merging
+                db[name].delete_many(series_filter(batch, prefix='_id.'))
+            collection.aggregate(rollup_pipeline(period, name, match))
+
+    if affected_series is None:
+        for pipeline in latest_pipelines(LATEST_COLLECTION):
+            collection.aggregate(pipeline)
+    else:
+        places = set(collection.distinct('Geo Place Name', series_filter(affected_series)))
+        places = sorted(places.union(affected_places or ()))
+        if places:
+            # Rebuilt from scratch so readings that were deleted cannot linger
+            db[LATEST_COLLECTION].delete_many({'_id.place': {'$in': places}})
+            for pipeline in latest_pipelines(LATEST_COLLECTION, {'Geo Place Name': {'$in': places}}):
+                collection.aggregate(pipeline)
+
+    ensure_rollup_indexes(db)
+
+    counts = {name: db[name].estimated_document_count()
+              for name in list(ROLLUP_COLLECTIONS.values()) + [LATEST_COLLECTION]}
+    elapsed = (datetime.now() - started).total_seconds()
+    scope = "all series" if affected_series is None else f"{len(affected_series):,} series"
+    print(f"  📊 Rollups refreshed for {scope} in {elapsed:.2f}s")
+    for name, count in counts.items():
+        print(f"    • {name}: {count:,} documents")
+    return counts
+
+
+def main():
+    """Rebuild all rollups from the configured collection"""
+    client = get_client()
+    collection = client[database_name()]['air_quality_data']
+
+    try:
+        print("📊 Building rollup collections...")
+        build_rollups(collection)
+        print("✅ Rollups complete!")
+        return 0
+    except Exception as e:
+        print(f"❌ Error building rollups: {e}")
+        return 1
+    finally:
+        close_client(client)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
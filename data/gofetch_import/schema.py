@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Schema Validation and Type Coercion for the NYC Air Quality Dataset
+================================================================
+
+Declares what a valid row of the NYC Open Data air quality export looks like and checks
+a raw CSV frame against it before anything is sent to MongoDB. Every rule is a
+vectorized column check, so a chunk of 50,000 rows costs a handful of array operations
+rather than a Python loop.
+
+Rules per column (AIR_QUALITY_SCHEMA):
+    type       int, float, str or date (dates parsed with an explicit format)
+    required   missing or unparseable values reject the row
+    min / max  inclusive bounds
+    allowed    closed set of values
+    unique     duplicates within the frame reject every occurrence after the first
+
+plus plausible Data Value ranges per pollutant indicator (INDICATOR_RANGES).
+
+validate_frame() returns the coerced valid rows and the rejected rows (with their raw
+values and a 'reject_reasons' column); write_quarantine() appends the rejects to a CSV.
+
+Usage:
+    python -m gofetch_import load --quarantine rejected_rows.csv
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+DATE_FORMAT = '%m/%d/%Y'
+
+AIR_QUALITY_SCHEMA = {
+    'Unique ID': {'type': 'int', 'required': True, 'min': 1, 'unique': True},
+    'Indicator ID': {'type': 'int', 'required': True, 'min': 1},
+    'Name': {'type': 'str', 'required': True},
+    'Measure': {'type': 'str', 'required': True},
+    'Measure Info': {'type': 'str', 'required': True},
+    'Geo Type Name': {'type': 'str', 'required': True,
+                      'allowed': ['Borough', 'CD', 'Citywide', 'UHF34', 'UHF42']},
+    'Geo Join ID': {'type': 'int', 'required': True, 'min': 1},
+    'Geo Place Name': {'type': 'str', 'required': True},
+    'Time Period': {'type': 'str', 'required': True},
+    'Start_Date': {'type': 'date', 'required': True, 'format': DATE_FORMAT, 'min': '1990-01-01'},
+    'Data Value': {'type': 'float', 'required': True, 'min': 0},
+    'Message': {'type': 'str', 'required': False}
+}
+
+# Physically plausible concentrations; anything outside is a unit or entry error
+INDICATOR_RANGES = {
+    365: (0, 500),   # Fine particles (PM 2.5), mcg/m3
+    375: (0, 200),   # Nitrogen dioxide (NO2), ppb
+    386: (0, 200)    # Ozone (O3), ppb
+}
+
+REASONS_COLUMN = 'reject_reasons'
+
+
+def coerce_column(series, rule):
+    """Convert one raw column to its declared type; unparseable values become missing"""
+    kind = rule['type']
+    if kind in ('int', 'float'):
+        return pd.to_numeric(series, errors='coerce')
+    if kind == 'date':
+        if pd.api.types.is_datetime64_any_dtype(series.dtype):
+            return series
+        return pd.to_datetime(series, format=rule.get('format', DATE_FORMAT), errors='coerce')
+    return series
+
+
+def validate_frame(df, schema=None, indicator_ranges=None):
+    """Coerce and check a raw frame, returning (valid rows, rejected rows)
+
+    Valid rows carry the coerced values (required integer columns as int64); rejected
+    rows keep the values as read plus a '; '-separated reject_reasons column.
+    """
+    schema = AIR_QUALITY_SCHEMA if schema is None else schema
+    indicator_ranges = INDICATOR_RANGES if indicator_ranges is None else indicator_ranges
+
+    reasons = pd.Series('', index=df.index, dtype=object)
+    coerced = {}
+
+    def reject(mask, reason):
+        mask = np.asarray(mask, dtype=bool)
+        if mask.any():
+            reasons[mask] = reasons[mask] + reason + '; '
+
+    for column, rule in schema.items():
+        if column not in df.columns:
+            if rule.get('required'):
+                reject(np.ones(len(df), dtype=bool), f"{column}: column missing")
+            continue
+
+        raw = df[column]
+        values = coerce_column(raw, rule)
+        coerced[column] = values
+        missing = raw.isna().to_numpy()
+
+        unparseable = values.isna().to_numpy() & ~missing
+        reject(unparseable, f"{column}: not a valid {rule['type']}")
+        if rule.get('required'):
+            reject(missing, f"{column}: required")
+
+        if rule['type'] == 'int':
+            reject(values.notna() & (values != values.round()), f"{column}: not a whole number")
+        if 'min' in rule:
+            bound = pd.Timestamp(rule['min']) if rule['type'] == 'date' else rule['min']
+            reject(values < bound, f"{column}: below {rule['min']}")
+        if 'max' in rule:
+            bound = pd.Timestamp(rule['max']) if rule['type'] == 'date' else rule['max']
+            reject(values > bound, f"{column}: above {rule['max']}")
+        if 'allowed' in rule:
+            reject(values.notna() & ~values.isin(rule['allowed']), f"{column}: not one of {rule['allowed']}")
+        if rule.get('unique'):
+            reject(values.notna() & values.duplicated(keep='first'), f"{column}: duplicate")
+
+    if indicator_ranges and 'Indicator ID' in coerced and 'Data Value' in coerced:
+        indicator = coerced['Indicator ID']
+        low = indicator.map({key: bounds[0] for key, bounds in indicator_ranges.items()})
+        high = indicator.map({key: bounds[1] for key, bounds in indicator_ranges.items()})
+        value = coerced['Data Value']
+        reject((value < low) | (value > high), "Data Value: outside the plausible range for its indicator")
+
+    rejected = (reasons != '').to_numpy()
+
+    valid = df.loc[~rejected].copy()
+    for column, values in coerced.items():
+        values = values[~rejected]
+        rule = schema[column]
+        if rule['type'] == 'int' and rule.get('required'):
+            values = values.astype('int64')
+        valid[column] = values
+
+    rejects = df.loc[rejected].copy()
+    rejects[REASONS_COLUMN] = reasons[rejected].str.rstrip('; ')
+    return valid, rejects
+
+
+def summarize_reasons(rejects):
+    """Count of rejected rows per individual reason"""
+    if rejects.empty:
+        return {}
+    return rejects[REASONS_COLUMN].str.split('; ').explode().value_counts().to_dict()
+
+
+def write_quarantine(rejects, path):
+    """Append rejected rows (raw values plus reasons) to a CSV, writing the header once"""
+    if rejects.empty:
+        return 0
+    write_header = not os.path.exists(path) or os.path.getsize(path) == 0
+    rejects.to_csv(path, mode='a', header=write_header, index=False)
+    return len(rejects)
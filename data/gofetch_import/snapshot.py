@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Columnar Snapshot Export and Query API for GoFetch Air Quality Data
+================================================================
+
+Writes the prepared DataFrame produced by the importer to a partitioned columnar
+dataset (Parquet or Arrow IPC), partitioned by indicator and year:
+
+    snapshot/
+        Indicator ID=375/year=2014/part-0-0.parquet
+        ...
+        _gofetch_snapshot.json
+
+and reads it back through a small query API, so historical analyses and notebooks
+don't need to touch the production MongoDB cluster. Arrow IPC files are memory-mapped
+without decoding; Parquet files are smaller on disk.
+
+Usage:
+    python -m gofetch_import.snapshot snapshot/ --indicator 375 --year 2015 --year 2016
+
+    from gofetch_import.snapshot import SnapshotReader
+    df = SnapshotReader("snapshot/").query(indicator_ids=[375], years=range(2015, 2020))
+
+Requirements:
+    - pyarrow
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+from datetime import datetime
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.fs as pafs
+except ImportError:  # optional dependency, only needed for snapshots
+    pa = None
+    ds = None
+    pafs = None
+
+PARTITION_COLUMNS = ['Indicator ID', 'year']
+
+# Marker written into every snapshot directory; a directory is only replaced if it has one
+MANIFEST_FILE = '_gofetch_snapshot.json'
+
+FORMATS = {'parquet': 'parquet', 'arrow': 'ipc'}
+
+
+def require_pyarrow():
+    if pa is None:
+        raise ImportError("pyarrow is required for columnar snapshots: pip install pyarrow")
+
+
+class SnapshotWriter:
+    """Write prepared DataFrames (whole or chunk by chunk) to a partitioned dataset"""
+
+    def __init__(self, output_dir, file_format='parquet'):
+        require_pyarrow()
+        if file_format not in FORMATS:
+            raise ValueError(f"Unknown snapshot format: {file_format}")
+
+        self.output_dir = output_dir
+        self.file_format = file_format
+        self.rows_written = 0
+        self.parts_written = 0
+        self.schema = None
+
+        if os.path.exists(output_dir) and os.listdir(output_dir):
+            if not os.path.exists(os.path.join(output_dir, MANIFEST_FILE)):
+                raise FileExistsError(f"{output_dir} exists and is not a GoFetch snapshot; refusing to overwrite")
+            shutil.rmtree(output_dir)
+        os.makedirs(output_dir, exist_ok=True)
+
+    def write(self, df):
+        """Append one prepared frame to the snapshot"""
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        if self.schema is None:
+            self.schema = table.schema
+        else:
+            # Chunks may infer different types (e.g. an all-null column); align with the first
+            table = table.cast(self.schema, safe=False)
+
+        ds.write_dataset(
+            table,
+            self.output_dir,
+            format=FORMATS[self.file_format],
+            partitioning=PARTITION_COLUMNS,
+            partitioning_flavor='hive',
+            basename_template=f"part-{self.parts_written}-{{i}}.{self.file_format}",
+            existing_data_behavior='overwrite_or_ignore'
+        )
+        self.parts_written += 1
+        self.rows_written += len(df)
+
+    def close(self, source=None):
+        """Write the snapshot manifest and return it"""
+        manifest = {
+            'source': source,
+            'format': self.file_format,
+            'partitioning': PARTITION_COLUMNS,
+            'rows': self.rows_written,
+            'columns': self.schema.names if self.schema is not None else [],
+            'created_at': datetime.now().isoformat()
+        }
+        with open(os.path.join(self.output_dir, MANIFEST_FILE), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+        return manifest
+
+
+def export_snapshot(df, output_dir, file_format='parquet', source=None):
+    """Write a whole prepared DataFrame as a partitioned snapshot"""
+    writer = SnapshotWriter(output_dir, file_format)
+    writer.write(df)
+    return writer.close(source)
+
+
+class SnapshotReader:
+    """Query a snapshot written by SnapshotWriter without going through MongoDB"""
+
+    def __init__(self, snapshot_dir):
+        require_pyarrow()
+        with open(os.path.join(snapshot_dir, MANIFEST_FILE), encoding='utf-8') as f:
+            self.manifest = json.load(f)
+
+        # Arrow IPC files are memory-mapped; only the pages a query touches are read
+        file_format = ds.IpcFileFormat() if self.manifest['format'] == 'arrow' else ds.ParquetFileFormat()
+        self.dataset = ds.dataset(
+            snapshot_dir,
+            format=file_format,
+            partitioning='hive',
+            filesystem=pafs.LocalFileSystem(use_mmap=True),
+            exclude_invalid_files=True
+        )
+
+    def filter_expression(self, indicator_ids=None, years=None, places=None, start=None, end=None):
+        """Build a pyarrow filter; partition columns prune whole directories"""
+        conditions = []
+        if indicator_ids is not None:
+            conditions.append(ds.field('Indicator ID').isin(list(indicator_ids)))
+        if years is not None:
+            conditions.append(ds.field('year').isin(list(years)))
+        if places is not None:
+            conditions.append(ds.field('Geo Place Name').isin(list(places)))
+        if start is not None:
+            conditions.append(ds.field('Start_Date') >= pa.scalar(start, type=pa.timestamp('us')))
+        if end is not None:
+            conditions.append(ds.field('Start_Date') < pa.scalar(end, type=pa.timestamp('us')))
+
+        expression = None
+        for condition in conditions:
+            expression = condition if expression is None else expression & condition
+        return expression
+
+    def table(self, columns=None, **filters):
+        """Return the matching rows as an Arrow table"""
+        return self.dataset.to_table(columns=columns, filter=self.filter_expression(**filters))
+
+    def query(self, columns=None, **filters):
+        """Return the matching rows as a pandas DataFrame"""
+        return self.table(columns=columns, **filters).to_pandas()
+
+    def count(self, **filters):
+        return self.dataset.count_rows(filter=self.filter_expression(**filters))
+
+
+def main(argv=None):
+    """Print a quick summary of a snapshot, optionally filtered"""
+    parser = argparse.ArgumentParser(description="Query a GoFetch columnar snapshot")
+    parser.add_argument("snapshot_dir")
+    parser.add_argument("--indicator", type=int, action="append", help="Indicator ID (repeatable)")
+    parser.add_argument("--year", type=int, action="append", help="Year (repeatable)")
+    parser.add_argument("--place", action="append", help="Geo Place Name (repeatable)")
+    args = parser.parse_args(argv)
+
+    try:
+        reader = SnapshotReader(args.snapshot_dir)
+    except (ImportError, FileNotFoundError) as e:
+        print(f"❌ Cannot open snapshot: {e}")
+        return 1
+
+    print(f"🗂️ Snapshot: {args.snapshot_dir} ({reader.manifest['rows']:,} rows, {reader.manifest['format']})")
+    df = reader.query(
+        columns=['Name', 'Geo Place Name', 'year', 'Data Value'],
+        indicator_ids=args.indicator, years=args.year, places=args.place
+    )
+    print(f"📊 Matching rows: {len(df):,}")
+    if len(df):
+        summary = df.groupby(['Name', 'year'])['Data Value'].agg(['count', 'mean', 'min', 'max'])
+        print(summary.to_string())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
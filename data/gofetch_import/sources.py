@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Import Sources for GoFetch: Globs, Compressed Files and stdin
+================================================================
+
+The importer accepts any number of sources, each of which may be:
+
+    Air_Quality_20250613.csv           a plain CSV
+    exports/Air_Quality_*.csv.gz       a glob (matches are imported in name order)
+    daily/2025-06-13.csv.zst           gzip, bz2, xz or zstd, decompressed while parsing
+    -                                  CSV text on stdin
+
+Compressed files are never written out decompressed; pandas reads them through a
+decompressing stream. zstd needs the optional `zstandard` package.
+
+prefetch() runs a frame producer (parse + prepare) on its own thread, a bounded number
+of frames ahead, so the next chunk is being parsed while the current one is written.
+
+Usage:
+    python -m gofetch_import load --csv "exports/Air_Quality_*.csv.gz" --stream
+    gunzip -c export.csv.gz | python -m gofetch_import load --csv - --stream
+"""
+
+import glob
+import os
+import queue
+import sys
+import threading
+
+import pandas as pd
+
+STDIN = '-'
+
+COMPRESSION_SUFFIXES = {
+    '.gz': 'gzip',
+    '.gzip': 'gzip',
+    '.bz2': 'bz2',
+    '.xz': 'xz',
+    '.zst': 'zstd',
+    '.zstd': 'zstd'
+}
+
+
+def is_stdin(path):
+    return path == STDIN
+
+
+def compression_for(path):
+    """pandas compression name for a path, from its suffix (None for plain files and stdin)"""
+    if is_stdin(path):
+        return None
+    compression = COMPRESSION_SUFFIXES.get(os.path.splitext(path)[1].lower())
+    if compression == 'zstd':
+        try:
+            import zstandard  # noqa: F401  (only needed to decompress .zst files)
+        except ImportError:
+            raise ImportError(f"zstandard is required to read {path}: pip install zstandard")
+    return compression
+
+
+def expand_sources(specs):
+    """Turn paths, globs and '-' into an ordered list of source paths without duplicates
+
+    A glob that matches nothing is kept as-is so the caller reports it as missing.
+    """
+    sources = []
+    for spec in specs:
+        if is_stdin(spec):
+            matches = [STDIN]
+        elif glob.has_magic(spec):
+            matches = sorted(glob.glob(spec)) or [spec]
+        else:
+            matches = [spec]
+        for match in matches:
+            if match not in sources:
+                sources.append(match)
+    if sources.count(STDIN) and len(sources) > 1:
+        raise ValueError("stdin ('-') can't be combined with other sources")
+    return sources
+
+
+def read_csv(path, **kwargs):
+    """pd.read_csv for any source: stdin, plain or compressed files (chunksize= gives a reader)"""
+    if is_stdin(path):
+        return pd.read_csv(sys.stdin.buffer, **kwargs)
+    return pd.read_csv(path, compression=compression_for(path), **kwargs)
+
+
+def prefetch(frames, depth=2):
+    """Iterate `frames` on a background thread, keeping up to `depth` items ready
+
+    Exceptions raised by the producer are re-raised in the consumer. If the consumer stops
+    early, the producer is told to stop after its current item.
+    """
+    items = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+    done = object()
+
+    def produce():
+        try:
+            for frame in frames:
+                if stop.is_set():
+                    return
+                items.put((frame, None))
+            items.put((done, None))
+        except BaseException as e:
+            items.put((done, e))
+
+    thread = threading.Thread(target=produce, name="source-prefetch", daemon=True)
+    thread.start()
+    try:
+        while True:
+            frame, error = items.get()
+            if frame is done:
+                if error is not None:
+                    raise error
+                return
+            yield frame
+    finally:
+        stop.set()
+        # Unblock a producer waiting on a full queue
+        while thread.is_alive():
+            try:
+                items.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        thread.join()
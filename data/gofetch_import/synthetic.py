@@ -0,0 +1,131 @@
+"""
+Synthetic NYC air quality data for benchmarks, at any scale.
+
+The generator is profiled on a real export (Air_Quality_20250613.csv by default). Every
+source row is a template: an indicator, a place and a time period, plus its value. The
+output cycles through the templates in a fixed shuffled order, so:
+
+    - up to one export's worth of rows (~18.9k), the output is a random subset of the real
+      indicator × place × period combinations, with their proportions;
+    - beyond that, each further pass is a copy of the city with new places. The
+      Geo Join ID is offset by PLACE_ID_STRIDE and the place name gets a "#n" suffix.
+      Indicators, periods, dates and the number of readings per place keep the real
+      distribution. Series stay distinct, so rollups and upserts behave as they would
+      on a larger city.
+
+Values are the template value with multiplicative noise, clipped to the range the
+indicator shows in the real export. Unique IDs are sequential and unique. Output is
+deterministic for a given seed and chunk size. Files are written chunk by chunk, so a
+10M-row file needs no more memory than one chunk.
+
+Usage:
+    python -m gofetch_import generate --rows 1000000 --output synthetic-1m.csv.gz
+"""
+
+import argparse
+import gzip
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from .sources import read_csv
+
+PROFILE_CSV = 'Air_Quality_20250613.csv'
+COLUMNS = ['Unique ID', 'Indicator ID', 'Name', 'Measure', 'Measure Info', 'Geo Type Name',
+           'Geo Join ID', 'Geo Place Name', 'Time Period', 'Start_Date', 'Data Value', 'Message']
+TEMPLATE_COLUMNS = ['Indicator ID', 'Name', 'Measure', 'Measure Info', 'Geo Type Name',
+                    'Geo Join ID', 'Geo Place Name', 'Time Period', 'Start_Date']
+# Real Geo Join IDs stay below this (the largest, 105106107, joins three UHF codes),
+# so copied places never collide with real ones
+PLACE_ID_STRIDE = 10 ** 9
+VALUE_NOISE = 0.1
+CHUNK_ROWS = 200000
+
+
+def load_profile(csv_file_path=PROFILE_CSV):
+    """Templates and per-indicator value ranges from a real export"""
+    df = read_csv(csv_file_path, usecols=TEMPLATE_COLUMNS + ['Data Value'])
+    df = df.dropna(subset=TEMPLATE_COLUMNS + ['Data Value']).reset_index(drop=True)
+    ranges = df.groupby('Indicator ID')['Data Value'].agg(['min', 'max'])
+    return {
+        'template': df[TEMPLATE_COLUMNS],
+        'values': df['Data Value'].to_numpy(dtype=np.float64),
+        'low': df['Indicator ID'].map(ranges['min']).to_numpy(dtype=np.float64),
+        'high': df['Indicator ID'].map(ranges['max']).to_numpy(dtype=np.float64)
+    }
+
+
+def synthetic_frame(profile, order, start, stop, rng):
+    """Rows start..stop of the synthetic sequence, in the source CSV's layout"""
+    positions = np.arange(start, stop, dtype=np.int64)
+    copy = positions // len(order)
+    index = order[positions % len(order)]
+
+    frame = profile['template'].iloc[index].reset_index(drop=True)
+    frame.insert(0, 'Unique ID', positions + 1)
+    frame['Geo Join ID'] = frame['Geo Join ID'].to_numpy() + copy * PLACE_ID_STRIDE
+    copied = copy > 0
+    if copied.any():
+        suffix = pd.Series(copy, dtype='int64').astype(str)
+        frame['Geo Place Name'] = frame['Geo Place Name'].where(~copied, frame['Geo Place Name'] + ' #' + suffix)
+
+    noise = rng.lognormal(0.0, VALUE_NOISE, len(index))
+    values = np.clip(profile['values'][index] * noise, profile['low'][index], profile['high'][index])
+    frame['Data Value'] = np.round(values, 2)
+    frame['Message'] = np.nan
+    return frame[COLUMNS]
+
+
+def iter_synthetic_frames(rows, seed=0, chunk_rows=CHUNK_ROWS, profile=None):
+    """Yield the synthetic dataset as DataFrame chunks of up to chunk_rows rows"""
+    profile = profile if profile is not None else load_profile()
+    rng = np.random.default_rng(seed)
+    order = rng.permutation(len(profile['template']))
+    for start in range(0, rows, chunk_rows):
+        yield synthetic_frame(profile, order, start, min(start + chunk_rows, rows), rng)
+
+
+def write_synthetic_csv(path, rows, seed=0, chunk_rows=CHUNK_ROWS, profile=None):
+    """Write a synthetic export to path (gzip-compressed when it ends in .gz), returning the row count"""
+    opener = gzip.open if path.endswith('.gz') else open
+    written = 0
+    with opener(path, 'wt', newline='') as handle:
+        for frame in iter_synthetic_frames(rows, seed, chunk_rows, profile):
+            frame.to_csv(handle, header=written == 0, index=False)
+            written += len(frame)
+    return written
+
+
+def run(args):
+    """Generate a synthetic export, returning an exit code"""
+    try:
+        print(f"🧪 Generating {args.rows:,} synthetic rows (profile: {args.profile_csv}, seed {args.seed})...")
+        started = time.perf_counter()
+        written = write_synthetic_csv(args.output, args.rows, args.seed, args.chunk_rows,
+                                      load_profile(args.profile_csv))
+        print(f"✅ Wrote {written:,} rows to {args.output} in {time.perf_counter() - started:.1f}s")
+        return 0
+    except Exception as e:
+        print(f"❌ Could not generate synthetic data: {e}")
+        return 1
+
+
+def add_arguments(parser):
+    parser.add_argument("--rows", type=int, default=100000, help="Number of rows to generate")
+    parser.add_argument("--output", default="synthetic_air_quality.csv.gz",
+                        help="Output CSV (gzip-compressed when it ends in .gz)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (same seed, same file)")
+    parser.add_argument("--profile-csv", default=PROFILE_CSV, help="Real export to take the distributions from")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS, help="Rows generated and written at a time")
+    return parser
+
+
+def main(argv=None):
+    parser = add_arguments(argparse.ArgumentParser(description="Generate synthetic NYC air quality data"))
+    return run(parser.parse_args(argv))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
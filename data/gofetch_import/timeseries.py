@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Time-Series Collection Layout for GoFetch Air Quality Measurements
+================================================================
+
+The dataset is a set of series — Indicator ID × (Geo Type Name, Geo Join ID) —
+each mapping Start_Date to a Data Value. A MongoDB time-series collection stores each
+series' points together in compressed buckets, so range scans such as
+getTimeSeriesData/getMonthlyTrends touch far fewer blocks than the row-per-document
+collection.
+
+Layout of air_quality_timeseries:
+    timeField  Start_Date
+    metaField  meta: {indicator_id, geo_type, geo_join_id, name, measure,
+                      measure_info, geo_place_name}
+    fields     Data Value, Unique ID, Time Period
+
+Usage:
+    python -m gofetch_import load --storage timeseries     # import straight into it
+    python -m gofetch_import.timeseries migrate            # copy air_quality_data over
+    python -m gofetch_import.timeseries migrate --replace  # drop and rebuild the target
+
+Requirements:
+    - MongoDB 6.3+ for yearly buckets. 5.0-6.2 servers get 'hours' granularity, whose
+      30-day buckets hold only a few readings each, so most of the compression is lost
+"""
+
+import argparse
+import sys
+import time
+
+import pandas as pd
+
+from .client import close_client, database_name, get_client
+
+TIMESERIES_COLLECTION = 'air_quality_timeseries'
+
+# Readings are monthly, seasonal or annual: one-year buckets keep each series' points together
+BUCKET_SPAN_SECONDS = 365 * 24 * 60 * 60
+
+META_FIELDS = {
+    'indicator_id': 'Indicator ID',
+    'geo_type': 'Geo Type Name',
+    'geo_join_id': 'Geo Join ID',
+    'name': 'Name',
+    'measure': 'Measure',
+    'measure_info': 'Measure Info',
+    'geo_place_name': 'Geo Place Name'
+}
+
+MEASUREMENT_FIELDS = ['Data Value', 'Unique ID', 'Time Period']
+
+
+def is_timeseries_collection(db, name):
+    info = next(db.list_collections(filter={'name': name}), None)
+    return info is not None and info.get('type') == 'timeseries'
+
+
+def server_version(db):
+    return '.'.join(str(part) for part in db.client.server_info().get('versionArray', [])[:3]) or 'unknown'
+
+
+def supports_custom_buckets(db):
+    """bucketMaxSpanSeconds/bucketRoundingSeconds arrived in MongoDB 6.3"""
+    version = db.client.server_info().get('versionArray', [0, 0])
+    return tuple(version[:2]) >= (6, 3)
+
+
+def ensure_timeseries_collection(db, name=TIMESERIES_COLLECTION):
+    """Create the time-series collection and its secondary indexes if needed"""
+    if name in db.list_collection_names():
+        if not is_timeseries_collection(db, name):
+            raise ValueError(f"{name} exists but is not a time-series collection")
+        return db[name]
+
+    options = {'timeField': 'Start_Date', 'metaField': 'meta'}
+    if supports_custom_buckets(db):
+        db.create_collection(name, timeseries={
+            **options,
+            'bucketMaxSpanSeconds': BUCKET_SPAN_SECONDS,
+            'bucketRoundingSeconds': BUCKET_SPAN_SECONDS
+        })
+    else:
+        # 'hours' is the coarsest preset before 6.3; its 30-day buckets hold only one to
+        # three readings of a series, so most of the compression benefit is lost
+        print(f"  ⚠️ MongoDB {server_version(db)} has no custom bucketing (6.3+); "
+              f"creating {name} with 'hours' granularity")
+        db.create_collection(name, timeseries={**options, 'granularity': 'hours'})
+
+    collection = db[name]
+    ensure_timeseries_indexes(collection)
+    return collection
+
+
+def ensure_timeseries_indexes(collection):
+    """Secondary indexes mirroring the backend query shapes, on the meta fields"""
+    collection.create_index([('meta.indicator_id', 1), ('Start_Date', 1)])
+    collection.create_index([('meta.geo_type', 1), ('meta.geo_join_id', 1), ('Start_Date', -1)])
+    collection.create_index([('meta.geo_place_name', 1), ('Start_Date', -1)])
+
+
+def _python_values(series):
+    """Column values as Python objects, NaN/NaT as None"""
+    if pd.api.types.is_datetime64_any_dtype(series.dtype):
+        return series.to_numpy(dtype='datetime64[us]').astype(object).tolist()
+    values = series.astype(object).tolist()
+    return [None if value is None or value != value else value for value in values]
+
+
+def to_timeseries_documents(df):
+    """Turn a prepared frame into time-series measurements (null fields omitted)"""
+    meta_columns = {field: _python_values(df[column]) for field, column in META_FIELDS.items()}
+    measurement_columns = {column: _python_values(df[column]) for column in MEASUREMENT_FIELDS if column in df}
+    dates = _python_values(df['Start_Date'])
+
+    documents = []
+    for row, start_date in enumerate(dates):
+        if start_date is None:
+            continue  # a measurement without its timeField cannot be stored
+        document = {
+            'Start_Date': start_date,
+            'meta': {field: values[row] for field, values in meta_columns.items() if values[row] is not None}
+        }
+        for column, values in measurement_columns.items():
+            if values[row] is not None:
+                document[column] = values[row]
+        documents.append(document)
+    return documents
+
+
+def write_frame(collection, df, batch_size=1000):
+    """Insert a prepared frame into the time-series collection, returning the count written"""
+    documents = to_timeseries_documents(df)
+    written = 0
+    for i in range(0, len(documents), batch_size):
+        written += len(collection.insert_many(documents[i:i + batch_size], ordered=False).inserted_ids)
+    return written
+
+
+def migrate(source, db, target=TIMESERIES_COLLECTION, batch_size=5000, replace=False):
+    """Copy the row-per-document collection into the time-series layout"""
+    if replace and target in db.list_collection_names():
+        print(f"  🗑️ Dropping existing {target}")
+        db.drop_collection(target)
+
+    collection = ensure_timeseries_collection(db, target)
+    if collection.estimated_document_count() > 0:
+        # Time-series collections can't carry a unique index to make re-runs idempotent
+        raise ValueError(f"{target} already has data; use --replace to rebuild it")
+
+    projection = {'_id': 0, 'Start_Date': 1, **{column: 1 for column in META_FIELDS.values()},
+                  **{column: 1 for column in MEASUREMENT_FIELDS}}
+    started = time.perf_counter()
+    written = 0
+    batch = []
+
+    # Reading in series order lets the server fill one bucket at a time
+    cursor = source.find({'Start_Date': {'$type': 'date'}}, projection, batch_size=batch_size).sort([
+        ('Indicator ID', 1), ('Geo Type Name', 1), ('Geo Join ID', 1), ('Start_Date', 1)
+    ]).allow_disk_use(True)
+    for doc in cursor:
+        document = {
+            'Start_Date': doc['Start_Date'],
+            'meta': {field: doc[column] for field, column in META_FIELDS.items() if doc.get(column) is not None}
+        }
+        for column in MEASUREMENT_FIELDS:
+            value = doc.get(column)
+            if value is not None and value == value:
+                document[column] = value
+        batch.append(document)
+
+        if len(batch) >= batch_size:
+            written += len(collection.insert_many(batch, ordered=False).inserted_ids)
+            batch = []
+            print(f"  📦 Migrated {written:,} documents...")
+
+    if batch:
+        written += len(collection.insert_many(batch, ordered=False).inserted_ids)
+
+    elapsed = time.perf_counter() - started
+    print(f"  ✅ Migrated {written:,} documents into {target} in {elapsed:.1f}s")
+    return written
+
+
+def main(argv=None):
+    """Migration command"""
+    parser = argparse.ArgumentParser(description="GoFetch time-series collection tools")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    migrate_parser = subparsers.add_parser("migrate", help="Copy air_quality_data into the time-series collection")
+    migrate_parser.add_argument("--source", default="air_quality_data", help="Source collection")
+    migrate_parser.add_argument("--target", default=TIMESERIES_COLLECTION, help="Target time-series collection")
+    migrate_parser.add_argument("--batch-size", type=int, default=5000)
+    migrate_parser.add_argument("--replace", action="store_true", help="Drop and rebuild the target collection")
+    args = parser.parse_args(argv)
+
+    client = get_client()
+    db = client[database_name()]
+
+    try:
+        print(f"🔁 Migrating {args.source} → {args.target} (time-series)...")
+        migrate(db[args.source], db, args.target, args.batch_size, args.replace)
+        return 0
+    except Exception as e:
+        print(f"❌ Migration failed: {e}")
+        return 1
+    finally:
+        close_client(client)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
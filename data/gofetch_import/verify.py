@@ -0,0 +1,139 @@
+"""
+Verify command: check that an import landed and is usable by the backend.
+
+Replaces the old verify.py / verify_import.py scripts (the latter still queried the
+retired AQI fields State and Daily AQI Value). Checks the NYC dataset fields the backend
+actually reads.
+
+Usage:
+    python -m gofetch_import verify
+"""
+
+import argparse
+import sys
+
+from .client import close_client, database_name, get_client
+from .rollups import LATEST_COLLECTION, ROLLUP_COLLECTIONS
+
+COLLECTION = 'air_quality_data'
+
+
+def verify(db, collection_name=COLLECTION):
+    """Print a health report of the collection, returning False if a check fails"""
+    collection = db[collection_name]
+    ok = True
+
+    total_docs = collection.count_documents({})
+    print(f"📊 Total documents: {total_docs:,}")
+    if total_docs == 0:
+        print("❌ Collection is empty")
+        return False
+
+    # Sample document
+    sample = collection.find_one({}, {'_id': 0})
+    print("\n📋 Sample document structure:")
+    for key, value in sample.items():
+        print(f"  • {key}: {type(value).__name__} = {str(value)[:50]}")
+
+    # Date range and indicators
+    date_range = next(collection.aggregate([
+        {'$group': {'_id': None, 'min_date': {'$min': '$Start_Date'}, 'max_date': {'$max': '$Start_Date'}}}
+    ]), None)
+    if date_range and date_range['min_date'] is not None:
+        print(f"\n📅 Date range: {date_range['min_date']:%Y-%m-%d} to {date_range['max_date']:%Y-%m-%d}")
+
+    print("\n🧪 Indicators:")
+    for indicator in collection.aggregate([
+        {'$group': {
+            '_id': '$Indicator ID',
+            'name': {'$first': '$Name'},
+            'unit': {'$first': '$Measure Info'},
+            'count': {'$sum': 1},
+            'avg': {'$avg': '$Data Value'}
+        }},
+        {'$sort': {'_id': 1}}
+    ]):
+        average = f"{indicator['avg']:.2f}" if indicator['avg'] is not None else "n/a"
+        print(f"  • {indicator['_id']} {indicator['name']}: {indicator['count']:,} rows, "
+              f"avg {average} {indicator['unit']}")
+
+    print("\n🗺️ Places by geography type:")
+    for geo in collection.aggregate([
+        {'$group': {'_id': '$Geo Type Name', 'places': {'$addToSet': '$Geo Join ID'}}},
+        {'$project': {'places': {'$size': '$places'}}},
+        {'$sort': {'_id': 1}}
+    ]):
+        print(f"  • {geo['_id']}: {geo['places']:,} places")
+
+    print(f"\n🔍 High NO2 (>30 ppb): "
+          f"{collection.count_documents({'Name': 'Nitrogen dioxide (NO2)', 'Data Value': {'$gt': 30}}):,}")
+    flushing = collection.find_one({'Geo Place Name': {'$regex': 'Flushing', '$options': 'i'}},
+                                   {'_id': 0, 'Geo Place Name': 1, 'Name': 1, 'Time Period': 1, 'Data Value': 1})
+    print(f"📍 Sample Flushing record: {flushing}")
+
+    # Integrity checks
+    print("\n🩺 Integrity checks:")
+    for label, query in [
+        ("missing Start_Date", {'Start_Date': {'$not': {'$type': 'date'}}}),
+        ("missing Data Value", {'Data Value': {'$not': {'$type': 'number'}}}),
+        ("missing Unique ID", {'Unique ID': {'$exists': False}})
+    ]:
+        count = collection.count_documents(query)
+        print(f"  {'✅' if count == 0 else '❌'} {label}: {count:,}")
+        ok = ok and count == 0
+
+    duplicates = list(collection.aggregate([
+        {'$group': {'_id': '$Unique ID', 'count': {'$sum': 1}}},
+        {'$match': {'count': {'$gt': 1}}},
+        {'$limit': 5}
+    ], allowDiskUse=True))
+    print(f"  {'✅' if not duplicates else '❌'} duplicate Unique IDs: "
+          f"{'none' if not duplicates else [doc['_id'] for doc in duplicates]}")
+    ok = ok and not duplicates
+
+    # Index information
+    indexes = list(collection.list_indexes())
+    print(f"\n🔗 Indexes: {len(indexes)}")
+    for idx in indexes:
+        print(f"  • {idx['name']}: {dict(idx['key'])}")
+
+    # Derived collections
+    existing = set(db.list_collection_names())
+    derived = [name for name in list(ROLLUP_COLLECTIONS.values()) + [LATEST_COLLECTION] if name in existing]
+    if derived:
+        print("\n📈 Derived collections:")
+        for name in derived:
+            print(f"  • {name}: {db[name].estimated_document_count():,} documents")
+
+    return ok
+
+
+def run(args):
+    """Verify the configured database, returning an exit code"""
+    print("🔍 Verifying MongoDB Import...")
+    client = get_client()
+    try:
+        if verify(client[database_name()], args.collection):
+            print("\n✅ MongoDB import verification completed!")
+            return 0
+        print("\n❌ Verification found problems")
+        return 1
+    except Exception as e:
+        print(f"❌ Verification failed: {e}")
+        return 1
+    finally:
+        close_client(client)
+
+
+def add_arguments(parser):
+    parser.add_argument("--collection", default=COLLECTION, help="Collection to verify")
+    return parser
+
+
+def main(argv=None):
+    parser = add_arguments(argparse.ArgumentParser(description="Verify a GoFetch air quality import"))
+    return run(parser.parse_args(argv))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
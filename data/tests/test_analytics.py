@@ -0,0 +1,44 @@
+"""Filters of analytics.AnalyticsEngine.stats (run from data/: python -m pytest tests)"""
+
+import pandas as pd
+
+from gofetch_import.analytics import AnalyticsEngine
+
+
+def frame(rows):
+    """Prepared rows of (Geo Type Name, Geo Join ID, Geo Place Name, Data Value)"""
+    return pd.DataFrame({
+        'Indicator ID': 365,
+        'Name': 'Fine particles (PM 2.5)',
+        'Measure Info': 'mcg/m3',
+        'Geo Type Name': [row[0] for row in rows],
+        'Geo Join ID': [row[1] for row in rows],
+        'Geo Place Name': [row[2] for row in rows],
+        'Time Period': 'Annual Average 2015',
+        'Start_Date': pd.Timestamp('2015-01-01'),
+        'Data Value': [row[3] for row in rows],
+    })
+
+
+ROWS = [
+    ('UHF34', 204, 'Borough Park', 10.0),
+    ('UHF42', 204, 'Borough Park', 12.0),
+    ('UHF42', 204, 'Borough Park', 14.0),
+    ('UHF42', 101, 'Kingsbridge - Riverdale', 8.0),
+]
+
+
+def test_place_name_matches_every_place_sharing_it():
+    engine = AnalyticsEngine(frame(ROWS))
+
+    [group] = engine.stats(places=['Borough Park'])
+    assert group['count'] == 3
+    assert group['avg'] == 12.0
+
+
+def test_place_id_matches_one_place():
+    engine = AnalyticsEngine(frame(ROWS))
+
+    [group] = engine.stats(place_ids=[('UHF34', 204)])
+    assert group['count'] == 1
+    assert engine.stats(places=['Nowhere']) == []
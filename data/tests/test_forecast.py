@@ -0,0 +1,42 @@
+"""Backtest scoring of forecast.SeasonalTrendModel (run from data/: python -m pytest tests)"""
+
+import pandas as pd
+
+from gofetch_import.forecast import backtest
+
+
+def readings(geo_join_id, values):
+    """One series' Summer readings, a year apart from 2015"""
+    return pd.DataFrame({
+        'Indicator ID': 365,
+        'Name': 'Fine particles (PM 2.5)',
+        'Measure': 'Mean',
+        'Measure Info': 'mcg/m3',
+        'Geo Type Name': 'UHF42',
+        'Geo Join ID': geo_join_id,
+        'Geo Place Name': f'Place {geo_join_id}',
+        'Time Period': [f'Summer {2015 + year}' for year in range(len(values))],
+        'Start_Date': pd.to_datetime([f'{2015 + year}-06-01' for year in range(len(values))]),
+        'Data Value': values,
+    })
+
+
+def test_coverage_skips_series_too_short_for_an_interval():
+    # 101's training keeps one reading, so it has a forecast but no spread estimate
+    history = pd.concat([
+        readings(101, [10.0, 11.0]),
+        readings(102, [8.0, 9.0, 10.0, 11.0]),
+        readings(103, [12.0, 11.0, 10.0, 30.0]),
+    ])
+    result = backtest(history, min_history=1)
+
+    assert result['forecasts'] == 3
+    # 102 keeps its trend inside the interval, 103's jump falls outside; 101 isn't counted
+    assert result['interval_coverage'] == 0.5
+
+
+def test_coverage_is_none_without_any_interval():
+    result = backtest(readings(101, [10.0, 11.0]), min_history=1)
+
+    assert result['forecasts'] == 1
+    assert result['interval_coverage'] is None
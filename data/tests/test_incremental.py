@@ -0,0 +1,81 @@
+"""Change detection of GoFetchMongoImporter.sync_incremental (run from data/: python -m pytest tests)"""
+
+import io
+
+import pandas as pd
+import pytest
+
+from gofetch_import.importer import SOURCE_DTYPES, GoFetchMongoImporter
+
+mongomock = pytest.importorskip('mongomock')
+
+HEADER = ('Unique ID,Indicator ID,Name,Measure,Measure Info,Geo Type Name,Geo Join ID,Geo Place Name,'
+          'Time Period,Start_Date,Data Value,Message')
+
+
+def row(unique_id, value, place='Flushing and Whitestone (CD7)', geo_join_id=407):
+    return (f'{unique_id},375,Nitrogen dioxide (NO2),Mean,ppb,CD,{geo_join_id},{place},'
+            f'Annual Average 2017,01/01/2017,{value},')
+
+
+def frame(*rows):
+    return pd.read_csv(io.StringIO('\n'.join((HEADER,) + rows)), dtype=SOURCE_DTYPES)
+
+
+@pytest.fixture
+def importer():
+    importer = GoFetchMongoImporter(maintain_latest=False, quiet=True)
+    importer.db = mongomock.MongoClient()['gofetch_test']
+    importer.collection = importer.db[importer.collection_name]
+    return importer
+
+
+def sync(importer, *rows, delete_removed=False):
+    df = importer.prepare_frame(frame(*rows))
+    return importer.sync_incremental(df, delete_removed=delete_removed)
+
+
+def test_content_hash_follows_the_source_text():
+    hashes = GoFetchMongoImporter.compute_content_hash(frame(row(1, '5'), row(1, '5.0'), row(1, '5')))
+
+    # "5" and "5.0" are different source text; the same text always hashes the same
+    assert hashes[0] != hashes[1]
+    assert hashes[0] == hashes[2]
+
+
+def test_hash_does_not_depend_on_the_other_rows_of_the_chunk():
+    # Alone, '12' would be read as an integer column; next to '12.5' as floats
+    alone = GoFetchMongoImporter.compute_content_hash(frame(row(1, '12')))
+    mixed = GoFetchMongoImporter.compute_content_hash(frame(row(1, '12'), row(2, '12.5')))
+
+    assert alone[0] == mixed[0]
+
+
+def test_sync_writes_only_new_and_changed_rows(importer):
+    sync(importer, row(1, '10.5'), row(2, '11.5'), row(3, '12.5'))
+
+    result = sync(importer, row(1, '10.5'), row(2, '99.0'), row(4, '13.5'))
+
+    assert (result['new'], result['changed'], result['unchanged'], result['removed']) == (1, 1, 1, 1)
+    assert result['deleted'] == 0
+    assert importer.collection.find_one({'Unique ID': 2})['Data Value'] == 99.0
+    assert importer.collection.count_documents({}) == 4
+
+
+def test_unchanged_source_writes_nothing(importer):
+    sync(importer, row(1, '10.5'), row(2, '11.5'))
+
+    result = sync(importer, row(1, '10.5'), row(2, '11.5'))
+
+    assert (result['new'], result['changed'], result['inserted'], result['updated']) == (0, 0, 0, 0)
+
+
+def test_delete_removed_reports_the_removed_place(importer):
+    sync(importer, row(1, '10.5'), row(2, '11.5', place='Rockaway and Broad Channel (CD14)', geo_join_id=414))
+
+    result = sync(importer, row(1, '10.5'), delete_removed=True)
+
+    assert result['deleted'] == 1
+    assert importer.collection.count_documents({'Unique ID': 2}) == 0
+    assert 'Rockaway and Broad Channel (CD14)' in result['affected_places']
+    assert (375, 'CD', 414) in result['affected_series']
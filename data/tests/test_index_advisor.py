@@ -0,0 +1,48 @@
+"""Redundancy rules of index_advisor.advise (run from data/: python -m pytest tests)"""
+
+from gofetch_import.index_advisor import BACKEND_QUERY_SHAPES, advise, shape_from_query
+
+SHAPES = [shape_from_query(q['filter'], q['sort'], q['source']) for q in BACKEND_QUERY_SHAPES]
+
+
+def index(name, *keys):
+    return {'name': name, 'key': dict(keys)}
+
+
+def test_duplicate_indexes_keep_one_copy():
+    existing = [
+        index('_id_', ('_id', 1)),
+        index('geo_a', ('Geo Place Name', 1), ('Start_Date', -1)),
+        index('geo_b', ('Geo Place Name', 1), ('Start_Date', -1)),
+    ]
+    report = advise(SHAPES, existing)
+
+    assert [(name, reason) for name, _, reason in report['drop']] == [('geo_b', 'duplicate of geo_a')]
+    assert [('Geo Place Name', 1), ('Start_Date', -1)] not in report['create']
+
+
+def test_reversed_pair_keeps_the_backend_index():
+    existing = [
+        index('_id_', ('_id', 1)),
+        index('Start_Date_1', ('Start_Date', 1)),
+        index('start_date_desc_idx', ('Start_Date', -1)),
+    ]
+    report = advise(SHAPES, existing)
+
+    dropped = {name: reason for name, _, reason in report['drop']}
+    assert dropped == {'Start_Date_1': 'duplicate of start_date_desc_idx'}
+    # The kept copy still serves the date-window shape, so nothing is rebuilt for it
+    assert [('Start_Date', -1)] not in report['create']
+    assert [('Start_Date', 1)] not in report['create']
+
+
+def test_create_list_accounts_for_drops():
+    existing = [
+        index('_id_', ('_id', 1)),
+        index('value_a', ('Data Value', -1)),
+        index('value_b', ('Data Value', 1)),
+    ]
+    report = advise(SHAPES, existing)
+
+    assert [name for name, _, _ in report['drop']] == ['value_b']
+    assert [('Data Value', -1)] not in report['create']
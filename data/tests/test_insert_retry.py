@@ -0,0 +1,74 @@
+"""Partial insert_many handling of GoFetchMongoImporter.apply_batch (run from data/: python -m pytest tests)"""
+
+import json
+
+from pymongo.errors import BulkWriteError
+
+from gofetch_import.importer import DUPLICATE_KEY_ERROR, GoFetchMongoImporter
+
+
+class FakeCollection:
+    """insert_many that fails the listed Unique IDs with the given error codes, call by call"""
+
+    def __init__(self, *failures):
+        self.failures = list(failures)
+        self.calls = []
+
+    def insert_many(self, documents, ordered=True):
+        self.calls.append([document['Unique ID'] for document in documents])
+        failing = self.failures.pop(0) if self.failures else {}
+        errors = [{'index': index, 'code': failing[document['Unique ID']], 'errmsg': 'failed'}
+                  for index, document in enumerate(documents) if document['Unique ID'] in failing]
+        if errors:
+            raise BulkWriteError({'nInserted': len(documents) - len(errors), 'writeErrors': errors})
+
+        class Result:
+            inserted_ids = list(range(len(documents)))
+        return Result()
+
+
+def importer_for(collection, dead_letter_path=None):
+    importer = GoFetchMongoImporter(dead_letter_path=dead_letter_path, quiet=True)
+    importer.collection = collection
+    return importer
+
+
+def batch(*unique_ids):
+    return [{'Unique ID': unique_id, 'Data Value': 1.0} for unique_id in unique_ids]
+
+
+def test_retry_sends_only_the_failed_documents():
+    collection = FakeCollection({2: 50, 4: DUPLICATE_KEY_ERROR})
+    importer = importer_for(collection)
+
+    inserted, _ = importer.apply_batch(batch(1, 2, 3, 4, 5))
+
+    # 1, 3 and 5 land first, 4 is already stored, only 2 goes back to the server
+    assert collection.calls == [[1, 2, 3, 4, 5], [2]]
+    assert inserted == 4
+    assert importer.duplicates_skipped == 1
+    assert importer.dead_lettered == 0
+
+
+def test_duplicates_alone_are_not_retried():
+    collection = FakeCollection({1: DUPLICATE_KEY_ERROR, 3: DUPLICATE_KEY_ERROR})
+    importer = importer_for(collection)
+
+    inserted, _ = importer.apply_batch(batch(1, 2, 3))
+
+    assert collection.calls == [[1, 2, 3]]
+    assert (inserted, importer.duplicates_skipped) == (1, 2)
+
+
+def test_document_failing_twice_is_dead_lettered_alone(tmp_path):
+    path = tmp_path / 'dead_letter.jsonl'
+    collection = FakeCollection({2: 50}, {2: 50})
+    importer = importer_for(collection, dead_letter_path=str(path))
+
+    inserted, _ = importer.apply_batch(batch(1, 2, 3))
+
+    assert collection.calls == [[1, 2, 3], [2]]
+    assert inserted == 2
+    assert importer.dead_lettered == 1
+    [entry] = [json.loads(line) for line in path.read_text().splitlines()]
+    assert (entry['error_code'], entry['record']['Unique ID']) == (50, 2)
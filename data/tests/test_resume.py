@@ -0,0 +1,80 @@
+"""Checkpointed batches and resume of an interrupted import (run from data/: python -m pytest tests)"""
+
+from gofetch_import.importer import GoFetchMongoImporter
+from gofetch_import.manifest import ImportCheckpoint, ImportManifest, batch_id
+
+KEY = 'abc123:datainsight_db.air_quality_data:insert'
+SETTINGS = {'batch_size': 2, 'stream': False, 'chunk_size': None, 'storage': 'wide'}
+
+
+class Interrupted(BaseException):
+    """Stands in for a crash or Ctrl+C: not an Exception, so no retry path catches it"""
+
+
+class RecordingCollection:
+    """insert_many that records each batch's Unique IDs, interrupted on the given call"""
+
+    def __init__(self, interrupt_on=None):
+        self.interrupt_on = interrupt_on
+        self.calls = []
+
+    def insert_many(self, documents, ordered=True):
+        if len(self.calls) + 1 == self.interrupt_on:
+            raise Interrupted()
+        self.calls.append([document['Unique ID'] for document in documents])
+
+        class Result:
+            inserted_ids = list(range(len(documents)))
+        return Result()
+
+
+def start(path, settings=SETTINGS, fresh=False):
+    """An importer checkpointed in the manifest file at `path`, as load.import_source sets it up"""
+    manifest = ImportManifest(path=str(path))
+    committed = manifest.start(KEY, 'abc123', {'size': 1}, 'datainsight_db.air_quality_data', [],
+                               settings, fresh=fresh)
+    importer = GoFetchMongoImporter(quiet=True)
+    importer.checkpoint = ImportCheckpoint(manifest, KEY, committed)
+    return importer
+
+
+def records(count):
+    return [{'Unique ID': unique_id, 'Data Value': 1.0} for unique_id in range(1, count + 1)]
+
+
+def interrupted_run(path):
+    importer = start(path)
+    importer.collection = RecordingCollection(interrupt_on=3)
+    try:
+        importer.insert_records(records(10), batch_size=2)
+    except Interrupted:
+        pass
+    return importer.collection.calls
+
+
+def test_resume_skips_the_committed_batches(tmp_path):
+    path = tmp_path / 'import_manifest.json'
+    assert interrupted_run(path) == [[1, 2], [3, 4]]
+
+    importer = start(path)
+    importer.collection = RecordingCollection()
+    inserted, _ = importer.insert_records(records(10), batch_size=2)
+
+    assert importer.checkpoint.rows_committed == 10
+    assert importer.collection.calls == [[5, 6], [7, 8], [9, 10]]
+    assert inserted == 6
+
+
+def test_changed_settings_or_force_start_over(tmp_path):
+    changed, forced = tmp_path / 'changed.json', tmp_path / 'forced.json'
+    interrupted_run(changed)
+    interrupted_run(forced)
+
+    assert start(changed, settings={**SETTINGS, 'batch_size': 5}).checkpoint.rows_committed == 0
+    assert start(forced, fresh=True).checkpoint.rows_committed == 0
+    assert start(forced).checkpoint.rows_committed == 0
+
+
+def test_batch_id_names_the_same_rows_in_any_order():
+    assert batch_id([5, 3, 4]) == batch_id([3, 4, 5]) == '3-5:3'
+    assert batch_id([3, 4, 5]) != batch_id([3, 5])
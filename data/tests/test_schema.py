@@ -0,0 +1,107 @@
+"""Schema validation and quarantine output (run from data/: python -m pytest tests)"""
+
+import io
+
+import pandas as pd
+
+from gofetch_import.importer import SOURCE_DTYPES, GoFetchMongoImporter
+from gofetch_import.schema import REASONS_COLUMN, summarize_reasons, validate_frame, write_quarantine
+
+HEADER = ('Unique ID,Indicator ID,Name,Measure,Measure Info,Geo Type Name,Geo Join ID,Geo Place Name,'
+          'Time Period,Start_Date,Data Value,Message')
+
+
+def row(unique_id, value='21.5', date='01/01/2017', geo_type='CD', indicator='375', place='Flushing (CD7)'):
+    return (f'{unique_id},{indicator},Nitrogen dioxide (NO2),Mean,ppb,{geo_type},407,{place},'
+            f'Annual Average 2017,{date},{value},')
+
+
+def frame(*rows):
+    return pd.read_csv(io.StringIO('\n'.join((HEADER,) + rows)), dtype=SOURCE_DTYPES)
+
+
+def reasons_by_id(rejects):
+    return dict(zip(rejects['Unique ID'], rejects[REASONS_COLUMN]))
+
+
+def test_each_rule_rejects_its_rows():
+    valid, rejects = validate_frame(frame(
+        row(1),
+        row(2, date='2017-01-01'),
+        row(3, value='pending'),
+        row(1, value='22.0'),
+        row(4, geo_type='Zip'),
+        row(5, value='950'),
+        row(6, value='-1'),
+        row(7, place=''),
+    ))
+
+    assert list(valid['Unique ID']) == [1]
+    assert reasons_by_id(rejects) == {
+        '2': 'Start_Date: not a valid date',
+        '3': 'Data Value: not a valid float',
+        '1': 'Unique ID: duplicate',
+        '4': "Geo Type Name: not one of ['Borough', 'CD', 'Citywide', 'UHF34', 'UHF42']",
+        '5': 'Data Value: outside the plausible range for its indicator',
+        '6': 'Data Value: below 0; Data Value: outside the plausible range for its indicator',
+        '7': 'Geo Place Name: required',
+    }
+
+
+def test_rejects_keep_the_raw_values():
+    _, rejects = validate_frame(frame(row(2, date='2017-01-01', value='pending')))
+
+    assert rejects.iloc[0]['Start_Date'] == '2017-01-01'
+    assert rejects.iloc[0]['Data Value'] == 'pending'
+    assert rejects.iloc[0][REASONS_COLUMN] == 'Start_Date: not a valid date; Data Value: not a valid float'
+
+
+def test_valid_rows_are_coerced():
+    valid, rejects = validate_frame(frame(row(1), row(2, value='480', indicator='365')))
+
+    assert rejects.empty
+    assert valid['Unique ID'].dtype == 'int64'
+    assert valid['Indicator ID'].dtype == 'int64'
+    assert valid['Geo Join ID'].dtype == 'int64'
+    assert valid['Data Value'].tolist() == [21.5, 480.0]
+    assert valid['Start_Date'].tolist() == [pd.Timestamp('2017-01-01')] * 2
+
+
+def test_summarize_reasons_counts_each_reason():
+    _, rejects = validate_frame(frame(row(1, value='-1'), row(2, value='950'), row(3, date='13/45/2017')))
+
+    assert summarize_reasons(rejects) == {
+        'Data Value: outside the plausible range for its indicator': 2,
+        'Data Value: below 0': 1,
+        'Start_Date: not a valid date': 1,
+    }
+    assert summarize_reasons(rejects.iloc[0:0]) == {}
+
+
+def test_write_quarantine_appends_with_one_header(tmp_path):
+    path = tmp_path / 'rejected_rows.csv'
+    _, first = validate_frame(frame(row(1, value='pending')))
+    _, second = validate_frame(frame(row(2, geo_type='Zip'), row(3, value='950')))
+
+    assert write_quarantine(first, path) == 1
+    assert write_quarantine(second, path) == 2
+    assert write_quarantine(second.iloc[0:0], path) == 0
+
+    written = pd.read_csv(path, dtype=str)
+    assert written['Unique ID'].tolist() == ['1', '2', '3']
+    assert written.columns[-1] == REASONS_COLUMN
+    assert path.read_text().count('Unique ID') == 1
+
+
+def test_prepare_frame_quarantines_rejects(tmp_path):
+    path = tmp_path / 'rejected_rows.csv'
+    importer = GoFetchMongoImporter(quiet=True, quarantine_path=str(path))
+
+    df = importer.prepare_frame(frame(row(1), row(2, value='pending'), row(3)))
+
+    assert df['Unique ID'].tolist() == [1, 3]
+    assert importer.rows_rejected == 1
+    written = pd.read_csv(path, dtype=str)
+    assert written['Unique ID'].tolist() == ['2']
+    assert 'content_hash' not in written.columns
+    assert written[REASONS_COLUMN].tolist() == ['Data Value: not a valid float']